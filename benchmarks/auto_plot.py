@@ -0,0 +1,72 @@
+"""Benchmarks auto-plotting large results.
+
+Auto-plots 1D traces, pairs of x and y traces and 2D images of 1e6 - 1e8 elements,
+given as in-memory ndarrays and as (lazily read) HDF5 datasets, and prints the time
+it takes to detect how to plot them (by dtype and shape) and the total time it takes
+to auto-plot them (including downsampling to the `plot.max_points` config setting).
+
+Usage:
+    python benchmarks/auto_plot.py [--sizes N [N ...]]
+"""
+import argparse
+import math
+import os
+import tempfile
+import time
+
+import h5py
+import numpy as np
+
+from entropylab.pipeline.api.auto_plot import auto_plot, _values_from
+
+
+def _arrays(size: int):
+    rng = np.random.default_rng(42)
+    side = int(math.sqrt(size))
+    return {
+        "1D trace": rng.random(size, dtype=np.float32),
+        "x and y": np.stack(
+            [
+                np.arange(size // 2, dtype=np.float32),
+                rng.random(size // 2, dtype=np.float32),
+            ]
+        ),
+        "image": rng.random((side, side), dtype=np.float32),
+    }
+
+
+def _time(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def run(sizes):
+    print(f"{'data':<12}{'elements':>12}{'source':>10}{'detect s':>12}{'plot s':>10}")
+    for size in sizes:
+        path = os.path.join(tempfile.mkdtemp(), "data.hdf5")
+        try:
+            for data_name, array in _arrays(size).items():
+                with h5py.File(path, "w") as file:
+                    file.create_dataset("data", data=array)
+                with h5py.File(path, "r") as file:
+                    sources = {"ndarray": array, "hdf5": file["data"]}
+                    for source_name, data in sources.items():
+                        detect = _time(lambda data=data: _values_from(data))
+                        plot = _time(lambda data=data: auto_plot(0, data))
+                        print(
+                            f"{data_name:<12}{array.size:>12.0e}{source_name:>10}"
+                            f"{detect:>12.4f}{plot:>10.3f}"
+                        )
+                del array
+        finally:
+            os.remove(path)
+            os.rmdir(os.path.dirname(path))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--sizes", type=float, nargs="+", default=[1e6, 1e7, 1e8], help="elements"
+    )
+    run([int(size) for size in parser.parse_args().sizes])
@@ -0,0 +1,90 @@
+"""Benchmarks saving and loading figures in the SQLite database of an Entropy project.
+
+Saves typical figures (long traces, heatmaps) once as plotly JSON strings (as figures
+were saved before Entropy encoded them as binary) and once as binary (see
+FigureTable.from_model() in entropylab/pipeline/results_backend/sqlalchemy/model.py)
+and prints the save time, load time (including decoding) and database size of each.
+
+Usage:
+    python benchmarks/figure_storage.py [--repeats N]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+from plotly import express as px
+from plotly.io import to_json
+
+from entropylab import SqlAlchemyDB
+from entropylab.pipeline.results_backend.sqlalchemy.db_initializer import (
+    _ENTROPY_DIRNAME,
+    _DB_FILENAME,
+)
+from entropylab.pipeline.results_backend.sqlalchemy.model import FigureTable
+
+
+def _figures():
+    rng = np.random.default_rng(42)
+    t = np.linspace(0, 1e-5, 1_000_000)
+    return {
+        "trace (1M points)": px.line(x=t, y=np.cos(2 * np.pi * 50e6 * t)),
+        "IQ blobs (2x100k)": px.scatter(
+            x=rng.normal(0, 1, 100_000), y=rng.normal(0, 1, 100_000)
+        ),
+        "heatmap (500x500)": px.imshow(rng.random((500, 500))),
+    }
+
+
+def _save_as_json(db: SqlAlchemyDB, experiment_id: int, figure) -> None:
+    with db._session_maker() as sess:
+        sess.add(
+            FigureTable(
+                experiment_id=experiment_id,
+                figure=to_json(figure),
+                time=datetime.now(),
+            )
+        )
+        sess.commit()
+
+
+def _save_as_binary(db: SqlAlchemyDB, experiment_id: int, figure) -> None:
+    db.save_figure(experiment_id, figure)
+
+
+SAVE_FUNCS = {"json": _save_as_json, "binary": _save_as_binary}
+
+
+def run(repeats: int):
+    print(f"{'figure':<20}{'format':<8}{'save s':>10}{'load s':>10}{'MB':>10}")
+    for figure_name, figure in _figures().items():
+        for format_name, save in SAVE_FUNCS.items():
+            path = tempfile.mkdtemp()
+            try:
+                db = SqlAlchemyDB(path)
+                start = time.perf_counter()
+                for i in range(repeats):
+                    save(db, i, figure)
+                save_time = (time.perf_counter() - start) / repeats
+                start = time.perf_counter()
+                for i in range(repeats):
+                    assert db.get_figures(i)[0].figure.data
+                load_time = (time.perf_counter() - start) / repeats
+                db_size = os.path.getsize(
+                    os.path.join(path, _ENTROPY_DIRNAME, _DB_FILENAME)
+                )
+                print(
+                    f"{figure_name:<20}{format_name:<8}{save_time:>10.3f}"
+                    f"{load_time:>10.3f}{db_size / 1e6:>10.1f}"
+                )
+            finally:
+                shutil.rmtree(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeats", type=int, default=5)
+    run(parser.parse_args().repeats)
@@ -0,0 +1,80 @@
+"""Benchmarks HDF5 result write throughput vs. compression ratio.
+
+Writes typical result ndarrays (raw IQ traces, 2D sweeps, integer histograms) through
+HDF5Storage with different compression policies and prints the write throughput
+(MB/s of uncompressed data) and compression ratio of each combination.
+
+Usage:
+    python benchmarks/hdf5_compression.py [--repeats N]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from entropylab import RawResultData
+from entropylab.pipeline.results_backend.sqlalchemy.storage import (
+    HDF5Storage,
+    HDF5CompressionPolicy,
+)
+
+POLICIES = {
+    "none": HDF5CompressionPolicy(),
+    "lzf": HDF5CompressionPolicy(compression="lzf"),
+    "gzip-1": HDF5CompressionPolicy(compression="gzip", compression_opts=1),
+    "gzip-4": HDF5CompressionPolicy(compression="gzip", compression_opts=4),
+    "gzip-9": HDF5CompressionPolicy(compression="gzip", compression_opts=9),
+}
+
+
+def _datasets():
+    rng = np.random.default_rng(42)
+    t = np.linspace(0, 1e-5, 100_000)
+    signal = np.cos(2 * np.pi * 50e6 * t)
+    return {
+        "IQ trace (2x100k float64)": np.stack(
+            [signal + rng.normal(0, 0.05, t.size), rng.normal(0, 0.05, t.size)]
+        ),
+        "2D sweep (200x500 float64)": np.sin(np.outer(np.arange(200), np.arange(500))),
+        "ADC samples (1M int16)": rng.integers(-2048, 2048, 1_000_000, dtype=np.int16),
+        "histogram (100k int64)": rng.poisson(3, 100_000),
+    }
+
+
+def _dir_size(path: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(path, f))
+        for f in os.listdir(path)
+        if f.endswith(".hdf5")
+    )
+
+
+def run(repeats: int):
+    print(f"{'data':<28}{'policy':<10}{'MB/s':>10}{'ratio':>10}")
+    for data_name, data in _datasets().items():
+        for policy_name, policy in POLICIES.items():
+            path = tempfile.mkdtemp()
+            try:
+                storage = HDF5Storage(path, compression_policy=policy)
+                start = time.perf_counter()
+                for i in range(repeats):
+                    storage.save_result(i, RawResultData(label="data", data=data))
+                    storage.close(i)
+                elapsed = time.perf_counter() - start
+                throughput = data.nbytes * repeats / elapsed / 1e6
+                ratio = data.nbytes * repeats / _dir_size(path)
+                print(
+                    f"{data_name:<28}{policy_name:<10}"
+                    f"{throughput:>10.1f}{ratio:>10.2f}"
+                )
+            finally:
+                shutil.rmtree(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeats", type=int, default=10)
+    run(parser.parse_args().repeats)
@@ -0,0 +1,86 @@
+"""Benchmarks ParamStore commit and checkout times with a long commit history.
+
+Creates a ParamStore JSON file with N commits of K params each, then prints the time
+it takes to open it, to check out commits (the first checkout reads the JSON file,
+later checkouts use the in-memory index of TinyDbPersistence) and to commit.
+
+Usage:
+    python benchmarks/param_store.py [--commits N] [--keys K]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from entropylab.pipeline.params.param_store import ParamStore, Param
+from entropylab.pipeline.params.persistence.tinydb.storage import JSONPickleStorage
+from entropylab.pipeline.params.persistence.tinydb.tinydbpersistence import (
+    CURRENT_VERSION,
+    INFO_TABLE,
+    VERSION_KEY,
+    REVISION_KEY,
+)
+
+
+def _create_params_file(path: str, commits: int, keys: int):
+    docs = {}
+    for i in range(1, commits + 1):
+        docs[str(i)] = dict(
+            metadata=dict(id=f"{i:040x}", timestamp=pd.Timestamp(i), label=None),
+            params={f"q{k}.freq": Param(float(i * keys + k)) for k in range(keys)},
+            tags={},
+        )
+    JSONPickleStorage(path).write(
+        {
+            "_default": docs,
+            INFO_TABLE: {"1": {VERSION_KEY: CURRENT_VERSION, REVISION_KEY: ""}},
+        }
+    )
+
+
+def _time(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def run(commits: int, keys: int):
+    path = os.path.join(tempfile.mkdtemp(), "params.json")
+    try:
+        _create_params_file(path, commits, keys)
+        print(
+            f"{commits} commits of {keys} params ({os.path.getsize(path) / 1e6:.1f}MB)"
+        )
+        store = None
+
+        def open_store():
+            nonlocal store
+            store = ParamStore(path)
+
+        print(f"{'open (checkout latest)':<28}{_time(open_store):>10.4f}s")
+        first_id = f"{1:040x}"
+        middle_id = f"{commits // 2:040x}"
+        print(
+            f"{'checkout first':<28}{_time(lambda: store.checkout(first_id)):>10.4f}s"
+        )
+        print(
+            f"{'checkout middle':<28}{_time(lambda: store.checkout(middle_id)):>10.4f}s"
+        )
+        print(f"{'checkout latest':<28}{_time(lambda: store.checkout()):>10.4f}s")
+        store["q0.freq"] = 1.0
+        print(f"{'commit':<28}{_time(lambda: store.commit()):>10.4f}s")
+    finally:
+        os.remove(path)
+        if os.path.isfile(path + ".lock"):
+            os.remove(path + ".lock")
+        os.rmdir(os.path.dirname(path))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--commits", type=int, default=50_000)
+    parser.add_argument("--keys", type=int, default=10)
+    args = parser.parse_args()
+    run(args.commits, args.keys)
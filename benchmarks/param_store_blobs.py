@@ -0,0 +1,64 @@
+"""Benchmarks ParamStore commits of params with large array values, with the values
+saved in every commit (as before Entropy saved them in content-addressed blobs) and
+with the values saved once (see BlobStore).
+
+Commits N times to a store with a large array param (e.g. a calibration waveform) and
+a small param, changing only the small param, and prints the average commit time and
+the size of the store on disk.
+
+Usage:
+    python benchmarks/param_store_blobs.py [--commits N] [--size S]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from entropylab.config import settings
+from entropylab.pipeline.params.param_store import ParamStore
+
+THRESHOLDS = {"inline": np.inf, "blobs": 64 * 1024}
+
+
+def _dir_size(path: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(root, f))
+        for root, _, files in os.walk(path)
+        for f in files
+    )
+
+
+def run(commits: int, size: int):
+    for backend_name, filename, kwarg in [
+        ("tinydb", "params.json", "path"),
+        ("log", "params.log", "log_path"),
+    ]:
+        for threshold_name, threshold in THRESHOLDS.items():
+            path = tempfile.mkdtemp()
+            try:
+                settings.set("param_store_blob_threshold", threshold)
+                store = ParamStore(**{kwarg: os.path.join(path, filename)})
+                store["waveform"] = np.random.default_rng(42).random(size)
+                start = time.perf_counter()
+                for i in range(commits):
+                    store["amplitude"] = float(i)
+                    store.commit()
+                commit_time = (time.perf_counter() - start) / commits
+                print(
+                    f"{backend_name:<8}{threshold_name:<8}"
+                    f"commit: {commit_time * 1000:>8.2f} ms   "
+                    f"size: {_dir_size(path) / 1e6:>8.2f} MB"
+                )
+            finally:
+                shutil.rmtree(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--commits", type=int, default=50)
+    parser.add_argument("--size", type=int, default=100_000)
+    args = parser.parse_args()
+    run(args.commits, args.size)
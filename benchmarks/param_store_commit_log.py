@@ -0,0 +1,62 @@
+"""Benchmarks ParamStore commits as the commit history grows, with a TinyDB JSON file
+(where every commit saves all params, and rewrites the whole file) and with a commit
+log (where every commit appends only the changed params, see CommitLogPersistence).
+
+Commits N times to a store of K params, changing one param per commit, and prints the
+average commit time of every 10% of the commits, the time it takes to check out the
+first commit, and the size of the file.
+
+Usage:
+    python benchmarks/param_store_commit_log.py [--commits N] [--keys K]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from entropylab.pipeline.params.param_store import ParamStore
+
+BACKENDS = {
+    "tinydb": lambda path: ParamStore(os.path.join(path, "params.json")),
+    "log": lambda path: ParamStore(log_path=os.path.join(path, "params.log")),
+}
+
+
+def _dir_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+
+
+def run(commits: int, keys: int):
+    for backend_name, create_store in BACKENDS.items():
+        path = tempfile.mkdtemp()
+        try:
+            store = create_store(path)
+            for k in range(keys):
+                store[f"q{k}.freq"] = float(k)
+            first_id = store.commit()
+            print(f"{backend_name}: commit time (ms) per {commits // 10} commits")
+            times = []
+            for i in range(commits):
+                store[f"q{i % keys}.freq"] = float(i)
+                start = time.perf_counter()
+                store.commit()
+                times.append(time.perf_counter() - start)
+                if len(times) == commits // 10:
+                    print(f"  {sum(times) / len(times) * 1000:.2f}")
+                    times = []
+            start = time.perf_counter()
+            store.checkout(first_id)
+            checkout_time = time.perf_counter() - start
+            print(f"  checkout first commit: {checkout_time * 1000:.2f} ms")
+            print(f"  file size: {_dir_size(path) / 1e6:.2f} MB")
+        finally:
+            shutil.rmtree(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--commits", type=int, default=500)
+    parser.add_argument("--keys", type=int, default=500)
+    args = parser.parse_args()
+    run(args.commits, args.keys)
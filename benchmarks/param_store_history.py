@@ -0,0 +1,76 @@
+"""Benchmarks ParamStore.list_values() of a key that is in few of the commits of a
+long history, with each of the ParamStore backends, both by finding the commits that
+contain the key by reading all the commits (Persistence.search_commits) and by the
+index of the commits of each key (Persistence.get_history).
+
+Commits N times to a store of K params, changing one param per commit, with a rare
+param that is set in one of every 100 commits, and prints the time it takes to list
+the values of the rare param. (Commits of the SQL backend are not searched by key,
+which is supported only by PostgreSQL.)
+
+Usage:
+    python benchmarks/param_store_history.py [--commits N] [--keys K]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from entropylab.pipeline.params.param_store import ParamStore
+from entropylab.pipeline.params.persistence.persistence import Persistence
+
+BACKENDS = {
+    "tinydb": lambda path: ParamStore(os.path.join(path, "params.json")),
+    "log": lambda path: ParamStore(log_path=os.path.join(path, "params.log")),
+    "sqlite": lambda path: ParamStore(url=f"sqlite:///{path}/params.db"),
+}
+
+SEARCHED_BACKENDS = ["tinydb", "log"]
+
+
+def _list_values_by_search(store: ParamStore, key: str):
+    """list_values() as it was before the history index, by the default
+    implementation of Persistence.get_history"""
+    persistence = store._ParamStore__persistence
+    get_history = persistence.get_history
+    persistence.get_history = lambda k: Persistence.get_history(persistence, k)
+    try:
+        return store.list_values(key)
+    finally:
+        persistence.get_history = get_history
+
+
+def run(commits: int, keys: int):
+    for backend_name, create_store in BACKENDS.items():
+        path = tempfile.mkdtemp()
+        try:
+            store = create_store(path)
+            for k in range(keys):
+                store[f"q{k}.freq"] = float(k)
+            for i in range(commits):
+                store[f"q{i % keys}.freq"] = float(i)
+                if i % 100 == 0:
+                    store["rare"] = i
+                elif "rare" in store:
+                    del store["rare"]
+                store.commit()
+            print(f"{backend_name}: list_values() of a key in 1% of {commits} commits")
+            methods = [("history", ParamStore.list_values)]
+            if backend_name in SEARCHED_BACKENDS:
+                methods.insert(0, ("search", _list_values_by_search))
+            for method, list_values in methods:
+                start = time.perf_counter()
+                values = list_values(store, "rare")
+                elapsed = time.perf_counter() - start
+                print(f"  {method}: {elapsed * 1000:.2f} ms ({len(values)} values)")
+        finally:
+            shutil.rmtree(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--commits", type=int, default=1000)
+    parser.add_argument("--keys", type=int, default=100)
+    args = parser.parse_args()
+    run(args.commits, args.keys)
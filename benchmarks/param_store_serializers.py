@@ -0,0 +1,59 @@
+"""Benchmarks ParamStore commit and checkout times of a TinyDB file encoded by each of
+the ParamStore serializers (see entropylab/pipeline/params/persistence/serializers.py).
+
+Commits N times to a store of K params (changing one param per commit, and with one
+numpy array param), then prints the average commit time, the time it takes to open the
+store (which reads the file) and check out the first commit, and the size of the file.
+
+Usage:
+    python benchmarks/param_store_serializers.py [--commits N] [--keys K]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from entropylab.config import settings
+from entropylab.pipeline.params.param_store import ParamStore
+from entropylab.pipeline.params.persistence.serializers import SERIALIZERS
+
+
+def run(commits: int, keys: int):
+    print(f"{commits} commits of {keys} params")
+    print(f"{'serializer':<12}{'commit s':>10}{'checkout s':>12}{'MB':>8}")
+    for name in SERIALIZERS:
+        settings.set("param_store_serializer", name)
+        dir_path = tempfile.mkdtemp()
+        path = os.path.join(dir_path, "params.json")
+        try:
+            store = ParamStore(path)
+            for k in range(keys):
+                store[f"q{k}.freq"] = float(k)
+            store["q0.waveform"] = np.linspace(0, 1, 1000)
+            first_id = store.commit()
+            start = time.perf_counter()
+            for i in range(commits):
+                store[f"q{i % keys}.freq"] = float(i)
+                store.commit()
+            commit_time = (time.perf_counter() - start) / commits
+            start = time.perf_counter()
+            ParamStore(path).checkout(first_id)
+            checkout_time = time.perf_counter() - start
+            print(
+                f"{name:<12}{commit_time:>10.3f}{checkout_time:>12.3f}"
+                f"{os.path.getsize(path) / 1e6:>8.1f}"
+            )
+        finally:
+            shutil.rmtree(dir_path)
+    settings.set("param_store_serializer", "jsonpickle")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--commits", type=int, default=10)
+    parser.add_argument("--keys", type=int, default=10_000)
+    args = parser.parse_args()
+    run(args.commits, args.keys)
@@ -0,0 +1,128 @@
+"""Benchmarks concurrent access to the SQLite database of an Entropy project.
+
+One writer saves experiments and results (as a running experiment does) while N
+readers poll the experiments table and results (as the dashboard does). Runs once
+with SQLite's defaults (as used by Entropy before the SQLite profile was added) and
+once with Entropy's SQLite profile (see
+entropylab/pipeline/results_backend/sqlalchemy/engine.py) and prints the throughput,
+read latency and number of "database is locked" errors of each.
+
+Usage:
+    python benchmarks/sqlite_concurrency.py [--readers N] [--seconds S]
+"""
+import argparse
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy.exc import OperationalError
+
+from entropylab import SqlAlchemyDB, RawResultData
+from entropylab.config import settings
+from entropylab.pipeline.api.data_writer import ExperimentInitialData, ExperimentEndData
+from entropylab.pipeline.results_backend.sqlalchemy.engine import _DEFAULT_PRAGMAS
+
+PROFILES = {
+    # the Python sqlite3 module waits 5 seconds for locks by default:
+    "sqlite defaults": dict(
+        busy_timeout=5000,
+        journal_mode="delete",
+        synchronous="full",
+        mmap_size=0,
+        cache_size=-2000,
+    ),
+    "entropy profile": _DEFAULT_PRAGMAS,
+}
+
+
+class _Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.writes = 0
+        self.reads = 0
+        self.locked_errors = 0
+        self.read_latencies = []
+
+    def add(self, writes=0, reads=0, locked_errors=0, read_latency=None):
+        with self.lock:
+            self.writes += writes
+            self.reads += reads
+            self.locked_errors += locked_errors
+            if read_latency is not None:
+                self.read_latencies.append(read_latency)
+
+
+def _writer(path: str, stop: threading.Event, stats: _Stats):
+    db = SqlAlchemyDB(path, enable_hdf5_storage=False)
+    while not stop.is_set():
+        try:
+            experiment_id = db.save_experiment_initial_data(
+                ExperimentInitialData("bench", "user", "", "", datetime.now(), "")
+            )
+            for i in range(10):
+                db.save_result(experiment_id, RawResultData(f"r{i}", np.arange(100)))
+            db.save_experiment_end_data(
+                experiment_id, ExperimentEndData(datetime.now(), True)
+            )
+            stats.add(writes=12)
+        except OperationalError:
+            stats.add(locked_errors=1)
+
+
+def _reader(path: str, stop: threading.Event, stats: _Stats):
+    db = SqlAlchemyDB(path, enable_hdf5_storage=False)
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            experiments = db.get_experiments_range(0, 50)
+            if not experiments.empty:
+                db.get_results(int(experiments["id"].iloc[-1]))
+            stats.add(reads=1, read_latency=time.perf_counter() - start)
+        except OperationalError:
+            stats.add(locked_errors=1)
+
+
+def run(readers: int, seconds: float):
+    print(
+        f"{'profile':<18}{'writes/s':>10}{'reads/s':>10}"
+        f"{'p50 ms':>10}{'p95 ms':>10}{'locked':>10}"
+    )
+    for profile_name, pragmas in PROFILES.items():
+        for name, value in pragmas.items():
+            settings.set(f"db.sqlite.{name}", value)
+        path = tempfile.mkdtemp()
+        try:
+            SqlAlchemyDB(path)  # creates the project
+            stats = _Stats()
+            stop = threading.Event()
+            threads = [threading.Thread(target=_writer, args=(path, stop, stats))]
+            threads += [
+                threading.Thread(target=_reader, args=(path, stop, stats))
+                for _ in range(readers)
+            ]
+            for thread in threads:
+                thread.start()
+            time.sleep(seconds)
+            stop.set()
+            for thread in threads:
+                thread.join()
+            latencies = np.array(stats.read_latencies or [0]) * 1000
+            print(
+                f"{profile_name:<18}{stats.writes / seconds:>10.0f}"
+                f"{stats.reads / seconds:>10.0f}"
+                f"{np.percentile(latencies, 50):>10.1f}"
+                f"{np.percentile(latencies, 95):>10.1f}{stats.locked_errors:>10}"
+            )
+        finally:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+    run(args.readers, args.seconds)
@@ -1,4 +1,5 @@
 from entropylab.components.lab_topology import ExperimentResources, LabResources
+from entropylab.pipeline.api.buffered_writer import BufferedDataWriter
 from entropylab.pipeline.api.data_reader import ExperimentReader
 from entropylab.pipeline.api.data_writer import RawResultData
 from entropylab.pipeline.api.execution import EntropyContext
@@ -26,6 +27,7 @@ __all__ = [
     "ExperimentResources",
     "LabResources",
     "SqlAlchemyDB",
+    "BufferedDataWriter",
     "Script",
     "script_experiment",
     "ParamStore",
@@ -1,12 +1,18 @@
 import argparse
 import functools
+import os
 import sys
 
 import pkg_resources
 
 from entropylab.dashboard import serve_dashboard
 from entropylab.logger import logger
-from entropylab.pipeline.results_backend.sqlalchemy import init_db, upgrade_db
+from entropylab.pipeline.results_backend.sqlalchemy import (
+    init_db,
+    upgrade_db,
+    rebuild_storage_index,
+    export_project,
+)
 
 
 # Decorator for friendly error messages
@@ -43,6 +49,20 @@ def upgrade(args: argparse.Namespace):
     upgrade_db(args.directory)
 
 
+@command
+def index(args: argparse.Namespace):
+    rebuild_storage_index(args.directory)
+
+
+@command
+def export(args: argparse.Namespace):
+    output = args.output or os.path.join(args.directory, "export")
+    count = export_project(
+        args.directory, output, file_format=args.format, incremental=not args.full
+    )
+    print(f"Exported {count} experiments to {output}")
+
+
 @command
 def serve(args: argparse.Namespace):
     serve_dashboard(args.directory, args.host, args.port, args.debug)
@@ -82,6 +102,40 @@ def _build_parser():
     upgrade_parser.add_argument("directory", **directory_arg)
     upgrade_parser.set_defaults(func=upgrade)
 
+    # index
+    index_parser = subparsers.add_parser(
+        "index",
+        help="rebuild the index of results and metadata saved in an Entropy project",
+    )
+    index_parser.add_argument("directory", **directory_arg)
+    index_parser.set_defaults(func=index)
+
+    # export
+    export_parser = subparsers.add_parser(
+        "export",
+        help="export experiments, nodes and results to Parquet or Arrow files",
+    )
+    export_parser.add_argument("directory", **directory_arg)
+    export_parser.add_argument(
+        "-o",
+        "--output",
+        help="path to a directory to export to (default: <directory>/export)",
+        default=None,
+    )
+    export_parser.add_argument(
+        "-f",
+        "--format",
+        help="format of the exported files",
+        choices=["parquet", "arrow"],
+        default="parquet",
+    )
+    export_parser.add_argument(
+        "--full",
+        help="delete previously exported files and export all experiments",
+        action="store_true",
+    )
+    export_parser.set_defaults(func=export, full=False)
+
     # serve
     serve_parser = subparsers.add_parser(
         "serve", help="serve & launch the results dashboard app in a browser"
@@ -1,10 +1,13 @@
 import argparse
 import os
 import shutil
+import sqlite3
 
 import pytest
 
-from entropylab.cli.main import init, command
+from entropylab import RawResultData
+from entropylab.cli.main import init, index, export, command
+from entropylab.pipeline.results_backend.sqlalchemy.storage import HDF5Storage
 
 
 def test_init_with_no_args():
@@ -28,6 +31,39 @@ def test_init_with_current_dir():
     shutil.rmtree(".entropy")
 
 
+def test_index(project_dir_path):
+    # arrange
+    args = argparse.Namespace()
+    args.directory = project_dir_path
+    init(args)
+    storage = HDF5Storage(os.path.join(project_dir_path, ".entropy/hdf5"))
+    storage.save_result(7, RawResultData(label="foo", data=42))
+    storage.close()
+    # act
+    index(args)
+    # assert
+    db_path = os.path.join(project_dir_path, ".entropy/entropy.db")
+    with sqlite3.connect(db_path) as connection:
+        rows = connection.execute(
+            "SELECT experiment_id, label FROM StorageIndex"
+        ).fetchall()
+    assert rows == [(7, "foo")]
+
+
+def test_export(initialized_project_dir_path, capsys):
+    pytest.importorskip("pyarrow")
+    # arrange
+    args = argparse.Namespace()
+    args.directory = initialized_project_dir_path
+    args.output = None
+    args.format = "parquet"
+    args.full = False
+    # act
+    export(args)
+    # assert
+    assert capsys.readouterr().out.startswith("Exported 0 experiments")
+
+
 # def test_serve():
 #     args = argparse.Namespace()
 #     args.directory = "tests_cache"
@@ -7,6 +7,7 @@ from pathlib import Path
 
 import pytest
 
+from entropylab.config import settings
 from entropylab.logger import logger
 from entropylab.pipeline.results_backend.sqlalchemy.db_initializer import (
     _ENTROPY_DIRNAME,
@@ -97,6 +98,14 @@ def initialized_project_dir_path(request, project_dir_path) -> str:
     return project_dir_path
 
 
+@pytest.fixture()
+def binary_param_store_serializer():
+    """Opts in to saving ParamStore files in the binary format"""
+    settings.set("param_store_serializer", "binary")
+    yield
+    settings.set("param_store_serializer", "jsonpickle")
+
+
 # Internal implementations
 
 
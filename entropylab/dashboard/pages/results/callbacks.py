@@ -1,16 +1,26 @@
 from __future__ import annotations
 
 import json
-from typing import Dict, List, cast, Optional
+from typing import Dict, List, cast, Optional, Tuple
 
 import dash
 import dash_bootstrap_components as dbc
 from dash import html, dcc
-from dash.dependencies import Input, Output, State, ALL
+from dash.dependencies import Input, Output, State, ALL, MATCH
+from dash.exceptions import PreventUpdate
 from plotly import graph_objects as go
 from plotly.subplots import make_subplots
 
-from entropylab.dashboard.pages.results.dashboard_data import FAVORITE_TRUE
+from entropylab.dashboard.pages.results.dashboard_data import (
+    FAVORITE_TRUE,
+    FAVORITE_FALSE,
+)
+from entropylab.pipeline.api.downsampling import (
+    downsample,
+    downsample_figure,
+    max_points_setting,
+    window,
+)
 from entropylab.dashboard.theme import (
     colors,
     dark_plot_layout,
@@ -20,7 +30,6 @@ from entropylab.pipeline.api.data_reader import PlotRecord, FigureRecord
 from entropylab.pipeline.api.errors import EntropyError
 
 REFRESH_INTERVAL_IN_MILLIS = 3000
-EXPERIMENTS_PAGE_SIZE = 6
 
 
 def register_callbacks(app, dashboard_data_reader):
@@ -36,29 +45,134 @@ def register_callbacks(app, dashboard_data_reader):
 
     @app.callback(
         Output("experiments-table", "data"),
+        Output("experiments-table", "page_count"),
+        Output("experiments-table", "selected_rows"),
+        Output("experiments-changes-cursor", "data"),
         Output("empty-project-modal", "is_open"),
         Output("experiments-table", "active_cell"),
         Input("interval", "n_intervals"),
         Input("experiments-table", "active_cell"),
+        Input("experiments-table", "page_current"),
+        Input("experiments-table", "page_size"),
+        Input("experiments-table", "sort_by"),
+        Input("experiments-table", "filter_query"),
         State("experiments-table", "data"),
+        State("experiments-changes-cursor", "data"),
+        State("selected-experiment-ids", "data"),
     )
-    def refresh_experiments_table(_, active_cell, data):
+    def refresh_experiments_table(
+        _,
+        active_cell,
+        page_current,
+        page_size,
+        sort_by,
+        filter_query,
+        data,
+        cursor,
+        selected_ids,
+    ):
         """Periodically refresh the experiments table (See
-        https://dash.plotly.com/live-updates), or when a user clicks a "favorite"
-        column star"""
-        records = dashboard_data_reader.get_last_experiments()
-        if active_cell and active_cell["column_id"] == "favorite":
-            update_favorite_by_active_cell(active_cell, data)
-        open_empty_project_modal = len(records) == 0
-        return records, open_empty_project_modal, None  # <- cancels active_cell!
-
-    def update_favorite_by_active_cell(active_cell, data):
+        https://dash.plotly.com/live-updates), when a user clicks a "favorite"
+        column star, or when the user pages, sorts or filters the table (the table
+        is paged, sorted and filtered by the server - see
+        https://dash.plotly.com/datatable/callbacks)"""
+        triggered = [trigger["prop_id"] for trigger in dash.ctx.triggered]
+        page_current = page_current or 0
+        selected_ids = selected_ids or []
+        data = data or []
+        if triggered == ["interval.n_intervals"]:
+            return patch_changed_experiments(
+                page_current,
+                page_size,
+                sort_by,
+                filter_query,
+                data,
+                cursor,
+                selected_ids,
+            )
+        if triggered == ["experiments-table.active_cell"]:
+            if active_cell and active_cell["column_id"] == "favorite":
+                return patch_favorite_by_active_cell(active_cell, data)
+            return (dash.no_update,) * 5 + (None,)
+        records, page_count = dashboard_data_reader.get_experiments_page(
+            page_current, page_size, sort_by, filter_query
+        )
+        open_empty_project_modal = len(records) == 0 and not filter_query
+        return (
+            records,
+            page_count,
+            selected_rows_of(records, selected_ids),
+            dash.no_update,
+            open_empty_project_modal,
+            None,  # <- cancels active_cell!
+        )
+
+    def patch_changed_experiments(
+        page_current, page_size, sort_by, filter_query, data, cursor, selected_ids
+    ):
+        """Patches the rows of experiments that were saved or ended since the last
+        refresh, instead of reloading the whole page"""
+        if cursor is None:
+            cursor = dashboard_data_reader.get_experiments_cursor()
+            return (dash.no_update,) * 3 + (cursor,) + (dash.no_update,) * 2
+        records, cursor = dashboard_data_reader.get_changed_experiments(cursor)
+        if len(records) == 0:
+            return (dash.no_update,) * 3 + (cursor,) + (dash.no_update,) * 2
+        patch = dash.Patch()
+        row_index_by_id = {row["id"]: i for i, row in enumerate(data)}
+        new_records = []
+        for record in records:
+            if record["id"] in row_index_by_id:
+                patch[row_index_by_id[record["id"]]] = record
+            else:
+                new_records.append(record)
+        selected_rows = dash.no_update
+        page_count = dash.no_update
+        if new_records:
+            # new experiments are only shown in the default view of the table (the
+            # newest experiments first). In other views they are read when the user
+            # pages, sorts or filters the table:
+            if page_current == 0 and not sort_by and not filter_query:
+                for record in reversed(new_records):
+                    patch.insert(0, record)
+                rows = (new_records + data)[:page_size]
+                for _ in range(len(new_records) + len(data) - len(rows)):
+                    del patch[page_size]
+                selected_rows = selected_rows_of(rows, selected_ids)
+            _, page_count = dashboard_data_reader.get_experiments_page(
+                0, page_size, sort_by, filter_query
+            )
+        return patch, page_count, selected_rows, cursor, False, dash.no_update
+
+    def patch_favorite_by_active_cell(active_cell, data):
         exp_id = active_cell["row_id"]
-        record = [record for record in data if record["id"] == exp_id][0]
-        if record["favorite"] == FAVORITE_TRUE:
-            dashboard_data_reader.update_experiment_favorite(exp_id, False)
-        else:
-            dashboard_data_reader.update_experiment_favorite(exp_id, True)
+        row_index = [row["id"] for row in data].index(exp_id)
+        favorite = data[row_index]["favorite"] != FAVORITE_TRUE
+        dashboard_data_reader.update_experiment_favorite(exp_id, favorite)
+        patch = dash.Patch()
+        patch[row_index]["favorite"] = FAVORITE_TRUE if favorite else FAVORITE_FALSE
+        return (
+            patch,
+            dash.no_update,
+            dash.no_update,
+            dash.no_update,
+            dash.no_update,
+            None,  # <- cancels active_cell!
+        )
+
+    @app.callback(
+        Output("selected-experiment-ids", "data"),
+        Input("experiments-table", "selected_row_ids"),
+        State("experiments-table", "data"),
+        State("selected-experiment-ids", "data"),
+    )
+    def update_selected_experiment_ids(selected_row_ids, data, selected_ids):
+        """Keeps the ids of the selected experiments across pages of the table"""
+        page_ids = {row["id"] for row in data or []}
+        selected_in_other_pages = [
+            exp_id for exp_id in selected_ids or [] if exp_id not in page_ids
+        ]
+        return selected_in_other_pages + list(selected_row_ids or [])
 
     @app.callback(
         Output("failed-plotting-alert", "is_open"),
@@ -70,28 +184,26 @@ def register_callbacks(app, dashboard_data_reader):
     @app.callback(
         Output("plot-tabs", "children"),
         Output("figures-by-key", "data"),
-        Output("prev-selected-rows", "data"),
+        Output("prev-selected-experiment-ids", "data"),
         Output("failed-plotting-alert", "children"),
         Output("add-button", "disabled"),
-        Input("experiments-table", "selected_rows"),
-        State("experiments-table", "data"),
+        Input("selected-experiment-ids", "data"),
         State("figures-by-key", "data"),
-        State("prev-selected-rows", "data"),
+        State("prev-selected-experiment-ids", "data"),
     )
     def render_plot_tabs_from_selected_experiments_table_rows(
-        selected_rows, data, figures_by_key, prev_selected_rows
+        selected_ids, figures_by_key, prev_selected_ids
     ):
         result = []
         figures_by_key = figures_by_key or {}
-        selected_rows = selected_rows or {}
-        prev_selected_rows = prev_selected_rows or {}
+        selected_ids = selected_ids or []
+        prev_selected_ids = prev_selected_ids or []
         alert_text = ""
-        added_row = get_added_row(prev_selected_rows, selected_rows)
+        added_id = get_added_row(prev_selected_ids, selected_ids)
         add_button_disabled = False
-        if data and selected_rows:
-            for row_num in selected_rows:
-                alert_on_fail = row_num == added_row
-                exp_id = data[row_num]["id"]
+        if selected_ids:
+            for exp_id in selected_ids:
+                alert_on_fail = exp_id == added_id
                 try:
                     plots_and_figures = dashboard_data_reader.get_plot_and_figure_data(
                         exp_id
@@ -131,7 +243,7 @@ def register_callbacks(app, dashboard_data_reader):
         return (
             result,
             figures_by_key,
-            selected_rows,
+            selected_ids,
             alert_text,
             add_button_disabled,
         )
@@ -187,7 +299,10 @@ def register_callbacks(app, dashboard_data_reader):
             key = f"{figure_rec.experiment_id}/{figure_rec.id}/f"
             name = f"Figure {key[:-2]}"
             figure = figure_rec.figure
-        figure.update_layout(dark_plot_layout)
+        # copies the figure, so that cached figures are not changed:
+        figure = downsample_figure(figure)
+        # uirevision keeps the zoom when the data is re-fetched on zoom:
+        figure.update_layout(dark_plot_layout, uirevision=key)
         figures_by_key[key] = dict(figure=figure, color=color)
         return build_plot_tab(figure, name, key), figures_by_key
 
@@ -195,12 +310,47 @@ def register_callbacks(app, dashboard_data_reader):
         plot_figure: go.Figure, plot_name: str, plot_key: str
     ) -> dbc.Tab:
         return dbc.Tab(
-            dcc.Graph(figure=plot_figure, responsive=True),
+            dcc.Graph(
+                id={"type": "plot-graph", "index": plot_key},
+                figure=plot_figure,
+                responsive=True,
+            ),
             label=plot_name,
             id=f"plot-tab-{plot_key}",
             tab_id=f"plot-tab-{plot_key}",
         )
 
+    @app.callback(
+        Output({"type": "plot-graph", "index": MATCH}, "figure"),
+        Input({"type": "plot-graph", "index": MATCH}, "relayoutData"),
+        prevent_initial_call=True,
+    )
+    def refetch_downsampled_traces_on_zoom(relayout_data):
+        """When a plot with downsampled traces is zoomed in, re-plots the zoomed-in
+        window from the full-resolution data (downsampled again if needed). When the
+        zoom is reset, re-plots the whole trace"""
+        x_range = _x_range_from(relayout_data)
+        exp_id, plot_or_figure_id, kind = dash.ctx.triggered_id["index"].split("/")
+        traces = dashboard_data_reader.get_full_resolution_traces(
+            int(exp_id), int(plot_or_figure_id), kind == "f"
+        )
+        max_points = max_points_setting()
+        patch = dash.Patch()
+        patched = False
+        for i, xy in enumerate(traces):
+            if xy is None or len(xy[1]) <= max_points:
+                continue  # the trace is not downsampled
+            if x_range is not None and xy[0].dtype.kind not in "biuf":
+                continue  # zoomed-in windows are only re-plotted for numeric x
+            x, y = window(*xy, x_range)
+            indices = downsample(x, y, max_points)
+            patch["data"][i]["x"] = x[indices]
+            patch["data"][i]["y"] = y[indices]
+            patched = True
+        if not patched:
+            raise PreventUpdate
+        return patch
+
     @app.callback(
         Output("plot-keys-to-combine", "data"),
         Input("add-button", "n_clicks"),
@@ -307,6 +457,23 @@ def register_callbacks(app, dashboard_data_reader):
         return _copy_aggregate_data_to_clipboard_as_python_code(_, figure)
 
 
+def _x_range_from(relayout_data: Optional[Dict]) -> Optional[Tuple[float, float]]:
+    """Returns the x-axis range of a zoomed-in graph, or None if the zoom was reset.
+    Raises PreventUpdate if the x-axis was not changed"""
+    relayout_data = relayout_data or {}
+    if "xaxis.range[0]" in relayout_data and "xaxis.range[1]" in relayout_data:
+        return relayout_data["xaxis.range[0]"], relayout_data["xaxis.range[1]"]
+    if "xaxis.range" in relayout_data:
+        return tuple(relayout_data["xaxis.range"])
+    if relayout_data.get("xaxis.autorange"):
+        return None
+    raise PreventUpdate
+
+
+def selected_rows_of(rows: List[Dict], selected_ids: List[int]) -> List[int]:
+    return [i for i, row in enumerate(rows) if row["id"] in selected_ids]
+
+
 def get_added_row(prev: List[int], curr: List[int]) -> Optional[int]:
     added_rows = list(set(curr) - set(prev))
     if len(added_rows) != 0:
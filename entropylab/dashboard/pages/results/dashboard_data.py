@@ -1,18 +1,84 @@
 from __future__ import annotations
 
 import abc
-from typing import List, Dict
+import re
+from math import ceil
+from typing import List, Dict, Optional, Tuple, Any
 
+import numpy as np
 import pandas as pd
+from plotly import graph_objects as go
+from sqlalchemy import select, func, or_, and_, cast, case, String
 
 from entropylab import SqlAlchemyDB
-from entropylab.dashboard.pages.results.auto_plot import auto_plot
-from entropylab.logger import logger
+from entropylab.config import settings
+from entropylab.pipeline.api.auto_plot import (
+    auto_plot,
+    auto_plot_xy,
+    AUTO_PLOT_META_KEY,
+)
+from entropylab.pipeline.api.downsampling import per_point_values_of, xy_of
+from entropylab.dashboard.pages.results.figure_cache import (
+    FigureCache,
+    _DEFAULT_FIGURE_CACHE_SIZE,
+)
 from entropylab.pipeline.api.data_reader import PlotRecord, FigureRecord
+from entropylab.pipeline.results_backend.sqlalchemy.model import (
+    ExperimentTable,
+    PlotTable,
+    FigureTable,
+)
 
 FAVORITE_TRUE = "⭐"
 FAVORITE_FALSE = "✰"
 MAX_EXPERIMENTS_NUM = 10000
+EXPERIMENTS_PAGE_SIZE = 50
+
+_EXPERIMENT_COLUMNS = {
+    column.name: column
+    for column in [
+        ExperimentTable.id,
+        ExperimentTable.label,
+        ExperimentTable.start_time,
+        ExperimentTable.end_time,
+        ExperimentTable.user,
+        ExperimentTable.success,
+        ExperimentTable.favorite,
+    ]
+}
+
+# DataTable filter operators (see https://dash.plotly.com/datatable/filtering).
+# Comparison values are converted to the type of the column, while text matching is
+# done on the text value of the column:
+_FILTER_OPERATORS = {
+    "ge": lambda column, value: column >= _typed(column, value),
+    "le": lambda column, value: column <= _typed(column, value),
+    "lt": lambda column, value: column < _typed(column, value),
+    "gt": lambda column, value: column > _typed(column, value),
+    "ne": lambda column, value: column != _typed(column, value),
+    "eq": lambda column, value: column == _typed(column, value),
+    "contains": lambda column, value: _text_of(column).contains(value),
+    "datestartswith": lambda column, value: _text_of(column).startswith(value),
+}
+_FILTER_OPERATOR_SYMBOLS = {
+    ">=": "ge",
+    "<=": "le",
+    "<": "lt",
+    ">": "gt",
+    "!=": "ne",
+    "=": "eq",
+}
+
+# a filter expression of the DataTable: a {column} token, then an operator (a
+# symbol, or a word followed by whitespace), then a quoted or unquoted value that
+# ends at the next && (as in Dash's filter grammar):
+_FILTER_EXPRESSION = re.compile(
+    r"\s*\{(?P<column>[^}]*)\}\s*"
+    r"(?P<operator>>=|<=|!=|<|>|=|(?:" + "|".join(_FILTER_OPERATORS) + r")(?=\s))\s*"
+    r"(?P<value>(?P<quote>[\"'`])(?:\\.|(?!(?P=quote)).)*(?P=quote)|.*?)"
+    r"\s*(?:&&|$)",
+    re.DOTALL,
+)
 
 
 class DashboardDataReader(abc.ABC):
@@ -24,10 +90,34 @@ class DashboardDataReader(abc.ABC):
     ) -> List[Dict]:
         pass
 
+    @abc.abstractmethod
+    def get_experiments_page(
+        self,
+        page_current: int,
+        page_size: int = EXPERIMENTS_PAGE_SIZE,
+        sort_by: Optional[List[Dict]] = None,
+        filter_query: Optional[str] = None,
+    ) -> Tuple[List[Dict], int]:
+        pass
+
+    @abc.abstractmethod
+    def get_experiments_cursor(self) -> Dict:
+        pass
+
+    @abc.abstractmethod
+    def get_changed_experiments(self, cursor: Dict) -> Tuple[List[Dict], Dict]:
+        pass
+
     @abc.abstractmethod
     def get_plot_and_figure_data(self, exp_id: int) -> List[PlotRecord]:
         pass
 
+    @abc.abstractmethod
+    def get_full_resolution_traces(
+        self, exp_id: int, plot_or_figure_id: int, is_figure: bool
+    ) -> List[Optional[Tuple[np.ndarray, np.ndarray]]]:
+        pass
+
 
 class DashboardDataWriter(abc.ABC):
     @abc.abstractmethod
@@ -36,10 +126,22 @@ class DashboardDataWriter(abc.ABC):
 
 
 class SqlalchemyDashboardDataReader(DashboardDataReader, DashboardDataWriter):
-    def __init__(self, connector: SqlAlchemyDB) -> None:
+    def __init__(
+        self, connector: SqlAlchemyDB, figure_cache_size: Optional[int] = None
+    ) -> None:
+        """
+        :param connector: the database to read from
+        :param figure_cache_size: maximal size (in bytes) of the plots and figures
+                 cached by the reader. Overrides the `dashboard.figure_cache_size`
+                 config setting.
+        """
         super().__init__()
         self._db: SqlAlchemyDB = connector
-        self._figures_cache = {}
+        if figure_cache_size is None:
+            figure_cache_size = settings.get(
+                "dashboard.figure_cache_size", _DEFAULT_FIGURE_CACHE_SIZE
+            )
+        self._figures_cache = FigureCache(figure_cache_size)
 
     def get_last_experiments(
         self,
@@ -47,17 +149,94 @@ class SqlalchemyDashboardDataReader(DashboardDataReader, DashboardDataWriter):
         success: bool = None,
     ) -> List[Dict]:
         experiments = self._db.get_last_experiments(max_num_of_experiments, success)
-        experiments["favorite"] = experiments["favorite"].apply(
-            lambda x: FAVORITE_TRUE if x else FAVORITE_FALSE
+        return _to_records(experiments)
+
+    def get_experiments_page(
+        self,
+        page_current: int,
+        page_size: int = EXPERIMENTS_PAGE_SIZE,
+        sort_by: Optional[List[Dict]] = None,
+        filter_query: Optional[str] = None,
+    ) -> Tuple[List[Dict], int]:
+        """Reads one page of the experiments table, for server-side paging, sorting
+        and filtering of the table (see https://dash.plotly.com/datatable/callbacks)
+
+        The table may be sorted by any column and jump to any page, so pages are
+        read by offset. DataReader.get_experiments_page() pages by id instead, for
+        readers that walk the experiments in order.
+
+        :param page_current: the index of the page to read
+        :param page_size: the number of experiments in a page
+        :param sort_by: the sort_by property of the DataTable
+        :param filter_query: the filter_query property of the DataTable
+        :return: the experiment records in the page, and the number of pages"""
+        conditions = _filter_conditions(filter_query)
+        order_by = [
+            _EXPERIMENT_COLUMNS[column["column_id"]].asc()
+            if column["direction"] == "asc"
+            else _EXPERIMENT_COLUMNS[column["column_id"]].desc()
+            for column in sort_by or []
+            if column["column_id"] in _EXPERIMENT_COLUMNS
+        ]
+        query = (
+            select(*_EXPERIMENT_COLUMNS.values())
+            .where(*conditions)
+            .order_by(*order_by, ExperimentTable.id.desc())
+            .offset(page_current * page_size)
+            .limit(page_size)
+        )
+        experiments = self._db.custom_query(query)
+        count = self._db.custom_query(
+            select(func.count(ExperimentTable.id)).where(*conditions)
+        ).iloc[0, 0]
+        return _to_records(experiments), max(1, ceil(count / page_size))
+
+    def get_experiments_cursor(self) -> Dict:
+        """Returns the current position of the experiments change feed. Pass it to
+        get_changed_experiments() to read the experiments that changed since"""
+        last_id = self._db.custom_query(select(func.max(ExperimentTable.id))).iloc[0, 0]
+        running = self._db.custom_query(
+            select(ExperimentTable.id).where(ExperimentTable.end_time.is_(None))
         )
-        experiments["start_time"] = pd.DatetimeIndex(
-            experiments["start_time"]
-        ).strftime("%Y-%m-%d %H:%M:%S")
-        experiments["end_time"] = pd.DatetimeIndex(experiments["end_time"]).strftime(
-            "%Y-%m-%d %H:%M:%S"
+        return dict(
+            last_id=0 if pd.isna(last_id) else int(last_id),
+            running_ids=[int(_id) for _id in running["id"]],
         )
-        records = experiments.to_dict("records")
-        return records
+
+    def get_changed_experiments(self, cursor: Dict) -> Tuple[List[Dict], Dict]:
+        """Reads the experiments that were saved, or that ended, since the given
+        position of the experiments change feed. Reading costs the same regardless of
+        the number of experiments in the project.
+
+        :param cursor: a position returned by get_experiments_cursor() or by a
+        previous call to this method
+        :return: the changed experiment records (sorted desc by id), and the new
+        position of the change feed"""
+        condition = ExperimentTable.id > cursor["last_id"]
+        if cursor["running_ids"]:
+            condition = or_(
+                condition,
+                and_(
+                    ExperimentTable.id.in_(cursor["running_ids"]),
+                    ExperimentTable.end_time.is_not(None),
+                ),
+            )
+        experiments = self._db.custom_query(
+            select(*_EXPERIMENT_COLUMNS.values())
+            .where(condition)
+            .order_by(ExperimentTable.id.desc())
+        )
+        ended_ids = set(experiments["id"][experiments["end_time"].notna()])
+        new_running_ids = experiments["id"][
+            (experiments["id"] > cursor["last_id"]) & experiments["end_time"].isna()
+        ]
+        new_cursor = dict(
+            last_id=max([cursor["last_id"], *experiments["id"]]),
+            running_ids=[_id for _id in cursor["running_ids"] if _id not in ended_ids]
+            + [int(_id) for _id in new_running_ids],
+        )
+        new_cursor["last_id"] = int(new_cursor["last_id"])
+        return _to_records(experiments), new_cursor
 
     def get_last_result_of_experiment(
         self,
@@ -66,23 +245,172 @@ class SqlalchemyDashboardDataReader(DashboardDataReader, DashboardDataWriter):
         return self._db.get_last_result_of_experiment(experiment_id)
 
     def get_plot_and_figure_data(self, exp_id: int) -> List[PlotRecord | FigureRecord]:
+        version = self._figures_version_of(exp_id)
+        plots_and_figures = self._figures_cache.get(exp_id, version)
+        if plots_and_figures is not None:
+            return plots_and_figures
         plots = self._db.get_plots(exp_id)
-        if exp_id not in self._figures_cache:
-            logger.debug(f"Figures cache miss. exp_id=[{exp_id}]")
-            self._figures_cache[exp_id] = self._db.get_figures(exp_id)
-        else:
-            logger.debug(f"Figures cache hit. exp_id=[{exp_id}]")
-        figures = self._figures_cache[exp_id]
+        figures = self._db.get_figures(exp_id)
+        end_time = version[0] if version else None
         if len(plots) > 0 or len(figures) > 0:
-            return [*plots, *figures]
+            plots_and_figures = [*plots, *figures]
         else:
             # TODO: auto_plot to produce figures, not plots
             last_result = self._db.get_last_result_of_experiment(exp_id)
             if last_result is not None and last_result.data is not None:
-                plot = auto_plot(exp_id, last_result.data)
-                return [plot]
+                plots_and_figures = [auto_plot(exp_id, last_result.data)]
             else:
-                return []
+                plots_and_figures = []
+            if end_time is None:
+                # the last result of a running experiment changes without changing
+                # the version, so its auto-plot is not cached:
+                return plots_and_figures
+        if version is not None:
+            self._figures_cache.put(exp_id, version, plots_and_figures)
+        return plots_and_figures
+
+    def get_full_resolution_traces(
+        self, exp_id: int, plot_or_figure_id: int, is_figure: bool
+    ) -> List[Optional[Tuple[np.ndarray, np.ndarray]]]:
+        """Returns the full-resolution x and y values of the traces of a plot or
+        figure, for re-plotting windows of a downsampled plot when it is zoomed in.
+        The values of auto-plots are read from the last result of the experiment.
+
+        :param exp_id: the id of the experiment
+        :param plot_or_figure_id: the id of the plot or figure
+        :param is_figure: True for a figure, False for a (soon to be deprecated) plot
+        :return: (x, y) for each trace of the plot or figure, or None for traces
+                 that are not plots of x and y values (e.g. heatmaps), or that have
+                 properties with a value per point (e.g. marker.color), which are
+                 not re-plotted"""
+        for record in self.get_plot_and_figure_data(exp_id):
+            if (
+                isinstance(record, FigureRecord) == is_figure
+                and record.id == plot_or_figure_id
+            ):
+                break
+        else:
+            return []
+        if isinstance(record, FigureRecord):
+            meta = record.figure.layout.meta
+            if isinstance(meta, dict) and meta.get(AUTO_PLOT_META_KEY):
+                last_result = self._db.get_last_result_of_experiment(exp_id)
+                if last_result is None or last_result.data is None:
+                    return []
+                return [auto_plot_xy(last_result.data)]
+            figure = record.figure
+        else:
+            figure = go.Figure()
+            record.generator.plot_plotly(figure, record.plot_data)
+        return [_zoomable_xy_of(trace) for trace in figure.data]
+
+    def _figures_version_of(self, exp_id: int) -> Optional[Tuple]:
+        """Returns the end time and numbers of plots and figures of an experiment, or
+        None if the experiment does not exist. Cached plots and figures of the
+        experiment are valid as long as these do not change"""
+        plot_count = (
+            select(func.count(PlotTable.id))
+            .where(PlotTable.experiment_id == int(exp_id))
+            .scalar_subquery()
+        )
+        figure_count = (
+            select(func.count(FigureTable.id))
+            .where(FigureTable.experiment_id == int(exp_id))
+            .scalar_subquery()
+        )
+        versions = self._db.custom_query(
+            select(
+                ExperimentTable.end_time,
+                plot_count.label("plot_count"),
+                figure_count.label("figure_count"),
+            ).where(ExperimentTable.id == int(exp_id))
+        )
+        if versions.empty:
+            return None
+        end_time, plot_count, figure_count = versions.iloc[0]
+        return (
+            None if pd.isna(end_time) else pd.Timestamp(end_time),
+            int(plot_count),
+            int(figure_count),
+        )
 
     def update_experiment_favorite(self, experiment_id: int, favorite: bool) -> None:
         self._db.update_experiment_favorite(experiment_id, favorite)
+
+
+def _zoomable_xy_of(trace) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    xy = xy_of(trace)
+    if xy is not None and per_point_values_of(trace, len(xy[1])):
+        # re-plotting only x and y would mismatch the per-point values:
+        return None
+    return xy
+
+
+def _to_records(experiments: pd.DataFrame) -> List[Dict]:
+    experiments["favorite"] = experiments["favorite"].apply(
+        lambda x: FAVORITE_TRUE if x else FAVORITE_FALSE
+    )
+    experiments["start_time"] = pd.DatetimeIndex(experiments["start_time"]).strftime(
+        "%Y-%m-%d %H:%M:%S"
+    )
+    experiments["end_time"] = pd.DatetimeIndex(experiments["end_time"]).strftime(
+        "%Y-%m-%d %H:%M:%S"
+    )
+    return experiments.to_dict("records")
+
+
+def _filter_conditions(filter_query: Optional[str]) -> List:
+    """Translates the filter_query property of a DataTable to SQL conditions on the
+    Experiments table. Unsupported expressions are ignored"""
+    conditions = []
+    for column_id, operator_name, value in _parse_filter_query(filter_query or ""):
+        if column_id in _EXPERIMENT_COLUMNS:
+            to_condition = _FILTER_OPERATORS[operator_name]
+            conditions.append(to_condition(_EXPERIMENT_COLUMNS[column_id], value))
+    return conditions
+
+
+def _parse_filter_query(filter_query: str) -> List[Tuple[str, str, str]]:
+    """Splits the filter_query property of a DataTable to (column id, operator name,
+    value) expressions. The column token of each expression is parsed first, so
+    operators in values (e.g. "{label} contains a=b") are not mistaken for the
+    operator of the expression. Unsupported expressions are skipped"""
+    expressions = []
+    pos = 0
+    while pos < len(filter_query):
+        match = _FILTER_EXPRESSION.match(filter_query, pos)
+        if match is None:
+            # skips to the next expression:
+            end = filter_query.find("&&", pos)
+            if end == -1:
+                break
+            pos = end + 2
+            continue
+        operator_name = match["operator"]
+        operator_name = _FILTER_OPERATOR_SYMBOLS.get(operator_name, operator_name)
+        value = match["value"]
+        if match["quote"]:
+            value = value[1:-1].replace("\\" + match["quote"], match["quote"])
+        expressions.append((match["column"], operator_name, value))
+        pos = match.end()
+    return expressions
+
+
+def _typed(column, value: str) -> Any:
+    if column.name == "favorite":
+        return value == FAVORITE_TRUE
+    try:
+        if column.name == "id":
+            return int(value)
+        if column.name in ("start_time", "end_time"):
+            return pd.Timestamp(value).to_pydatetime()
+    except ValueError:
+        pass
+    return value
+
+
+def _text_of(column):
+    if column.name == "favorite":
+        # the favorite column is displayed as a star:
+        return case((column, FAVORITE_TRUE), else_=FAVORITE_FALSE)
+    return cast(column, String)
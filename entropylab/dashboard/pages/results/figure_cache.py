@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+from plotly import graph_objects as go
+
+from entropylab.logger import logger
+from entropylab.pipeline.api.data_reader import PlotRecord, FigureRecord
+
+_DEFAULT_FIGURE_CACHE_SIZE = 256 * 1024 * 1024
+
+
+class FigureCache:
+    """A least-recently-used cache of the plots and figures of experiments, bounded by
+    the estimated size (in bytes) of the cached plots and figures.
+
+    Each entry is stored with a version of the experiment it was read from (e.g. its
+    end time and number of figures). An entry is invalidated when it is read with a
+    different version."""
+
+    def __init__(self, max_bytes: int = _DEFAULT_FIGURE_CACHE_SIZE):
+        self._max_bytes = max_bytes
+        self._entries: Dict[int, Tuple[Hashable, List, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+        self, experiment_id: int, version: Hashable
+    ) -> Optional[List[PlotRecord | FigureRecord]]:
+        """Returns the cached plots and figures of an experiment, or None if they are
+        not in the cache or were cached with a different version"""
+        with self._lock:
+            entry = self._entries.get(experiment_id)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(experiment_id)
+                self.hits += 1
+                self._log("hit", experiment_id)
+                return entry[1]
+            if entry is not None:
+                self._remove(experiment_id)
+            self.misses += 1
+            self._log("miss", experiment_id)
+            return None
+
+    def put(
+        self,
+        experiment_id: int,
+        version: Hashable,
+        plots_and_figures: List[PlotRecord | FigureRecord],
+    ) -> None:
+        """Caches the plots and figures of an experiment, evicting the least recently
+        used entries if the cache is full. Plots and figures that are larger than the
+        cache itself are not cached"""
+        size = sum(_size_of(record) for record in plots_and_figures)
+        with self._lock:
+            if experiment_id in self._entries:
+                self._remove(experiment_id)
+            if size > self._max_bytes:
+                logger.debug(
+                    f"Figures of exp_id=[{experiment_id}] ({size} bytes) are too "
+                    f"large to cache"
+                )
+                return
+            self._entries[experiment_id] = (version, plots_and_figures, size)
+            self.size += size
+            while self.size > self._max_bytes:
+                evicted_id = next(iter(self._entries))
+                logger.debug(f"Evicting figures of exp_id=[{evicted_id}] from cache")
+                self._remove(evicted_id)
+
+    def invalidate(self, experiment_id: Optional[int] = None) -> None:
+        """Removes the plots and figures of an experiment from the cache
+
+        :param experiment_id: the id of the experiment. If None, the cache is
+                 cleared."""
+        with self._lock:
+            if experiment_id is None:
+                self._entries.clear()
+                self.size = 0
+            elif experiment_id in self._entries:
+                self._remove(experiment_id)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, experiment_id: int) -> None:
+        _, _, size = self._entries.pop(experiment_id)
+        self.size -= size
+
+    def _log(self, result: str, experiment_id: int) -> None:
+        logger.debug(
+            f"Figures cache {result}. exp_id=[{experiment_id}] hits=[{self.hits}] "
+            f"misses=[{self.misses}] entries=[{len(self._entries)}] "
+            f"bytes=[{self.size}]"
+        )
+
+
+def _size_of(record: PlotRecord | FigureRecord) -> int:
+    """Estimates the memory used by a plot or figure record"""
+    if isinstance(record, FigureRecord):
+        return _size_of_data(record.figure)
+    return _size_of_data(record.plot_data)
+
+
+def _size_of_data(data: Any) -> int:
+    if isinstance(data, go.Figure):
+        return _size_of_figure(data)
+    return _size_of_value(data)
+
+
+def _size_of_figure(figure: go.Figure) -> int:
+    """Estimates the size of a figure by the sizes of the arrays (and other values) of
+    its traces and layout, without serializing the figure"""
+    return sum(
+        _size_of_value(trace.to_plotly_json()) for trace in figure.data
+    ) + _size_of_value(figure.layout.to_plotly_json())
+
+
+def _size_of_value(value: Any) -> int:
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(_size_of_value(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        if len(value) > 0 and isinstance(value[0], (np.ndarray, dict, list, tuple)):
+            return sum(_size_of_value(item) for item in value)
+        return len(value) * 8  # a list of scalars
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, (int, float, complex, np.generic)) or value is None:
+        return 8
+    return sys.getsizeof(value)
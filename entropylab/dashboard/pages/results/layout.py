@@ -15,7 +15,7 @@ REFRESH_INTERVAL_IN_MILLIS = 3000
 
 
 def build_layout(path: str, dashboard_data_reader: DashboardDataReader):
-    records = dashboard_data_reader.get_last_experiments()
+    records, page_count = dashboard_data_reader.get_experiments_page(0)
 
     return (
         dbc.Container(
@@ -24,7 +24,9 @@ def build_layout(path: str, dashboard_data_reader: DashboardDataReader):
             children=[
                 dcc.Store(id="figures-by-key", storage_type="session"),
                 dcc.Store(id="plot-keys-to-combine", storage_type="session"),
-                dcc.Store(id="prev-selected-rows", storage_type="session"),
+                dcc.Store(id="selected-experiment-ids", storage_type="session"),
+                dcc.Store(id="prev-selected-experiment-ids", storage_type="session"),
+                dcc.Store(id="experiments-changes-cursor"),
                 dcc.Store(id="favorites", storage_type="session"),
                 dcc.Interval(
                     id="interval", interval=REFRESH_INTERVAL_IN_MILLIS, n_intervals=0
@@ -63,7 +65,7 @@ def build_layout(path: str, dashboard_data_reader: DashboardDataReader):
                         dbc.Col(
                             [
                                 html.H5("Experiments", id="experiments-title"),
-                                (table(records)),
+                                (table(records, page_count)),
                             ],
                             width="5",
                         ),
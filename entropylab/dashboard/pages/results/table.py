@@ -1,5 +1,6 @@
 from dash import dash_table
 
+from entropylab.dashboard.pages.results.dashboard_data import EXPERIMENTS_PAGE_SIZE
 from entropylab.dashboard.theme import (
     table_style_data,
     table_style_filter,
@@ -8,7 +9,7 @@ from entropylab.dashboard.theme import (
 )
 
 
-def table(records):
+def table(records, page_count):
     tbl = dash_table.DataTable(
         id="experiments-table",
         columns=[
@@ -24,8 +25,13 @@ def table(records):
         persistence_type="session",
         row_selectable="multi",
         cell_selectable=True,
-        sort_action="native",
-        filter_action="native",
+        # paged, sorted and filtered by the server (see callbacks.py):
+        page_action="custom",
+        page_current=0,
+        page_size=EXPERIMENTS_PAGE_SIZE,
+        page_count=page_count,
+        sort_action="custom",
+        filter_action="custom",
         style_data=table_style_data,
         style_filter=table_style_filter,
         style_header=table_style_header,
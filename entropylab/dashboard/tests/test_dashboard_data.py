@@ -0,0 +1,194 @@
+from datetime import datetime
+
+import pytest
+from plotly import express as px
+
+from entropylab import SqlAlchemyDB, RawResultData
+from entropylab.dashboard.pages.results.dashboard_data import (
+    SqlalchemyDashboardDataReader,
+    FAVORITE_TRUE,
+)
+from entropylab.pipeline.api.data_writer import ExperimentInitialData, ExperimentEndData
+
+
+def save_experiment(db, label="foo", ended=True) -> int:
+    experiment_id = db.save_experiment_initial_data(
+        ExperimentInitialData(label, "user", "", "", datetime.now(), "")
+    )
+    if ended:
+        db.save_experiment_end_data(
+            experiment_id, ExperimentEndData(datetime.now(), True)
+        )
+    return experiment_id
+
+
+@pytest.fixture
+def db() -> SqlAlchemyDB:
+    db = SqlAlchemyDB()
+    for i in range(5):
+        save_experiment(db, label=f"label{i % 2}")
+    return db
+
+
+def test_get_experiments_page_reads_page_newest_first(db):
+    # arrange
+    target = SqlalchemyDashboardDataReader(db)
+    # act
+    records, page_count = target.get_experiments_page(1, page_size=2)
+    # assert
+    assert [record["id"] for record in records] == [3, 2]
+    assert page_count == 3
+
+
+@pytest.mark.parametrize(
+    "filter_query, expected_ids",
+    [
+        ("{label} contains label1", [4, 2]),
+        ("{id} > 3", [5, 4]),
+        ("{id} ge 2 && {label} eq label0", [5, 3]),
+        (f"{{favorite}} contains {FAVORITE_TRUE}", [1]),
+        ("{start_time} datestartswith 2000", []),
+        ("{unknown} eq 1", [5, 4, 3, 2, 1]),
+    ],
+)
+def test_get_experiments_page_filters_experiments(db, filter_query, expected_ids):
+    # arrange
+    db.update_experiment_favorite(1, True)
+    target = SqlalchemyDashboardDataReader(db)
+    # act
+    records, _ = target.get_experiments_page(0, filter_query=filter_query)
+    # assert
+    assert [record["id"] for record in records] == expected_ids
+
+
+@pytest.mark.parametrize(
+    "filter_query, expected_ids",
+    [
+        ("{label} contains a=b", [6]),
+        ("{label} eq 'a<b'", [7]),
+        ("{label} contains contains", [8]),
+        ('{label} = "x && y" && {id} >= 2', [9]),
+    ],
+)
+def test_get_experiments_page_when_value_contains_operator_then_it_is_filtered_by(
+    db, filter_query, expected_ids
+):
+    # arrange
+    for label in ["a=b", "a<b", "contains", "x && y"]:
+        save_experiment(db, label=label)
+    target = SqlalchemyDashboardDataReader(db)
+    # act
+    records, _ = target.get_experiments_page(0, filter_query=filter_query)
+    # assert
+    assert [record["id"] for record in records] == expected_ids
+
+
+def test_get_experiments_page_sorts_experiments(db):
+    # arrange
+    target = SqlalchemyDashboardDataReader(db)
+    sort_by = [dict(column_id="label", direction="asc")]
+    # act
+    records, _ = target.get_experiments_page(0, sort_by=sort_by)
+    # assert
+    assert [record["id"] for record in records] == [5, 3, 1, 4, 2]
+
+
+def test_get_changed_experiments_reads_new_and_ended_experiments(db):
+    # arrange
+    running_id = save_experiment(db, ended=False)
+    target = SqlalchemyDashboardDataReader(db)
+    cursor = target.get_experiments_cursor()
+    new_id = save_experiment(db)
+    db.save_experiment_end_data(running_id, ExperimentEndData(datetime.now(), True))
+    # act
+    records, cursor = target.get_changed_experiments(cursor)
+    # assert
+    assert [record["id"] for record in records] == [new_id, running_id]
+    assert cursor == dict(last_id=new_id, running_ids=[])
+
+
+def test_get_changed_experiments_when_nothing_changed_then_reads_nothing(db):
+    # arrange
+    save_experiment(db, ended=False)
+    target = SqlalchemyDashboardDataReader(db)
+    cursor = target.get_experiments_cursor()
+    # act
+    records, new_cursor = target.get_changed_experiments(cursor)
+    # assert
+    assert records == []
+    assert new_cursor == cursor
+
+
+def test_get_plot_and_figure_data_when_figure_added_then_cache_is_invalidated(db):
+    # arrange
+    experiment_id = save_experiment(db, ended=False)
+    db.save_figure(experiment_id, px.line(x=[1, 2], y=[3, 4]))
+    target = SqlalchemyDashboardDataReader(db)
+    target.get_plot_and_figure_data(experiment_id)
+    db.save_figure(experiment_id, px.line(x=[1, 2], y=[5, 6]))
+    # act
+    actual = target.get_plot_and_figure_data(experiment_id)
+    # assert
+    assert len(actual) == 2
+
+
+def test_get_plot_and_figure_data_when_experiment_ended_then_reads_from_cache(db):
+    # arrange
+    db.save_figure(1, px.line(x=[1, 2], y=[3, 4]))
+    target = SqlalchemyDashboardDataReader(db)
+    first = target.get_plot_and_figure_data(1)
+    # act
+    actual = target.get_plot_and_figure_data(1)
+    # assert
+    assert actual is first
+    assert target._figures_cache.hits == 1
+
+
+def test_get_plot_and_figure_data_when_running_then_auto_plot_is_not_cached(db):
+    # arrange
+    experiment_id = save_experiment(db, ended=False)
+    db.save_result(experiment_id, RawResultData(label="foo", data=[1, 2, 3]))
+    target = SqlalchemyDashboardDataReader(db)
+    target.get_plot_and_figure_data(experiment_id)
+    # act
+    target.get_plot_and_figure_data(experiment_id)
+    # assert
+    assert target._figures_cache.hits == 0
+
+
+def test_get_full_resolution_traces_of_auto_plot_reads_last_result(db):
+    # arrange
+    experiment_id = save_experiment(db, ended=False)
+    db.save_result(experiment_id, RawResultData(label="foo", data=list(range(10000))))
+    target = SqlalchemyDashboardDataReader(db)
+    auto_plot_record = target.get_plot_and_figure_data(experiment_id)[0]
+    # act
+    actual = target.get_full_resolution_traces(
+        experiment_id, auto_plot_record.id, is_figure=True
+    )
+    # assert
+    assert len(actual) == 1
+    x, y = actual[0]
+    assert len(x) == len(y) == 10000
+
+
+def test_get_full_resolution_traces_of_figure_reads_figure(db):
+    # arrange
+    db.save_figure(1, px.line(x=[1, 2, 3], y=[4, 5, 6]))
+    target = SqlalchemyDashboardDataReader(db)
+    figure_record = target.get_plot_and_figure_data(1)[0]
+    # act
+    actual = target.get_full_resolution_traces(1, figure_record.id, is_figure=True)
+    # assert
+    assert actual[0][1].tolist() == [4, 5, 6]
+
+
+def test_get_full_resolution_traces_when_trace_has_per_point_colors_then_none(db):
+    # arrange
+    db.save_figure(1, px.scatter(x=[1, 2, 3], y=[4, 5, 6], color=[7, 8, 9]))
+    target = SqlalchemyDashboardDataReader(db)
+    figure_record = target.get_plot_and_figure_data(1)[0]
+    # act
+    actual = target.get_full_resolution_traces(1, figure_record.id, is_figure=True)
+    # assert
+    assert actual == [None]
@@ -0,0 +1,104 @@
+import pickle
+from datetime import datetime
+
+import numpy as np
+import pytest
+from plotly import graph_objects as go
+
+from entropylab.dashboard.pages.results.figure_cache import FigureCache
+from entropylab.pipeline.api.data_reader import PlotRecord, FigureRecord
+
+
+def a_plot(experiment_id: int, size: int) -> PlotRecord:
+    return PlotRecord(experiment_id, 0, plot_data=np.zeros(size, dtype=np.uint8))
+
+
+def test_get_when_version_matches_then_hit():
+    # arrange
+    target = FigureCache(max_bytes=1000)
+    plots = [a_plot(1, 100)]
+    target.put(1, (None, 1), plots)
+    # act
+    actual = target.get(1, (None, 1))
+    # assert
+    assert actual == plots
+    assert (target.hits, target.misses) == (1, 0)
+
+
+def test_get_when_version_changed_then_miss_and_entry_is_removed():
+    # arrange
+    target = FigureCache(max_bytes=1000)
+    target.put(1, (None, 1), [a_plot(1, 100)])
+    # act
+    actual = target.get(1, (datetime.now(), 1))
+    # assert
+    assert actual is None
+    assert target.misses == 1
+    assert len(target) == 0
+    assert target.size == 0
+
+
+def test_put_when_full_then_least_recently_used_entry_is_evicted():
+    # arrange
+    target = FigureCache(max_bytes=250)
+    target.put(1, 1, [a_plot(1, 100)])
+    target.put(2, 1, [a_plot(2, 100)])
+    target.get(1, 1)
+    # act
+    target.put(3, 1, [a_plot(3, 100)])
+    # assert
+    assert target.get(1, 1) is not None
+    assert target.get(2, 1) is None
+    assert target.get(3, 1) is not None
+    assert target.size == 200
+
+
+def test_put_when_larger_than_cache_then_not_cached():
+    # arrange
+    target = FigureCache(max_bytes=50)
+    # act
+    target.put(1, 1, [a_plot(1, 100)])
+    # assert
+    assert len(target) == 0
+
+
+def test_invalidate_removes_entry():
+    # arrange
+    target = FigureCache(max_bytes=1000)
+    target.put(1, 1, [a_plot(1, 100)])
+    target.put(2, 1, [a_plot(2, 100)])
+    # act
+    target.invalidate(1)
+    # assert
+    assert target.get(1, 1) is None
+    assert target.get(2, 1) is not None
+    assert target.size == 100
+
+
+def test_put_when_figure_then_size_is_estimated_from_its_arrays(monkeypatch):
+    # arrange
+    target = FigureCache(max_bytes=10_000_000)
+    figure = go.Figure(go.Scatter(x=np.arange(1000.0), y=np.zeros(1000)))
+    record = FigureRecord(1, 0, figure, datetime.now())
+    monkeypatch.setattr(
+        go.Figure, "to_json", lambda self: pytest.fail("figure was serialized")
+    )
+    # act
+    target.put(1, 1, [record])
+    # assert
+    assert 16_000 <= target.size < 20_000
+
+
+def test_put_when_plot_data_is_lists_then_size_is_estimated_from_their_lengths(
+    monkeypatch,
+):
+    # arrange
+    target = FigureCache(max_bytes=10_000_000)
+    record = PlotRecord(1, 0, plot_data=[list(range(1000)), np.zeros(1000)])
+    monkeypatch.setattr(
+        pickle, "dumps", lambda *args, **kwargs: pytest.fail("data was pickled")
+    )
+    # act
+    target.put(1, 1, [record])
+    # assert
+    assert target.size == 16_000
@@ -0,0 +1,168 @@
+from datetime import datetime
+from typing import List, Dict, NamedTuple, Optional, Tuple, Union
+
+import h5py
+import numpy as np
+from plotly import express as px
+
+from entropylab.pipeline.api.downsampling import (
+    downsample,
+    downsample_2d,
+    max_points_setting,
+)
+from entropylab.pipeline.api.data_reader import FigureRecord
+from entropylab.pipeline.api.errors import EntropyError
+
+# key in the layout.meta of auto-plot figures, marking them as plots of the last
+# result of their experiment (see get_full_resolution_traces() in dashboard_data.py):
+AUTO_PLOT_META_KEY = "entropylab_auto_plot"
+
+# dtype kinds of real numbers (see numpy.dtype.kind):
+_REAL_NUMBER_KINDS = "iuf"
+
+
+class _XY(NamedTuple):
+    x: np.ndarray
+    y: np.ndarray
+
+
+def auto_plot(
+    experiment_id: int, data, max_points: Optional[int] = None
+) -> FigureRecord:
+    """Plots data as a scatter plot or as an image, depending on its shape. Traces
+    with more than max_points points are downsampled
+
+    :param experiment_id: the id of the experiment the data belongs to
+    :param data: the data to plot
+    :param max_points: maximal number of points (or pixels) to plot. Overrides the
+             `plot.max_points` config setting."""
+    if max_points is None:
+        max_points = max_points_setting()
+    values = _values_from(data)
+    if isinstance(values, _XY):
+        indices = downsample(values.x, values.y, max_points)
+        figure = px.scatter(x=values.x[indices], y=values.y[indices])
+    else:
+        figure = px.imshow(downsample_2d(values, max_points))
+    figure.update_layout(meta={AUTO_PLOT_META_KEY: True})
+    return FigureRecord(
+        experiment_id=experiment_id, id=0, figure=figure, time=datetime.now()
+    )
+
+
+def auto_plot_xy(data) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """Returns the full-resolution x and y values of the auto-plot of data, or None
+    if data is auto-plotted as an image"""
+    values = _values_from(data)
+    return tuple(values) if isinstance(values, _XY) else None
+
+
+def _values_from(data) -> Union[_XY, np.ndarray]:
+    if isinstance(data, dict):
+        return _values_from_dict(data)
+    elif isinstance(data, list):
+        return _values_from_list(data)
+    elif isinstance(data, (np.ndarray, h5py.Dataset)) or _is_array_like(data):
+        return _values_from_ndarray(data)
+    elif isinstance(data, int) or isinstance(data, float):
+        return _values_from_list([data])
+    else:
+        raise EntropyError(
+            "Only lists, dicts and ndarrays can be auto-plotted at this time"
+        )
+
+
+def _is_array_like(data) -> bool:
+    """e.g. LazyHDF5Array views of results that are read from HDF5 files"""
+    return all(hasattr(data, name) for name in ("shape", "dtype", "__getitem__"))
+
+
+def _values_from_dict(data: Dict) -> Union[_XY, np.ndarray]:
+    if len(data) > 0:
+        first = list(data.values())[0]  # arbitrarily plot "first" value
+        return _values_from(first)
+    else:
+        raise EntropyError("Cannot auto-plot an empty dict")
+
+
+def _values_from_list(data: List) -> Union[_XY, np.ndarray]:
+    if not data:
+        raise EntropyError("Cannot auto-plot None")
+    if len(data) == 0:
+        raise EntropyError("Cannot auto-plot an empty list")
+    if _list_is_all_numeric(data):
+        return _xy_from_list(data)
+    elif _list_contains_one_list_of_scalars(data):
+        return _xy_from_list(data[0])
+    elif _list_contains_two_lists_of_equal_lengths(data):
+        return _XY(np.asarray(data[0]), np.asarray(data[1]))
+    else:
+        return _image_from_2d(data)
+
+
+def _values_from_ndarray(
+    array: Union[np.ndarray, h5py.Dataset]
+) -> Union[_XY, np.ndarray, h5py.Dataset]:
+    """Auto-plots an ndarray (or an HDF5 dataset) by its dtype and shape only, so
+    that its values are not read (or copied) before they are plotted. HDF5 datasets
+    are read lazily - only the rows (or the strided pixels) that are plotted"""
+    if array.size == 0:
+        raise EntropyError("Cannot auto-plot an empty ndarray")
+    if array.dtype.kind not in _REAL_NUMBER_KINDS:
+        raise EntropyError("Cannot auto-plot a non-numeric ndarray")
+    if array.ndim <= 1:
+        return _xy_from_list(np.atleast_1d(np.asarray(array)))
+    elif array.ndim == 2 and array.shape[0] == 1:
+        return _xy_from_list(array[0])
+    elif array.ndim == 2 and array.shape[0] == 2:
+        return _XY(np.asarray(array[0]), np.asarray(array[1]))
+    else:
+        return array
+
+
+# List helper functions
+
+
+def _is_numeric(first):
+    return isinstance(first, int) or isinstance(first, float)
+
+
+def _list_is_all_numeric(lst):
+    return len(lst) > 0 and all(_is_numeric(x) for x in lst)
+
+
+def _is_all_lists(lst):
+    return all(isinstance(x, List) for x in lst)
+
+
+def _list_contains_two_lists_of_equal_lengths(data):
+    if not _is_all_lists(data):
+        raise EntropyError("Auto-plot does not support mixed types")
+    if len(data) > 2:
+        return False
+    if not len(data[0]) == len(data[1]):
+        raise EntropyError("Cannot auto-plot 2 sub-lists of unequal lengths")
+    if len(data[0]) == 0:
+        raise EntropyError("Cannot auto-plot 2 empty sub-lists")
+    return True
+
+
+def _list_contains_one_list_of_scalars(data):
+    return (
+        len(data) == 1 and isinstance(data[0], list) and _list_is_all_numeric(data[0])
+    )
+
+
+# helper functions for plotting
+
+
+def _xy_from_list(lst) -> _XY:
+    y = np.asarray(lst)
+    return _XY(np.arange(len(y)), y)
+
+
+def _image_from_2d(data) -> np.ndarray:
+    try:
+        return np.asarray(data)
+    except ValueError as e:
+        raise EntropyError("Cannot auto-plot lists of unequal lengths") from e
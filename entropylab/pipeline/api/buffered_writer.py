@@ -0,0 +1,217 @@
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Iterable
+
+from pandas import DataFrame
+from plotly import graph_objects as go
+
+from entropylab.logger import logger
+from entropylab.pipeline.api.data_reader import (
+    DataReader,
+    ExperimentRecord,
+    ExperimentsPage,
+    ResultRecord,
+    MetadataRecord,
+    DebugRecord,
+    PlotRecord,
+    FigureRecord,
+)
+from entropylab.pipeline.api.data_writer import (
+    DataWriter,
+    ExperimentInitialData,
+    ExperimentEndData,
+    RawResultData,
+    Metadata,
+    Debug,
+    PlotSpec,
+    NodeData,
+    _snapshot_of,
+)
+from entropylab.pipeline.api.errors import EntropyError
+
+
+class _Buffer:
+    """Entities of a single experiment that were not written yet"""
+
+    def __init__(self):
+        self.results: List[RawResultData] = []
+        self.metadata: List[Metadata] = []
+        self.nodes: List[NodeData] = []
+
+    def __len__(self):
+        return len(self.results) + len(self.metadata) + len(self.nodes)
+
+
+class BufferedDataWriter(DataWriter, DataReader):
+    """
+    Wraps a db and buffers the results, metadata and nodes that are saved to it in
+    memory, writing them to the wrapped db in batches. Useful when experiments save
+    results at a high rate, e.g. thousands of times per second. Pass it as the db
+    when running an experiment:
+
+        db = BufferedDataWriter(SqlAlchemyDB("my_project"))
+        Script(resources, my_script, "my experiment").run(db)
+
+    A batch is written when the number of buffered entities reaches max_items, when
+    max_delay seconds have passed since the last write (checked whenever an entity
+    is saved), and when the experiment ends. Reading from the db writes the buffered
+    entities first.
+
+    Note that errors in saving an entity (e.g. saving the same result label twice)
+    are raised when its batch is written, rather than when it is saved.
+    """
+
+    def __init__(self, db: DataWriter, max_items: int = 1000, max_delay: float = 1.0):
+        """
+        :param db: the db to write to
+        :param max_items: the maximal number of buffered results, metadata and nodes
+        :param max_delay: the maximal time (in seconds) between writes to the db
+        """
+        super(BufferedDataWriter, self).__init__()
+        if not isinstance(db, DataWriter):
+            raise TypeError(f"db must be of type {DataWriter}")
+        self._db = db
+        self._max_items = max_items
+        self._max_delay = max_delay
+        self._buffers: Dict[int, _Buffer] = defaultdict(_Buffer)
+        self._buffered_count = 0
+        self._last_flush_time = time.monotonic()
+        self._lock = threading.RLock()
+
+    def flush(self, experiment_id: Optional[int] = None) -> None:
+        """Writes buffered entities to the wrapped db
+
+        :param experiment_id: the id of the experiment whose entities are written.
+                 If None, the entities of all experiments are written.
+        """
+        with self._lock:
+            if experiment_id is None:
+                experiment_ids = list(self._buffers.keys())
+            else:
+                experiment_ids = (
+                    [experiment_id] if experiment_id in self._buffers else []
+                )
+            for buffered_id in experiment_ids:
+                buffer = self._buffers.pop(buffered_id)
+                self._buffered_count -= len(buffer)
+                logger.debug(
+                    f"Writing {len(buffer)} buffered entities of experiment "
+                    f"[{buffered_id}]"
+                )
+                if buffer.nodes:
+                    self._db.save_nodes(buffered_id, buffer.nodes)
+                if buffer.results:
+                    self._db.save_results(buffered_id, buffer.results)
+                if buffer.metadata:
+                    self._db.save_metadata_records(buffered_id, buffer.metadata)
+            self._last_flush_time = time.monotonic()
+
+    def _buffer(self, entities: List, entity: Any) -> None:
+        entities.append(entity)
+        self._buffered_count += 1
+        if (
+            self._buffered_count >= self._max_items
+            or time.monotonic() - self._last_flush_time >= self._max_delay
+        ):
+            self.flush()
+
+    @property
+    def _reader(self) -> DataReader:
+        if not isinstance(self._db, DataReader):
+            raise EntropyError("database has not implemented data reader interface")
+        self.flush()
+        return self._db
+
+    # DataWriter
+
+    def save_experiment_initial_data(self, initial_data: ExperimentInitialData) -> int:
+        return self._db.save_experiment_initial_data(initial_data)
+
+    def save_experiment_end_data(self, experiment_id: int, end_data: ExperimentEndData):
+        self.flush(experiment_id)
+        self._db.save_experiment_end_data(experiment_id, end_data)
+
+    def save_result(self, experiment_id: int, result: RawResultData):
+        with self._lock:
+            self._buffer(self._buffers[experiment_id].results, _snapshot_of(result))
+
+    def save_metadata(self, experiment_id: int, metadata: Metadata):
+        with self._lock:
+            self._buffer(self._buffers[experiment_id].metadata, _snapshot_of(metadata))
+
+    def save_node(self, experiment_id: int, node_data: NodeData):
+        with self._lock:
+            self._buffer(self._buffers[experiment_id].nodes, node_data)
+
+    def save_debug(self, experiment_id: int, debug: Debug):
+        self._db.save_debug(experiment_id, debug)
+
+    def save_plot(self, experiment_id: int, plot: PlotSpec, data: Any):
+        self._db.save_plot(experiment_id, plot, data)
+
+    def save_figure(self, experiment_id: int, figure: go.Figure) -> None:
+        self._db.save_figure(experiment_id, figure)
+
+    def update_experiment_favorite(self, experiment_id: int, favorite: bool) -> None:
+        self._db.update_experiment_favorite(experiment_id, favorite)
+
+    # DataReader
+
+    def get_experiments_range(
+        self, starting_from_index: int, count: int, success: bool = None
+    ) -> DataFrame:
+        return self._reader.get_experiments_range(starting_from_index, count, success)
+
+    def get_experiments_page(
+        self, count: int, cursor: Optional[int] = None, success: bool = None
+    ) -> ExperimentsPage:
+        return self._reader.get_experiments_page(count, cursor, success)
+
+    def get_experiment_record(self, experiment_id: int) -> Optional[ExperimentRecord]:
+        return self._reader.get_experiment_record(experiment_id)
+
+    def get_experiments(
+        self,
+        label: Optional[str] = None,
+        start_after: Optional[datetime] = None,
+        end_after: Optional[datetime] = None,
+        success: Optional[bool] = None,
+    ) -> Iterable[ExperimentRecord]:
+        return self._reader.get_experiments(label, start_after, end_after, success)
+
+    def get_results(
+        self,
+        experiment_id: Optional[int] = None,
+        label: Optional[str] = None,
+        stage: Optional[int] = None,
+    ) -> Iterable[ResultRecord]:
+        return self._reader.get_results(experiment_id, label, stage)
+
+    def get_metadata_records(
+        self,
+        experiment_id: Optional[int] = None,
+        label: Optional[str] = None,
+        stage: Optional[int] = None,
+    ) -> Iterable[MetadataRecord]:
+        return self._reader.get_metadata_records(experiment_id, label, stage)
+
+    def get_last_result_of_experiment(
+        self, experiment_id: int
+    ) -> Optional[ResultRecord]:
+        return self._reader.get_last_result_of_experiment(experiment_id)
+
+    def get_debug_record(self, experiment_id: int) -> Optional[DebugRecord]:
+        return self._reader.get_debug_record(experiment_id)
+
+    def get_plots(self, experiment_id: int) -> List[PlotRecord]:
+        return self._reader.get_plots(experiment_id)
+
+    def get_figures(self, experiment_id: int) -> List[FigureRecord]:
+        return self._reader.get_figures(experiment_id)
+
+    def get_node_stage_ids_by_label(
+        self, label: str, experiment_id: Optional[int] = None
+    ) -> List[int]:
+        return self._reader.get_node_stage_ids_by_label(label, experiment_id)
@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Any, Optional, Iterable
+from typing import List, Any, Optional, Iterable, Iterator
 from warnings import warn
 
 from pandas import DataFrame
@@ -110,6 +110,18 @@ class FigureRecord:
     time: datetime
 
 
+@dataclass
+class ExperimentsPage:
+    """
+    A page of experiments, sorted desc by id (newest first)
+    """
+
+    experiments: DataFrame
+    # cursor to pass to get_experiments_page() for the next (older) page, or None if
+    # this is the last page:
+    next_cursor: Optional[int]
+
+
 @dataclass
 class NodeResults:
     """
@@ -145,13 +157,30 @@ class DataReader(ABC):
     ) -> DataFrame:
         """
             read a range of experiments to a pandas dataframe
-        :param starting_from_index: experiment index to start from (sorted desc by time)
+        :param starting_from_index: experiment index to start from (sorted desc by id,
+            i.e. newest first)
         :param count: number of experiments
         :param success: Optional filter for the success property.
         :return: A DataFrame containing one row per Experiment
         """
         pass
 
+    @abstractmethod
+    def get_experiments_page(
+        self, count: int, cursor: Optional[int] = None, success: bool = None
+    ) -> ExperimentsPage:
+        """
+            read a page of experiments to a pandas dataframe, sorted desc by id (newest
+            first). Unlike get_experiments_range(), pages are read by cursor rather
+            than by index, so reading a deep page costs the same as reading the first
+            one, and pages do not shift when new experiments are saved
+        :param count: maximal number of experiments in the page
+        :param cursor: next_cursor of the previous page, or None for the first page
+        :param success: Optional filter for the success property.
+        :return: An ExperimentsPage containing one row per Experiment
+        """
+        pass
+
     @abstractmethod
     def get_experiment_record(self, experiment_id: int) -> Optional[ExperimentRecord]:
         """
@@ -178,6 +207,24 @@ class DataReader(ABC):
         """
         pass
 
+    def iter_experiments(
+        self,
+        label: Optional[str] = None,
+        start_after: Optional[datetime] = None,
+        end_after: Optional[datetime] = None,
+        success: Optional[bool] = None,
+    ) -> Iterator[ExperimentRecord]:
+        """
+            iterate over experiments records according to any combination of
+            parameters filters. Unlike get_experiments(), implementations may read
+            the records in batches, keeping only a bounded number of them in memory
+        :param label: experiment label to filter by
+        :param start_after: experiments start after specific time
+        :param end_after: experiments ended after specific time
+        :param success: experiment success criteria
+        """
+        yield from self.get_experiments(label, start_after, end_after, success)
+
     @abstractmethod
     def get_results(
         self,
@@ -194,6 +241,24 @@ class DataReader(ABC):
         """
         pass
 
+    def iter_results(
+        self,
+        experiment_id: Optional[int] = None,
+        label: Optional[str] = None,
+        stage: Optional[int] = None,
+    ) -> Iterator[ResultRecord]:
+        """
+            iterate over results according to any combination of parameters filters.
+            Unlike get_results(), implementations may read the results in batches,
+            keeping only a bounded number of them in memory. The order of the
+            results is not guaranteed
+
+        :param experiment_id: results from specific experiment
+        :param label: results label to filter by
+        :param stage: results stage within the experiment
+        """
+        yield from self.get_results(experiment_id, label, stage)
+
     @abstractmethod
     def get_metadata_records(
         self,
@@ -211,6 +276,24 @@ class DataReader(ABC):
         """
         pass
 
+    def iter_metadata_records(
+        self,
+        experiment_id: Optional[int] = None,
+        label: Optional[str] = None,
+        stage: Optional[int] = None,
+    ) -> Iterator[MetadataRecord]:
+        """
+            iterate over metadata records according to any combination of parameters
+            filters. Unlike get_metadata_records(), implementations may read the
+            records in batches, keeping only a bounded number of them in memory. The
+            order of the records is not guaranteed
+
+        :param experiment_id: metadata from specific experiment
+        :param label: metadata label to filter by
+        :param stage: metadata stage within the experiment
+        """
+        yield from self.get_metadata_records(experiment_id, label, stage)
+
     @abstractmethod
     def get_last_result_of_experiment(
         self, experiment_id: int
@@ -1,9 +1,10 @@
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from datetime import datetime
-from typing import Any, Optional, Type
+from typing import Any, Optional, Type, Iterable
 from warnings import warn
 
+import numpy as np
 from bokeh.models import Renderer
 from bokeh.plotting import Figure
 from matplotlib.figure import Figure as matplotlibFigure
@@ -44,6 +45,9 @@ class RawResultData:
     data: Any
     stage: int = -1
     story: str = None
+    append: bool = False
+    # the time the result was produced. If None, the time it is saved is used:
+    time: Optional[datetime] = None
 
     def __repr__(self):
         return f"<RawResultData(stage='{self.stage}', label='{self.label}')>"
@@ -58,11 +62,27 @@ class Metadata:
     label: str
     stage: int
     data: Any
+    # the time the metadata was produced. If None, the time it is saved is used:
+    time: Optional[datetime] = None
 
     def __repr__(self):
         return f"<Metadata(stage='{self.stage}', label='{self.label}')>"
 
 
+def _snapshot_of(entities: Any) -> Any:
+    """Returns copies of results and metadata (or of a list of them) to be written
+    later: the time they are saved is recorded, and array data is copied because
+    experiments often reuse the same array for successive results"""
+    if isinstance(entities, list):
+        return [_snapshot_of(entity) for entity in entities]
+    if isinstance(entities, (RawResultData, Metadata)):
+        data = entities.data
+        if isinstance(data, np.ndarray):
+            data = data.copy()
+        return replace(entities, data=data, time=entities.time or datetime.now())
+    return entities
+
+
 @dataclass
 class Debug:
     """
@@ -177,6 +197,24 @@ class DataWriter(ABC):
         """
         pass
 
+    def save_results(self, experiment_id: int, results: Iterable[RawResultData]):
+        """
+        save a batch of new results to the db. Implementations may override this
+        to save the whole batch at once
+        """
+        for result in results:
+            self.save_result(experiment_id, result)
+
+    def save_metadata_records(
+        self, experiment_id: int, metadata_records: Iterable[Metadata]
+    ):
+        """
+        save a batch of new metadata to the db. Implementations may override this
+        to save the whole batch at once
+        """
+        for metadata in metadata_records:
+            self.save_metadata(experiment_id, metadata)
+
     @abstractmethod
     def save_debug(self, experiment_id: int, debug: Debug):
         """
@@ -216,6 +254,14 @@ class DataWriter(ABC):
         """
         pass
 
+    def save_nodes(self, experiment_id: int, nodes_data: Iterable[NodeData]):
+        """
+        saves a batch of graph nodes data to the db. Implementations may override
+        this to save the whole batch at once
+        """
+        for node_data in nodes_data:
+            self.save_node(experiment_id, node_data)
+
     @abstractmethod
     def update_experiment_favorite(self, experiment_id: int, favorite: bool) -> None:
         """
@@ -0,0 +1,243 @@
+"""Downsampling of large traces, so that plots of millions of points are rendered
+with a bounded number of points (the `plot.max_points` config setting) that still
+looks like the full-resolution plot. Two methods are available (the
+`plot.downsampling` config setting):
+
+* "lttb" - Largest-Triangle-Three-Buckets (see
+  https://skemman.is/bitstream/1946/15343/3/SS_MSthesis.pdf), which keeps the points
+  that contribute most to the visual shape of the trace.
+* "min_max" - keeps the minimum and the maximum of consecutive buckets of points
+  (the envelope of the trace), so that no peak is lost.
+"""
+import math
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from plotly import graph_objects as go
+
+from entropylab.config import settings
+from entropylab.pipeline.api.errors import EntropyError
+
+_DEFAULT_MAX_POINTS = 5000
+_DEFAULT_METHOD = "lttb"
+_NUMERIC_DTYPE_KINDS = "biuf"
+# properties of traces that may have a value per point, which are downsampled with
+# the x and y values:
+_PER_POINT_PROPERTIES = (
+    "text",
+    "hovertext",
+    "hovertemplate",
+    "texttemplate",
+    "textposition",
+    "customdata",
+    "ids",
+    "width",
+    "base",
+    "offset",
+    "marker.color",
+    "marker.size",
+    "marker.symbol",
+    "marker.opacity",
+    "marker.line.color",
+    "marker.line.width",
+    "error_x.array",
+    "error_x.arrayminus",
+    "error_y.array",
+    "error_y.arrayminus",
+)
+
+
+def max_points_setting() -> int:
+    return settings.get("plot.max_points", _DEFAULT_MAX_POINTS)
+
+
+def downsample(
+    x: np.ndarray, y: np.ndarray, max_points: int, method: Optional[str] = None
+) -> np.ndarray:
+    """Returns the (sorted) indices of at most max_points points of a trace that
+    represent it best
+
+    :param x: the x values of the trace
+    :param y: the y values of the trace
+    :param max_points: the maximal number of points to return
+    :param method: "lttb" or "min_max". Overrides the `plot.downsampling` config
+             setting."""
+    if len(y) <= max_points:
+        return np.arange(len(y))
+    if method is None:
+        method = settings.get("plot.downsampling", _DEFAULT_METHOD)
+    if y.dtype.kind not in _NUMERIC_DTYPE_KINDS:
+        return _stride(len(y), max_points)
+    if method == "lttb":
+        if x.dtype.kind not in _NUMERIC_DTYPE_KINDS:
+            x = np.arange(len(y))
+        return lttb(x, y, max_points)
+    elif method == "min_max":
+        return min_max(y, max_points)
+    else:
+        raise EntropyError(f"Unknown downsampling method '{method}'")
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Returns the indices of n_out points of a trace, selected by the
+    Largest-Triangle-Three-Buckets algorithm. The first and last points are always
+    selected"""
+    n = len(y)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1][:n_out])
+    x = x.astype(np.float64)
+    y = y.astype(np.float64)
+    # boundaries of the n_out - 2 buckets between the first and the last points:
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+    selected = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        next_x = x[end:next_end].mean()
+        next_y = y[end:next_end].mean()
+        # (double) areas of the triangles between the selected point of the previous
+        # bucket, each point in the bucket, and the average point of the next bucket:
+        areas = np.abs(
+            (x[selected] - next_x) * (y[start:end] - y[selected])
+            - (x[selected] - x[start:end]) * (next_y - y[selected])
+        )
+        selected = start + int(np.argmax(areas))
+        indices[i + 1] = selected
+    return indices
+
+
+def min_max(y: np.ndarray, n_out: int) -> np.ndarray:
+    """Returns the (sorted) indices of at most n_out points of a trace: the minimum
+    and the maximum of each of n_out / 2 consecutive buckets, and the first and last
+    points"""
+    n = len(y)
+    if n_out >= n:
+        return np.arange(n)
+    bucket_count = max(1, (n_out - 2) // 2)
+    bucket_size = math.ceil(n / bucket_count)
+    bucket_count = math.ceil(n / bucket_size)
+    padded = np.empty(bucket_count * bucket_size, dtype=y.dtype)
+    padded[:n] = y
+    padded[n:] = y[-1]
+    buckets = padded.reshape(bucket_count, bucket_size)
+    offsets = np.arange(bucket_count) * bucket_size
+    indices = np.concatenate(
+        [offsets + buckets.argmin(axis=1), offsets + buckets.argmax(axis=1), [0, n - 1]]
+    )
+    return np.unique(np.minimum(indices, n - 1))
+
+
+def downsample_2d(z: np.ndarray, max_points: int) -> np.ndarray:
+    """Returns every n-th row and column of an image, so that it has at most
+    max_points pixels. Only the returned pixels of memmaps and HDF5 datasets are
+    read"""
+    step = _step_2d(z, max_points)
+    return np.asarray(z if step == 1 else z[::step, ::step])
+
+
+def _step_2d(z: np.ndarray, max_points: int) -> int:
+    rows, columns = z.shape[:2]
+    if rows * columns <= max_points:
+        return 1
+    step = math.ceil(math.sqrt(rows * columns / max_points))
+    while math.ceil(rows / step) * math.ceil(columns / step) > max_points:
+        step += 1
+    return step
+
+
+def window(
+    x: np.ndarray, y: np.ndarray, x_range: Optional[Tuple[float, float]]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the points of a trace whose x values are in the given range
+
+    :param x_range: (min, max) x values, or None for all points"""
+    if x_range is None:
+        return x, y
+    x0, x1 = sorted(x_range)
+    if len(x) > 1 and np.all(x[1:] >= x[:-1]):
+        start, end = np.searchsorted(x, [x0, x1], side="left")
+        # one point beyond each edge, so that lines continue to the edges:
+        start, end = max(0, start - 1), min(len(x), end + 1)
+        return x[start:end], y[start:end]
+    mask = (x >= x0) & (x <= x1)
+    return x[mask], y[mask]
+
+
+def xy_of(trace) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """Returns the x and y values of a trace, or None if the trace is not a trace of
+    one-dimensional x and y values (e.g. a heatmap)"""
+    if getattr(trace, "z", None) is not None or getattr(trace, "y", None) is None:
+        return None
+    y = np.asarray(trace.y)
+    if y.ndim != 1:
+        return None
+    x = getattr(trace, "x", None)
+    x = np.arange(len(y)) if x is None else np.asarray(x)
+    return x, y
+
+
+def per_point_values_of(trace, n: int) -> Dict[str, np.ndarray]:
+    """Returns the values of the properties of a trace of n points that have a value
+    per point (e.g. marker.color or error_y.array), by the (dotted) property path"""
+    values = {}
+    for path in _PER_POINT_PROPERTIES:
+        try:
+            value = trace[path]
+        except KeyError:
+            continue  # not a property of this type of trace
+        if value is None or isinstance(value, str):
+            continue
+        value = np.asarray(value)
+        if value.ndim >= 1 and len(value) == n:
+            values[path] = value
+    return values
+
+
+def downsample_figure(
+    figure: go.Figure, max_points: Optional[int] = None, method: Optional[str] = None
+) -> go.Figure:
+    """Returns a copy of a figure in which traces with more than max_points points
+    are downsampled. Properties with a value per point (e.g. marker.color) are
+    downsampled with the points
+
+    :param figure: the figure to downsample
+    :param max_points: maximal number of points per trace. Overrides the
+             `plot.max_points` config setting.
+    :param method: "lttb" or "min_max". Overrides the `plot.downsampling` config
+             setting."""
+    if max_points is None:
+        max_points = max_points_setting()
+    downsampled = go.Figure(figure)
+    for trace in downsampled.data:
+        if getattr(trace, "z", None) is not None:
+            step = _step_2d(np.asarray(trace.z), max_points)
+            if step > 1:
+                _stride_heatmap(trace, step)
+            continue
+        xy = xy_of(trace)
+        if xy is not None and len(xy[1]) > max_points:
+            x, y = xy
+            indices = downsample(x, y, max_points, method)
+            for path, value in per_point_values_of(trace, len(y)).items():
+                trace[path] = value[indices]
+            trace.update(x=x[indices], y=y[indices])
+    return downsampled
+
+
+def _stride_heatmap(trace, step: int):
+    update = dict(z=np.asarray(trace.z)[::step, ::step])
+    # image traces have no x and y:
+    if getattr(trace, "x", None) is not None:
+        update["x"] = np.asarray(trace.x)[::step]
+    if getattr(trace, "y", None) is not None:
+        update["y"] = np.asarray(trace.y)[::step]
+    trace.update(**update)
+
+
+def _stride(n: int, max_points: int) -> np.ndarray:
+    return np.arange(0, n, math.ceil(n / max_points))
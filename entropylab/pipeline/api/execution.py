@@ -41,15 +41,21 @@ class EntropyContext:
         self._stage_id = stage_id
         self._context_factory = context_factory
 
-    def add_result(self, label: str, data: Any, story: str = None):
+    def add_result(
+        self, label: str, data: Any, story: str = None, append: bool = False
+    ):
         """
         saves a new result from this experiment in the database
         :param label: result label
         :param data: result data
         :param story: story about the result
+        :param append: if True, data is appended as a new row to the result with the
+                same label (which is created on the first call) instead of being saved
+                as a new result. Useful for streaming measurement loops. Requires HDF5
+                storage (raises an EntropyError when it is disabled).
         """
         self._data_writer.save_result(
-            self._exp_id, RawResultData(label, data, self._stage_id, story)
+            self._exp_id, RawResultData(label, data, self._stage_id, story, append)
         )
 
     def add_metadata(self, label: str, metadata: Any):
@@ -1,5 +1,6 @@
 import abc
 import json
+import warnings
 from datetime import datetime
 from typing import Optional
 
@@ -14,6 +15,7 @@ from entropylab.pipeline.api.errors import EntropyError
 from entropylab.pipeline.api.execution import ExperimentExecutor, _EntropyContextFactory
 from entropylab.pipeline.api.memory_reader_writer import MemoryOnlyDataReaderWriter
 from entropylab.components.lab_topology import ExperimentResources
+from entropylab.config import settings
 from entropylab.logger import logger
 
 
@@ -88,6 +90,7 @@ class _Experiment:
         finally:
             self._experiment_resources.end_experiment()
 
+        self._save_auto_plot()
         self._end_time = datetime.now()
 
         success = True
@@ -98,6 +101,37 @@ class _Experiment:
         logger.info("Finished entropy experiment execution successfully")
         return success
 
+    def _save_auto_plot(self):
+        """Post-experiment hook: if the experiment saved no plots or figures, renders
+        an auto-plot of its last result (downsampled to the `plot.max_points` config
+        setting) and saves it as a figure, so that the dashboard does not render it
+        whenever the experiment is selected. Enabled by the `experiment.auto_plot`
+        config setting. Failures are logged and do not fail the experiment."""
+        if not settings.get("experiment.auto_plot", False):
+            return
+        if not isinstance(self._data_writer, DataReader):
+            return
+        reader: DataReader = self._data_writer
+        # noinspection PyBroadException
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", PendingDeprecationWarning)
+                plots = reader.get_plots(self._id)
+            if plots or reader.get_figures(self._id):
+                return
+            last_result = reader.get_last_result_of_experiment(self._id)
+            if last_result is None or last_result.data is None:
+                return
+            # imported here, as plotly express is slow to import:
+            from entropylab.pipeline.api.auto_plot import auto_plot
+
+            figure = auto_plot(self._id, last_result.data).figure
+            self._data_writer.save_figure(self._id, figure)
+        except EntropyError as e:
+            logger.debug(f"Last result of experiment cannot be auto-plotted: {e}")
+        except Exception:
+            logger.exception("Failed to save auto-plot of experiment")
+
     def data_reader(self) -> DataReader:
         """
         Results reader of this experiment instance
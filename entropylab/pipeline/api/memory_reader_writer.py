@@ -8,6 +8,7 @@ from plotly import graph_objects as go
 
 from entropylab.pipeline.api.data_reader import (
     DataReader,
+    ExperimentsPage,
     ResultRecord,
     DebugRecord,
     MetadataRecord,
@@ -36,6 +37,7 @@ class MemoryOnlyDataReaderWriter(DataWriter, DataReader):
     def __init__(self):
         super(DataWriter, self).__init__()
         super(DataReader, self).__init__()
+        self._experiment_id: Optional[int] = None
         self._initial_data: Optional[ExperimentInitialData] = None
         self._end_data: Optional[ExperimentEndData] = None
         self._results: List[Tuple[RawResultData, datetime]] = []
@@ -47,7 +49,8 @@ class MemoryOnlyDataReaderWriter(DataWriter, DataReader):
 
     def save_experiment_initial_data(self, initial_data: ExperimentInitialData) -> int:
         self._initial_data = initial_data
-        return time_ns()
+        self._experiment_id = time_ns()
+        return self._experiment_id
 
     def save_experiment_end_data(self, experiment_id: int, end_data: ExperimentEndData):
         self._end_data = end_data
@@ -82,6 +85,32 @@ class MemoryOnlyDataReaderWriter(DataWriter, DataReader):
     def get_experiments_range(self, starting_from_index: int, count: int) -> DataFrame:
         raise NotImplementedError()
 
+    def get_experiments_page(
+        self, count: int, cursor: Optional[int] = None, success: bool = None
+    ) -> ExperimentsPage:
+        rows = []
+        if (
+            self._initial_data
+            and count > 0
+            and (cursor is None or self._experiment_id < cursor)
+        ):
+            end_time = self._end_data.end_time if self._end_data else None
+            experiment_success = self._end_data.success if self._end_data else None
+            if success is None or experiment_success == success:
+                rows.append(
+                    dict(
+                        id=self._experiment_id,
+                        label=self._initial_data.label,
+                        start_time=self._initial_data.start_time,
+                        end_time=end_time,
+                        user=self._initial_data.user,
+                        success=experiment_success,
+                        favorite=False,
+                    )
+                )
+        columns = ["id", "label", "start_time", "end_time", "user", "success"]
+        return ExperimentsPage(DataFrame(rows, columns=columns + ["favorite"]), None)
+
     def get_experiments(
         self,
         label: Optional[str] = None,
@@ -1,10 +1,11 @@
+import h5py
 import numpy as np
 import pytest
 from plotly import graph_objects as go
 
 from entropylab.pipeline.api.data_reader import FigureRecord
 from entropylab.pipeline.api.errors import EntropyError
-from entropylab.dashboard.pages.results.auto_plot import auto_plot
+from entropylab.pipeline.api.auto_plot import auto_plot
 
 
 # Dictionaries
@@ -139,6 +140,35 @@ def test_auto_plot_2d_ndarray():
     assert isinstance(actual.figure, go.Figure)
 
 
+def test_auto_plot_ndarray_of_zeros():
+    data = np.zeros(10)
+    actual = auto_plot(1, data)
+    assert list(actual.figure.data[0].y) == [0] * 10
+
+
+def test_auto_plot_complex_ndarray():
+    data = np.array([1 + 1j, 2 + 2j])
+    with pytest.raises(EntropyError):
+        auto_plot(1, data)
+
+
+def test_auto_plot_hdf5_dataset_containing_list_with_2_lists(tmp_path):
+    with h5py.File(tmp_path / "data.hdf5", "w") as file:
+        data = file.create_dataset("data", data=[[1, 2, 3], [4, 5, 6]])
+        actual = auto_plot(1, data)
+    assert list(actual.figure.data[0].x) == [1, 2, 3]
+    assert list(actual.figure.data[0].y) == [4, 5, 6]
+
+
+def test_auto_plot_2d_hdf5_dataset_when_larger_than_max_points_then_it_is_strided(
+    tmp_path,
+):
+    with h5py.File(tmp_path / "data.hdf5", "w") as file:
+        data = file.create_dataset("data", data=np.random.rand(300, 400))
+        actual = auto_plot(1, data, max_points=1000)
+    assert np.asarray(actual.figure.data[0].z).size <= 1000
+
+
 def test_auto_plot_number():
     data = 10
     actual = auto_plot(1, data)
@@ -146,3 +176,15 @@ def test_auto_plot_number():
     assert actual.id == 0
     assert actual.experiment_id == 1
     assert isinstance(actual.figure, go.Figure)
+
+
+def test_auto_plot_when_data_is_larger_than_max_points_then_it_is_downsampled():
+    data = np.random.rand(100_000)
+    actual = auto_plot(1, data, max_points=1000)
+    assert len(actual.figure.data[0].y) <= 1000
+
+
+def test_auto_plot_2d_ndarray_when_larger_than_max_points_then_it_is_strided():
+    data = np.random.rand(300, 400)
+    actual = auto_plot(1, data, max_points=1000)
+    assert np.asarray(actual.figure.data[0].z).size <= 1000
@@ -0,0 +1,103 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from entropylab import SqlAlchemyDB, RawResultData, Script, BufferedDataWriter
+from entropylab.pipeline.api.data_writer import Metadata, NodeData
+from entropylab.pipeline.api.execution import EntropyContext
+
+
+def an_experiment(context: EntropyContext):
+    for i in range(10):
+        context.add_result("point", i, append=True)
+    context.add_result("last", "done")
+
+
+@pytest.mark.parametrize("enable_hdf5_storage", [True, False])
+def test_save_result_is_written_in_batches(
+    enable_hdf5_storage, initialized_project_dir_path
+):
+    # arrange
+    db = SqlAlchemyDB(
+        initialized_project_dir_path, enable_hdf5_storage=enable_hdf5_storage
+    )
+    target = BufferedDataWriter(db, max_items=3, max_delay=60)
+    # act
+    for i in range(4):
+        target.save_result(1, RawResultData(label=f"foo{i}", data=i))
+    # assert
+    assert len(db.get_results(1)) == 3
+    assert len(target.get_results(1)) == 4
+
+
+def test_save_result_keeps_the_time_the_result_was_saved(initialized_project_dir_path):
+    # arrange
+    db = SqlAlchemyDB(initialized_project_dir_path)
+    target = BufferedDataWriter(db, max_items=100, max_delay=60)
+    before = datetime.now()
+    target.save_result(1, RawResultData(label="foo", data=1))
+    after = datetime.now()
+    # act
+    target.flush()
+    # assert
+    saved_time = db.get_results(1)[0].time.replace(tzinfo=None)
+    assert before <= saved_time <= after
+
+
+def test_save_result_when_array_is_reused_then_buffered_results_are_snapshots(
+    initialized_project_dir_path,
+):
+    # arrange
+    db = SqlAlchemyDB(initialized_project_dir_path)
+    target = BufferedDataWriter(db, max_items=100, max_delay=60)
+    data = np.zeros(3)
+    # act
+    for i in range(3):
+        data[:] = i
+        target.save_result(1, RawResultData(label=f"foo{i}", data=data))
+        target.save_metadata(1, Metadata(label=f"bar{i}", stage=0, data=data))
+    data[:] = -1
+    target.flush(1)
+    # assert
+    results = sorted(db.get_results(1), key=lambda r: r.label)
+    assert [list(result.data) for result in results] == [[0] * 3, [1] * 3, [2] * 3]
+    metadata = sorted(db.get_metadata_records(1), key=lambda m: m.label)
+    assert [list(record.data) for record in metadata] == [[0] * 3, [1] * 3, [2] * 3]
+
+
+def test_save_metadata_and_node_are_written_on_flush(initialized_project_dir_path):
+    # arrange
+    db = SqlAlchemyDB(initialized_project_dir_path)
+    target = BufferedDataWriter(db, max_items=100, max_delay=60)
+    target.save_metadata(1, Metadata(label="foo", stage=0, data=1))
+    target.save_node(1, NodeData(0, datetime.now(), "node", False))
+    # act
+    target.flush(1)
+    # assert
+    assert len(db.get_metadata_records(1)) == 1
+    assert db.get_node_stage_ids_by_label("node", 1) == [0]
+
+
+def test_save_result_when_max_delay_passed_then_buffer_is_written(
+    initialized_project_dir_path,
+):
+    # arrange
+    db = SqlAlchemyDB(initialized_project_dir_path)
+    target = BufferedDataWriter(db, max_items=100, max_delay=0)
+    # act
+    target.save_result(1, RawResultData(label="foo", data=1))
+    # assert
+    assert len(db.get_results(1)) == 1
+
+
+def test_run_experiment_with_buffered_db(initialized_project_dir_path):
+    # arrange
+    db = SqlAlchemyDB(initialized_project_dir_path)
+    target = BufferedDataWriter(db, max_items=100, max_delay=60)
+    # act
+    handle = Script(None, an_experiment, "buffered").run(target)
+    # assert
+    points = db.get_results(handle.id, label="point")
+    assert points[0].data.tolist() == list(range(10))
+    assert db.get_last_result_of_experiment(handle.id).data == "done"
@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+from plotly import graph_objects as go
+
+from entropylab.pipeline.api.downsampling import (
+    downsample,
+    downsample_figure,
+    lttb,
+    min_max,
+    window,
+)
+
+
+def test_lttb_keeps_first_last_and_peak():
+    # arrange
+    y = np.zeros(100_000)
+    y[12_345] = 1
+    # act
+    actual = lttb(np.arange(len(y)), y, 1000)
+    # assert
+    assert len(actual) == 1000
+    assert actual[0] == 0
+    assert actual[-1] == len(y) - 1
+    assert 12_345 in actual
+    assert np.all(np.diff(actual) > 0)
+
+
+def test_min_max_keeps_envelope():
+    # arrange
+    y = np.sin(np.arange(100_000) / 100)
+    y[54_321] = -5
+    # act
+    actual = min_max(y, 1000)
+    # assert
+    assert len(actual) <= 1000
+    assert 54_321 in actual
+    assert y[actual].max() == y.max()
+
+
+@pytest.mark.parametrize("method", ["lttb", "min_max"])
+def test_downsample_when_trace_is_small_then_all_points_are_kept(method):
+    # arrange
+    y = np.arange(10)
+    # act
+    actual = downsample(y, y, 100, method)
+    # assert
+    assert actual.tolist() == list(range(10))
+
+
+def test_downsample_figure_downsamples_scatter_and_strides_heatmap():
+    # arrange
+    figure = go.Figure(
+        [
+            go.Scatter(y=np.random.rand(100_000)),
+            go.Heatmap(z=np.random.rand(300, 400)),
+        ]
+    )
+    # act
+    actual = downsample_figure(figure, 1000)
+    # assert
+    assert len(actual.data[0].y) <= 1000
+    assert np.asarray(actual.data[1].z).size <= 1000
+    assert len(figure.data[0].y) == 100_000
+
+
+def test_downsample_figure_when_marker_color_is_per_point_then_it_is_downsampled():
+    # arrange
+    y = np.random.rand(100_000)
+    figure = go.Figure(
+        go.Scatter(
+            y=y,
+            mode="markers",
+            marker=dict(color=y * 2, size=10),
+            error_y=dict(array=y * 3),
+        )
+    )
+    # act
+    actual = downsample_figure(figure, 1000)
+    # assert
+    trace = actual.data[0]
+    assert len(trace.y) <= 1000
+    assert np.array_equal(trace.marker.color, np.asarray(trace.y) * 2)
+    assert np.array_equal(trace.error_y.array, np.asarray(trace.y) * 3)
+    assert trace.marker.size == 10
+
+
+def test_window_returns_points_in_range_and_one_beyond_each_edge():
+    # arrange
+    x = np.arange(100)
+    # act
+    actual_x, actual_y = window(x, x * 2, (10.5, 20.5))
+    # assert
+    assert actual_x.tolist() == list(range(10, 22))
+    assert actual_y.tolist() == [i * 2 for i in range(10, 22)]
@@ -0,0 +1,42 @@
+from datetime import datetime
+
+from entropylab.pipeline.api.data_writer import (
+    ExperimentInitialData,
+    ExperimentEndData,
+)
+from entropylab.pipeline.api.memory_reader_writer import MemoryOnlyDataReaderWriter
+
+
+def test_get_experiments_page_when_experiment_is_saved_then_page_has_one_row():
+    # arrange
+    target = MemoryOnlyDataReaderWriter()
+    experiment_id = target.save_experiment_initial_data(
+        ExperimentInitialData(
+            label="foo",
+            user="bar",
+            lab_topology=None,
+            script="",
+            start_time=datetime.now(),
+        )
+    )
+    target.save_experiment_end_data(
+        experiment_id, ExperimentEndData(end_time=datetime.now(), success=True)
+    )
+    # act
+    page = target.get_experiments_page(10)
+    # assert
+    assert page.experiments["id"].tolist() == [experiment_id]
+    assert page.experiments["label"].tolist() == ["foo"]
+    assert page.next_cursor is None
+    assert target.get_experiments_page(10, success=False).experiments.empty
+    assert target.get_experiments_page(10, cursor=experiment_id).experiments.empty
+
+
+def test_get_experiments_page_when_no_experiment_is_saved_then_page_is_empty():
+    # arrange
+    target = MemoryOnlyDataReaderWriter()
+    # act
+    page = target.get_experiments_page(10)
+    # assert
+    assert page.experiments.empty
+    assert page.next_cursor is None
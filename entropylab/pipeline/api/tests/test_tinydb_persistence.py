@@ -1,3 +1,10 @@
+from entropylab.pipeline.params.persistence.migrations import convert_param_store_file
+from entropylab.pipeline.params.persistence.persistence import Commit
+from entropylab.pipeline.params.persistence.serializers import (
+    BINARY_MAGIC,
+    JSONPickleSerializer,
+)
+from entropylab.pipeline.params.persistence.tinydb import storage
 from entropylab.pipeline.params.persistence.tinydb.tinydbpersistence import (
     TinyDbPersistence,
 )
@@ -11,3 +18,118 @@ def test__generate_commit_id():
     commit_id1 = target._TinyDbPersistence__generate_commit_id()
     commit_id2 = target._TinyDbPersistence__generate_commit_id()
     assert commit_id1 != commit_id2
+
+
+""" get_commit() """
+
+
+def test_get_commit_when_file_is_unchanged_then_it_is_not_decoded(
+    tmp_path, monkeypatch
+):
+    # arrange
+    target = TinyDbPersistence(tmp_path / "params.json")
+    commit_ids = [target.commit(Commit(params={"foo": i}, tags={})) for i in range(3)]
+    decoded = []
+    decode = storage.deserialize
+    monkeypatch.setattr(
+        storage, "deserialize", lambda data: decoded.append(data) or decode(data)
+    )
+    # act
+    actual = target.get_commit(commit_ids[1])
+    latest = target.get_latest_commit()
+    # assert
+    assert actual.params == {"foo": 1}
+    assert latest.params == {"foo": 2}
+    assert decoded == []
+
+
+def test_get_commit_when_file_is_changed_by_another_instance_then_commit_is_found(
+    tmp_path,
+):
+    # arrange
+    target = TinyDbPersistence(tmp_path / "params.json")
+    target.commit(Commit(params={"foo": 1}, tags={}))
+    other = TinyDbPersistence(tmp_path / "params.json")
+    commit_id = other.commit(Commit(params={"foo": 2}, tags={}))
+    # act
+    actual = target.get_commit(commit_id)
+    # assert
+    assert actual.params == {"foo": 2}
+    assert target.get_latest_commit().id == commit_id
+
+
+def test_get_commit_when_commit_is_changed_then_saved_commit_is_not_changed(
+    tmp_path,
+):
+    # arrange
+    target = TinyDbPersistence(tmp_path / "params.json")
+    commit_id = target.commit(Commit(params={"foo": [1]}, tags={"tag": ["foo"]}))
+    commit = target.get_commit(commit_id)
+    commit.params["foo"].append(2)
+    commit.tags["tag"].remove("foo")
+    # act
+    actual = target.get_commit(commit_id)
+    # assert
+    assert actual.params == {"foo": [1]}
+    assert actual.tags == {"tag": ["foo"]}
+
+
+""" get_history() """
+
+
+def test_get_history_when_file_is_changed_by_another_instance_then_history_is_updated(
+    tmp_path,
+):
+    # arrange
+    target = TinyDbPersistence(tmp_path / "params.json")
+    commit_id1 = target.commit(Commit(params={"foo": 1, "bar": 1}, tags={}))
+    target.get_history("foo")
+    other = TinyDbPersistence(tmp_path / "params.json")
+    other.commit(Commit(params={"bar": 2}, tags={}))
+    commit_id3 = other.commit(Commit(params={"foo": 3}, tags={}))
+    # act
+    actual = target.get_history("foo")
+    # assert
+    assert [entry.commit_id for entry in actual] == [commit_id1, commit_id3]
+    assert [entry.param for entry in actual] == [1, 3]
+
+
+def test_get_history_when_history_is_changed_then_saved_commit_is_not_changed():
+    # arrange
+    target = TinyDbPersistence()
+    commit_id = target.commit(Commit(params={"foo": [1]}, tags={}))
+    target.get_history("foo")[0].param.append(2)
+    # act
+    actual = target.get_commit(commit_id)
+    # assert
+    assert actual.params == {"foo": [1]}
+
+
+""" commit() """
+
+
+def test_commit_when_binary_is_opted_in_then_jsonpickle_file_is_converted(
+    tmp_path, binary_param_store_serializer
+):
+    # arrange
+    path = tmp_path / "params.json"
+    commit_id = TinyDbPersistence(path).commit(Commit(params={"foo": 1}, tags={}))
+    convert_param_store_file(path, "test", JSONPickleSerializer())
+    target = TinyDbPersistence(path)
+    # act
+    target.commit(Commit(params={"foo": 2}, tags={}))
+    # assert
+    assert path.read_bytes().startswith(BINARY_MAGIC)
+    assert target.get_commit(commit_id).params == {"foo": 1}
+
+
+def test_commit_when_binary_is_not_opted_in_then_file_is_jsonpickle(tmp_path):
+    # arrange
+    path = tmp_path / "params.json"
+    target = TinyDbPersistence(path)
+    # act
+    commit_id = target.commit(Commit(params={"foo": 1}, tags={}))
+    # assert
+    assert not path.read_bytes().startswith(BINARY_MAGIC)
+    assert JSONPickleSerializer().loads(path.read_bytes())
+    assert TinyDbPersistence(path).get_commit(commit_id).params == {"foo": 1}
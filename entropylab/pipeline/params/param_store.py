@@ -10,8 +10,12 @@ from typing import Optional, Dict, Any, List, Set, MutableMapping
 
 import numpy as np
 import pandas as pd
+from jsonpickle.handlers import BaseHandler, register
 
 from entropylab.config import settings
+from entropylab.pipeline.params.persistence.commitlog.commitlogpersistence import (
+    CommitLogPersistence,
+)
 from entropylab.pipeline.params.persistence.persistence import Commit, Metadata
 from entropylab.pipeline.params.persistence.sqlalchemy.sqlalchemypersistence import (
     SqlAlchemyPersistence,
@@ -70,6 +74,24 @@ class Param(Dict):
             return False
 
 
+@register(Param)
+class _ParamHandler(BaseHandler):
+    """Encodes Params with jsonpickle as their attributes (as "py/state"), and restores
+    them from their attributes, which some versions of jsonpickle fail to do for
+    subclasses of dict"""
+
+    def flatten(self, obj: Param, data: Dict) -> Dict:
+        data["py/state"] = self.context.flatten(vars(obj), reset=False)
+        return data
+
+    def restore(self, obj: Dict) -> Param:
+        # earlier versions of jsonpickle encoded the attributes as "__dict__":
+        state = obj["py/state"] if "py/state" in obj else obj.get("__dict__", {})
+        param = Param(None)
+        param.__dict__.update(self.context.restore(state, reset=False))
+        return param
+
+
 class ParamStore(MutableMapping):
     """
     A class that provides versioned storage for experiment parameters (params).
@@ -81,6 +103,8 @@ class ParamStore(MutableMapping):
         url: Optional[str] | Optional[Path] = None,
         theirs: Optional[Dict | ParamStore] = None,
         merge_strategy: Optional[MergeStrategy] = MergeStrategy.THEIRS,
+        log_path: Optional[str] | Optional[Path] = None,
+        save_blobs: Optional[bool] = None,
     ):
         super().__init__()
         self.__lock = threading.RLock()
@@ -88,16 +112,28 @@ class ParamStore(MutableMapping):
         self.__tags: Dict[str, List[str]] = dict()  # tags that are mapped to keys
         self.__dirty_keys: Set[str] = set()  # updated keys not committed yet
         # constructor arguments take precedence:
+        if save_blobs is None:
+            # large param values are saved in a `params_blobs` directory only when
+            # opted in to, because earlier versions cannot read them:
+            save_blobs = settings.get("param_store_save_blobs", False)
         if path:
-            self.__persistence = TinyDbPersistence(path)
+            self.__persistence = TinyDbPersistence(path, save_blobs)
         elif url:
             self.__persistence = SqlAlchemyPersistence(url)
+        elif log_path:
+            self.__persistence = CommitLogPersistence(log_path, save_blobs=save_blobs)
         else:
             # ...over configuration settings
             if "param_store_path" in settings:
-                self.__persistence = TinyDbPersistence(settings.param_store_path)
+                self.__persistence = TinyDbPersistence(
+                    settings.param_store_path, save_blobs
+                )
             elif "param_store_url" in settings:
                 self.__persistence = SqlAlchemyPersistence(settings.param_store_url)
+            elif "param_store_log_path" in settings:
+                self.__persistence = CommitLogPersistence(
+                    settings.param_store_log_path, save_blobs=save_blobs
+                )
             else:
                 # default
                 self.__persistence = TinyDbPersistence()
@@ -458,14 +494,14 @@ class ParamStore(MutableMapping):
         """
         with self.__lock:
             values = []
-            commits = self.__persistence.search_commits(key=key)
-            commits.sort(key=lambda c: c.timestamp)
-            for commit in commits:
+            entries = self.__persistence.get_history(key)
+            entries.sort(key=lambda e: e.timestamp)
+            for entry in entries:
                 value = (
-                    commit.params[key].value,
-                    commit.local_timestamp,
-                    commit.id,
-                    commit.label,
+                    entry.param.value,
+                    entry.local_timestamp,
+                    entry.commit_id,
+                    entry.label,
                 )
                 values.append(value)
             if self.is_dirty and key in self.__params.keys():
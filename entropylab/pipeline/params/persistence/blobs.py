@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import copy
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+from entropylab.config import settings
+
+BLOBS_DIRNAME = "params_blobs"
+
+_DEFAULT_BLOB_THRESHOLD = 64 * 1024  # bytes
+
+
+@dataclass
+class BlobRef:
+    """A reference, saved in commits, to a param value that is saved in a BlobStore"""
+
+    digest: str
+
+
+class BlobStore:
+    """Content-addressed storage of large param values.
+
+    Numpy arrays that are larger than a threshold are saved once, as .npy files named
+    by the SHA-256 digest of their contents, and are referenced from commits by
+    BlobRefs. Arrays that are not changed between commits (or that are equal to arrays
+    saved before) are not saved again."""
+
+    def __init__(self, path: str | Path, threshold: Optional[int] = None):
+        """
+        :param path: the directory to save values in
+        :param threshold: the minimal size (in bytes) of values to save in the store.
+                 Overrides the `param_store_blob_threshold` config setting.
+        """
+        self._path = str(path)
+        if threshold is None:
+            threshold = settings.get(
+                "param_store_blob_threshold", _DEFAULT_BLOB_THRESHOLD
+            )
+        self._threshold = threshold
+
+    @staticmethod
+    def beside(file_path: str | Path) -> BlobStore:
+        """Returns the store of the params file at the given path (a `params_blobs`
+        directory in the directory of the file)"""
+        return BlobStore(os.path.join(os.path.dirname(str(file_path)), BLOBS_DIRNAME))
+
+    def put(self, value: np.ndarray) -> BlobRef:
+        """Saves a value (unless it is already saved) and returns a reference to it"""
+        value = np.ascontiguousarray(value)
+        digest = hashlib.sha256()
+        digest.update(f"{value.dtype.str}{value.shape}".encode("utf-8"))
+        digest.update(value.data)
+        ref = BlobRef(digest.hexdigest())
+        path = self._path_of(ref)
+        if not os.path.isfile(path):
+            os.makedirs(self._path, exist_ok=True)
+            # written to a temp file first, so that incomplete files are never read:
+            fd, temp_path = tempfile.mkstemp(dir=self._path, suffix=".tmp")
+            with os.fdopen(fd, "wb") as file:
+                np.save(file, value, allow_pickle=False)
+            os.replace(temp_path, path)
+        return ref
+
+    def get(self, ref: BlobRef) -> np.ndarray:
+        return np.load(self._path_of(ref), allow_pickle=False)
+
+    def is_blob(self, value) -> bool:
+        return (
+            isinstance(value, np.ndarray)
+            and value.dtype.kind != "O"
+            and value.nbytes >= self._threshold
+        )
+
+    def to_refs(self, params: Dict) -> Dict:
+        """Returns a copy of params in which the large values of Params are saved in
+        the store and replaced by references"""
+        return {key: self._to_ref(param) for key, param in params.items()}
+
+    def _to_ref(self, param):
+        if not self.is_blob(getattr(param, "value", None)):
+            return param
+        param_with_ref = copy.copy(param)
+        param_with_ref.value = self.put(param.value)
+        return param_with_ref
+
+    def from_refs(self, params: Dict) -> Dict:
+        """Replaces (in place) references in the values of Params by the values they
+        reference, and returns params"""
+        for param in params.values():
+            if isinstance(getattr(param, "value", None), BlobRef):
+                param.value = self.get(param.value)
+        return params
+
+    def _path_of(self, ref: BlobRef) -> str:
+        return os.path.join(self._path, f"{ref.digest}.npy")
@@ -0,0 +1,418 @@
+from __future__ import annotations
+
+import bisect
+import copy
+import json
+import os
+import uuid
+from pathlib import Path
+from typing import Optional, Set, List, Dict, Tuple, NamedTuple, BinaryIO
+
+import pandas as pd
+from filelock import FileLock
+
+from entropylab.logger import logger
+from entropylab.pipeline.api.errors import EntropyError
+from entropylab.pipeline.params.persistence.blobs import BlobStore
+from entropylab.pipeline.params.persistence.persistence import (
+    Persistence,
+    Commit,
+    HistoryEntry,
+)
+from entropylab.pipeline.params.persistence.serializers import JSONSerializer
+
+CURRENT_VERSION = "0.1"
+
+_DEFAULT_SNAPSHOT_INTERVAL = 100
+
+# line types:
+_INFO = "info"
+_COMMIT = "commit"
+_SNAPSHOT = "snapshot"
+
+# each line of the log is a JSON header and a body encoded by JSONSerializer,
+# separated by a tab (that cannot appear in JSON text):
+_SEPARATOR = b"\t"
+
+
+class _LogEntry(NamedTuple):
+    """The header of a commit in the log"""
+
+    num: int
+    id: str
+    timestamp: int
+    label: Optional[str]
+    changed_keys: List[str]
+    deleted_keys: List[str]
+    offset: int  # of the commit line in the log file
+
+
+class CommitLogPersistence(Persistence):
+    """Persists ParamStore commits in an append-only log file.
+
+    Each commit is appended to the log with only the params that were changed (or
+    deleted) since the previous commit. Every `snapshot_interval` commits, the full
+    state of the params is appended to the log as a snapshot. A commit is read by
+    replaying the commits that follow the nearest snapshot before it.
+
+    The headers of the commits (ids, labels and changed keys) are indexed in memory,
+    as are the numbers of the commits that changed (or deleted) each key, and the
+    latest commit is kept in memory. Commits appended by other processes are
+    read when the log file grows."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        snapshot_interval: int = _DEFAULT_SNAPSHOT_INTERVAL,
+        save_blobs: bool = False,
+    ):
+        """
+        :param path: the path of the log file
+        :param snapshot_interval: the number of commits between snapshots
+        :param save_blobs: whether to save large param values once, in a
+                 `params_blobs` directory next to the log file, instead of in every
+                 commit that changes them (see BlobStore)
+        """
+        self.__path = str(path)
+        self.__temp_path = self.__path + ".temp"
+        # large param values (if saved outside the log file) are read from:
+        self.__blobs = BlobStore.beside(self.__path)
+        self.__save_blobs = save_blobs
+        self.__snapshot_interval = snapshot_interval
+        self.__filelock = FileLock(self.__path + ".lock")
+        self.__entries: List[_LogEntry] = []
+        self.__snapshot_offsets: Dict[int, int] = {}  # commit num -> offset
+        self.__snapshot_nums: List[int] = []  # sorted
+        # key -> (commit num, whether the key was changed or deleted), sorted:
+        self.__changes_by_key: Dict[str, List[Tuple[int, bool]]] = {}
+        self.__params: Dict = {}  # of the latest commit
+        self.__tags: Dict = {}  # of the latest commit
+        self.__end = 0  # offset of the end of the last line that was read
+        with self.__filelock:
+            if not os.path.isfile(self.__path):
+                logger.debug(f"Creating new ParamStore log file at '{self.__path}'")
+                self.__append(
+                    [_line({"type": _INFO, "version": CURRENT_VERSION}, None)]
+                )
+            self.__sync()
+
+    def close(self):
+        pass
+
+    def get_commit(
+        self,
+        commit_id: Optional[str] = None,
+        commit_num: Optional[int] = None,
+    ) -> Optional[Commit]:
+        with self.__filelock:
+            self.__sync()
+            if commit_id is not None:
+                num = self.__num_of(commit_id)
+            elif commit_num is not None:
+                if not 1 <= commit_num <= len(self.__entries):
+                    raise EntropyError(f"Commit with number '{commit_num}' not found")
+                num = commit_num
+            else:
+                num = len(self.__entries)
+            return self.__read_commits([num])[0] if num > 0 else None
+
+    def __num_of(self, commit_id: str) -> int:
+        # ids of recent commits are looked up first:
+        for entry in reversed(self.__entries):
+            if entry.id == commit_id:
+                return entry.num
+        raise EntropyError(f"Commit with id '{commit_id}' not found")
+
+    def get_latest_commit(self) -> Optional[Commit]:
+        return self.get_commit()
+
+    def commit(
+        self,
+        commit: Commit,
+        dirty_keys: Optional[Set[str]] = None,
+    ) -> str:
+        commit.id = self.__generate_commit_id()
+        self.stamp_dirty_params_with_commit(commit, dirty_keys)
+        with self.__filelock:
+            self.__sync()
+            changed = {
+                key: param
+                for key, param in commit.params.items()
+                if self.__is_changed(key, param, dirty_keys)
+            }
+            deleted = [key for key in self.__params if key not in commit.params]
+            num = len(self.__entries) + 1
+            header = dict(
+                type=_COMMIT,
+                num=num,
+                id=commit.id,
+                timestamp=commit.timestamp.value,
+                label=commit.label,
+                changed_keys=list(changed),
+                deleted_keys=deleted,
+            )
+            to_refs = self.__to_blob_refs
+            lines = [_line(header, dict(params=to_refs(changed), tags=commit.tags))]
+            if num % self.__snapshot_interval == 0:
+                lines.append(
+                    _line(
+                        dict(type=_SNAPSHOT, num=num),
+                        dict(params=to_refs(commit.params), tags=commit.tags),
+                    )
+                )
+            self.__append(lines)
+            self.__sync()
+        return commit.id
+
+    def __to_blob_refs(self, params: Dict) -> Dict:
+        return self.__blobs.to_refs(params) if self.__save_blobs else params
+
+    def __is_changed(self, key: str, param, dirty_keys: Optional[Set[str]]) -> bool:
+        """A param is changed since the latest commit if it is dirty, or if it is not
+        the version of the param in the latest commit (e.g. when an older commit was
+        checked out). Versions are identified by the id of the commit that stamped
+        them (see Persistence.stamp_dirty_params_with_commit)"""
+        if dirty_keys and key in dirty_keys:
+            return True
+        latest = self.__params.get(key)
+        commit_id = getattr(param, "commit_id", None)
+        return (
+            latest is None
+            or commit_id is None
+            or commit_id != getattr(latest, "commit_id", None)
+        )
+
+    @staticmethod
+    def __generate_commit_id() -> str:
+        return uuid.uuid4().hex
+
+    def search_commits(
+        self, label: Optional[str] = None, key: Optional[str] = None
+    ) -> List[Commit]:
+        with self.__filelock:
+            self.__sync()
+            nums = []
+            keys = set()
+            for entry in self.__entries:
+                keys.update(entry.changed_keys)
+                keys.difference_update(entry.deleted_keys)
+                if (not label or entry.label == label) and (not key or key in keys):
+                    nums.append(entry.num)
+            return self.__read_commits(nums)
+
+    def get_history(self, key: str) -> List[HistoryEntry]:
+        """Reads the values of a key only from the commits that changed it. The value
+        is the same in the commits that follow, up to the next change"""
+        with self.__filelock:
+            self.__sync()
+            changes = self.__changes_by_key.get(key, [])
+            history = []
+            with open(self.__path, "rb") as file:
+                for i, (num, is_changed) in enumerate(changes):
+                    if not is_changed:
+                        continue
+                    # the num of the last commit before the next change (if any):
+                    end = changes[i + 1][0] - 1 if i + 1 < len(changes) else None
+                    entries = self.__entries[num - 1 : end]
+                    if end is None:
+                        # the latest commit is kept in memory:
+                        param = self.__params[key]
+                    else:
+                        param = _read_body(file, entries[0].offset)["params"][key]
+                    for entry in entries:
+                        history.append(self.__history_entry_of(entry, key, param))
+            return history
+
+    def __history_entry_of(self, entry: _LogEntry, key: str, param) -> HistoryEntry:
+        # copied, so that changes to the param do not change the replayed state:
+        params = self.__blobs.from_refs({key: copy.deepcopy(param)})
+        return HistoryEntry(
+            commit_id=entry.id,
+            timestamp=pd.Timestamp(entry.timestamp),
+            label=entry.label,
+            param=params[key],
+        )
+
+    """ Temporary State """
+
+    def save_temp_commit(self, commit: Commit) -> None:
+        with self.__filelock:
+            with open(self.__temp_path, "w") as file:
+                file.write(
+                    JSONSerializer.encode(
+                        dict(
+                            id=commit.id,
+                            timestamp=commit.timestamp.value,
+                            label=commit.label,
+                            params=self.__to_blob_refs(commit.params),
+                            tags=commit.tags,
+                        )
+                    )
+                )
+
+    def load_temp_commit(self) -> Commit:
+        with self.__filelock:
+            if not os.path.isfile(self.__temp_path):
+                raise EntropyError(
+                    "Temp is empty. Use save_temp_commit() before using "
+                    "load_temp_commit()"
+                )
+            with open(self.__temp_path) as file:
+                temp = JSONSerializer.decode(file.read())
+        return Commit(
+            id=temp["id"],
+            timestamp=pd.Timestamp(temp["timestamp"]),
+            label=temp["label"],
+            params=self.__blobs.from_refs(temp["params"]),
+            tags=temp["tags"],
+        )
+
+    """ Log file """
+
+    def __append(self, lines: List[bytes]) -> None:
+        size = os.path.getsize(self.__path) if os.path.isfile(self.__path) else 0
+        with open(self.__path, "ab") as file:
+            if size > self.__end:
+                # an incomplete line was left by a process that failed while writing:
+                logger.warning(
+                    f"Truncating incomplete line at the end of ParamStore log file "
+                    f"'{self.__path}'"
+                )
+                file.truncate(self.__end)
+            file.write(b"".join(lines))
+            file.flush()
+            os.fsync(file.fileno())
+
+    def __sync(self) -> None:
+        """Reads the lines that were appended to the log file since it was last read
+        (by this or other processes)"""
+        size = os.path.getsize(self.__path)
+        if size == self.__end:
+            return
+        if size < self.__end:
+            raise EntropyError(
+                f"ParamStore log file '{self.__path}' was truncated. Only appending to "
+                f"the file is supported"
+            )
+        previous_count = len(self.__entries)
+        with open(self.__path, "rb") as file:
+            file.seek(self.__end)
+            offset = self.__end
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break  # incomplete line
+                self.__read_header(line, offset)
+                offset += len(line)
+            self.__end = offset
+        self.__update_latest(previous_count)
+
+    def __update_latest(self, previous_count: int) -> None:
+        """Replays the commits that were read from the log on top of the latest
+        commit that was read before them (or on top of a later snapshot)"""
+        count = len(self.__entries)
+        if count == previous_count:
+            return
+        snapshot_num = self.__snapshot_before(count)
+        with open(self.__path, "rb") as file:
+            if snapshot_num > previous_count:
+                params, tags = self.__read_snapshot(file, snapshot_num)
+                replayed_num = snapshot_num
+            else:
+                params, tags = self.__params, self.__tags
+                replayed_num = previous_count
+            for entry in self.__entries[replayed_num:count]:
+                params, tags = _apply(params, entry, _read_body(file, entry.offset))
+        self.__params, self.__tags = params, tags
+
+    def __read_header(self, line: bytes, offset: int) -> None:
+        header = json.loads(line.split(_SEPARATOR, 1)[0])
+        if header["type"] == _INFO:
+            if header["version"] != CURRENT_VERSION:
+                raise EntropyError(
+                    f"ParamStore log file at '{self.__path}' is version "
+                    f"{header['version']}. Please upgrade to {CURRENT_VERSION}."
+                )
+        elif header["type"] == _COMMIT:
+            entry = _LogEntry(
+                num=header["num"],
+                id=header["id"],
+                timestamp=header["timestamp"],
+                label=header["label"],
+                changed_keys=header["changed_keys"],
+                deleted_keys=header["deleted_keys"],
+                offset=offset,
+            )
+            self.__entries.append(entry)
+            for key in entry.changed_keys:
+                self.__changes_by_key.setdefault(key, []).append((entry.num, True))
+            for key in entry.deleted_keys:
+                self.__changes_by_key.setdefault(key, []).append((entry.num, False))
+        elif header["type"] == _SNAPSHOT:
+            self.__snapshot_offsets[header["num"]] = offset
+            self.__snapshot_nums.append(header["num"])
+
+    def __read_commits(self, nums: List[int]) -> List[Commit]:
+        """Reads commits (sorted by their numbers) by replaying the log from the
+        nearest snapshot before each of them"""
+        commits = []
+        params, tags, replayed_num = {}, {}, -1
+        with open(self.__path, "rb") as file:
+            for num in nums:
+                entry = self.__entries[num - 1]
+                if num == len(self.__entries):
+                    # the latest commit is kept in memory:
+                    commits.append(self.__commit_of(entry, self.__params, self.__tags))
+                    continue
+                snapshot_num = self.__snapshot_before(num)
+                if snapshot_num > replayed_num:
+                    params, tags = self.__read_snapshot(file, snapshot_num)
+                    replayed_num = snapshot_num
+                for replayed in self.__entries[replayed_num:num]:
+                    params, tags = _apply(
+                        params, replayed, _read_body(file, replayed.offset)
+                    )
+                replayed_num = num
+                commits.append(self.__commit_of(entry, params, tags))
+        return commits
+
+    def __commit_of(self, entry: _LogEntry, params: Dict, tags: Dict) -> Commit:
+        # copied, so that changes to the commit do not change the replayed state:
+        return Commit(
+            id=entry.id,
+            timestamp=pd.Timestamp(entry.timestamp),
+            label=entry.label,
+            params=self.__blobs.from_refs(copy.deepcopy(params)),
+            tags=copy.deepcopy(tags),
+        )
+
+    def __snapshot_before(self, num: int) -> int:
+        i = bisect.bisect_right(self.__snapshot_nums, num)
+        return self.__snapshot_nums[i - 1] if i > 0 else 0
+
+    def __read_snapshot(self, file: BinaryIO, num: int) -> Tuple[Dict, Dict]:
+        if num == 0:
+            return {}, {}
+        body = _read_body(file, self.__snapshot_offsets[num])
+        return body["params"], body["tags"]
+
+
+def _line(header: Dict, body: Optional[Dict]) -> bytes:
+    return (
+        json.dumps(header).encode("utf-8")
+        + _SEPARATOR
+        + JSONSerializer.encode(body).encode("utf-8")
+        + b"\n"
+    )
+
+
+def _read_body(file: BinaryIO, offset: int) -> Dict:
+    file.seek(offset)
+    _, body = file.readline().split(_SEPARATOR, 1)
+    return JSONSerializer.decode(body.decode("utf-8"))
+
+
+def _apply(params: Dict, entry: _LogEntry, body: Dict) -> Tuple[Dict, Dict]:
+    params.update(body["params"])
+    for key in entry.deleted_keys:
+        params.pop(key, None)
+    return params, body["tags"]
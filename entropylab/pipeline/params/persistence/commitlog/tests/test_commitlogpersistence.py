@@ -0,0 +1,155 @@
+import json
+
+import pytest
+
+from entropylab.pipeline.api.errors import EntropyError
+from entropylab.pipeline.params.param_store import Param
+from entropylab.pipeline.params.persistence.commitlog.commitlogpersistence import (
+    CommitLogPersistence,
+)
+from entropylab.pipeline.params.persistence.persistence import Commit
+
+
+@pytest.fixture()
+def path(tmp_path) -> str:
+    return str(tmp_path / "params.log")
+
+
+def commit_params(target, params, dirty_keys=None) -> str:
+    params = {key: Param(value) for key, value in params.items()}
+    return target.commit(Commit(params=params, tags={}), dirty_keys or set(params))
+
+
+def headers_of(path):
+    with open(path, "rb") as file:
+        return [json.loads(line.split(b"\t", 1)[0]) for line in file]
+
+
+""" commit """
+
+
+def test_commit_appends_only_changed_and_deleted_keys(path):
+    # arrange
+    target = CommitLogPersistence(path)
+    commit_params(target, {"foo": 1, "bar": 2})
+    latest = target.get_latest_commit()
+    latest.params["foo"] = Param(3)
+    del latest.params["bar"]
+    # act
+    target.commit(Commit(params=latest.params, tags={}), {"foo", "bar"})
+    # assert
+    header = headers_of(path)[-1]
+    assert header["changed_keys"] == ["foo"]
+    assert header["deleted_keys"] == ["bar"]
+
+
+def test_commit_when_older_commit_is_checked_out_then_its_params_are_changed(path):
+    # arrange
+    target = CommitLogPersistence(path)
+    first_id = commit_params(target, {"foo": 1})
+    commit_params(target, {"foo": 2})
+    first = target.get_commit(first_id)
+    # act
+    target.commit(Commit(params=first.params, tags={}), set())
+    # assert
+    assert target.get_latest_commit().params["foo"].value == 1
+
+
+""" get_commit """
+
+
+def test_get_commit_replays_commits_from_nearest_snapshot(path):
+    # arrange
+    target = CommitLogPersistence(path, snapshot_interval=3)
+    params = {}
+    commit_ids = []
+    for i in range(10):
+        params.update({f"key{i}": i, "foo": i})
+        commit_ids.append(commit_params(target, params))
+    # act
+    actual = [target.get_commit(commit_id) for commit_id in commit_ids]
+    # assert
+    assert [commit.params["foo"].value for commit in actual] == list(range(10))
+    assert len(actual[4].params) == 6
+    assert sum(header["type"] == "snapshot" for header in headers_of(path)) == 3
+
+
+def test_get_commit_when_commit_num_does_not_exist_then_error_is_raised(path):
+    target = CommitLogPersistence(path)
+    with pytest.raises(EntropyError):
+        target.get_commit(commit_num=1)
+
+
+def test_get_commit_when_log_is_appended_by_another_instance_then_commit_is_read(
+    path,
+):
+    # arrange
+    target = CommitLogPersistence(path, snapshot_interval=2)
+    commit_params(target, {"foo": 1})
+    other = CommitLogPersistence(path, snapshot_interval=2)
+    commit_ids = [commit_params(other, {"foo": i}) for i in range(2, 5)]
+    # act
+    actual = target.get_commit(commit_ids[1])
+    # assert
+    assert actual.params["foo"].value == 3
+    assert target.get_latest_commit().id == commit_ids[-1]
+
+
+def test_get_commit_when_last_line_is_incomplete_then_it_is_ignored(path):
+    # arrange
+    target = CommitLogPersistence(path)
+    commit_id = commit_params(target, {"foo": 1})
+    with open(path, "ab") as file:
+        file.write(b'{"type": "commit"')
+    # act
+    actual = CommitLogPersistence(path)
+    # assert
+    assert actual.get_latest_commit().id == commit_id
+    commit_params(actual, {"foo": 2})
+    assert CommitLogPersistence(path).get_latest_commit().params["foo"].value == 2
+
+
+""" search_commits """
+
+
+def test_search_commits_when_key_was_deleted_then_later_commits_are_not_found(path):
+    # arrange
+    target = CommitLogPersistence(path)
+    first_id = commit_params(target, {"foo": 1})
+    target.commit(Commit(params={"bar": Param(2)}, tags={}), {"foo", "bar"})
+    # act
+    actual = target.search_commits(key="foo")
+    # assert
+    assert [commit.id for commit in actual] == [first_id]
+
+
+""" get_history """
+
+
+def test_get_history_returns_values_of_key_in_commits_that_contain_it(path):
+    # arrange
+    target = CommitLogPersistence(path, snapshot_interval=2)
+    id1 = commit_params(target, {"foo": 1, "bar": 1})
+    id2 = commit_params(target, {"foo": 1, "bar": 2}, dirty_keys={"bar"})
+    target.commit(Commit(params={"bar": Param(2)}, tags={}), {"foo"})
+    id4 = commit_params(target, {"foo": 3, "bar": 2}, dirty_keys={"foo"})
+    id5 = commit_params(target, {"foo": 3, "bar": 4}, dirty_keys={"bar"})
+    # act
+    actual = target.get_history("foo")
+    # assert
+    assert [entry.commit_id for entry in actual] == [id1, id2, id4, id5]
+    assert [entry.param.value for entry in actual] == [1, 1, 3, 3]
+
+
+def test_get_history_when_history_is_changed_then_saved_history_is_not_changed(
+    path,
+):
+    # arrange
+    target = CommitLogPersistence(path)
+    commit_params(target, {"foo": [1]})
+    target.get_history("foo")[0].param.value.append(2)
+    # act
+    actual = target.get_history("foo")
+    # assert
+    assert actual[0].param.value == [1]
+    assert target.get_latest_commit().params["foo"].value == [1]
@@ -8,7 +8,9 @@ from pathlib import Path
 import pandas as pd
 from tinydb import TinyDB
 
+from entropylab.pipeline.api.errors import EntropyError
 from entropylab.pipeline.params.param_store import Param
+from entropylab.pipeline.params.persistence.serializers import Serializer, deserialize
 from entropylab.pipeline.params.persistence.tinydb.storage import JSONPickleStorage
 from entropylab.pipeline.params.persistence.tinydb.tinydbpersistence import (
     check_version,
@@ -83,6 +85,36 @@ def migrate_param_store_0_1_to_0_2(path: str | Path, revision: str) -> None:
             new_db.table(TEMP_TABLE).insert(new_temp)
 
 
+def convert_param_store_file(
+    path: str | Path, revision: str, serializer: Serializer
+) -> None:
+    """
+    Backup and re-encode a ParamStore TinyDB file with the given serializer (e.g. to
+    convert a jsonpickle JSON file to the binary format of BinarySerializer).
+    Preserves commits, timestamps and ids.
+
+    :param path: path to an existing TinyDB file containing params.
+    :param revision: the Alembic revision (version) that calls this function.
+    :param serializer: the serializer to encode the file with.
+    """
+    path = str(path)
+    if not os.path.isfile(path):
+        return
+    with open(path, "rb") as file:
+        data = file.read()
+    try:
+        # decoded and encoded before the file is backed up, so that the file is not
+        # changed if it cannot be converted:
+        encoded = serializer.dumps(deserialize(data))
+    except Exception as e:
+        raise EntropyError(f"Cannot convert ParamStore file '{path}': {e}") from e
+    if encoded == data:
+        return
+    _backup_file(path, revision)
+    with open(path, "wb") as file:
+        file.write(encoded)
+
+
 def _backup_file(path: str, revision: str):
     backup_path = f"{path}.{revision}.bak"
     shutil.move(path, backup_path)
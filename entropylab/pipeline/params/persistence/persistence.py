@@ -4,7 +4,7 @@ import time
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from datetime import timedelta, datetime
-from typing import Dict, Optional, Set, List
+from typing import Any, Dict, Optional, Set, List
 
 import pandas as pd
 
@@ -41,6 +41,21 @@ class Persistence(ABC):
     ) -> List[Commit]:
         pass
 
+    def get_history(self, key: str) -> List[HistoryEntry]:
+        """
+        Returns the values of a key in all the commits that contain it, in the order
+        of the commits.
+
+        Backends override this to find the values by an index of the commits of each
+        key, rather than by reading all the commits.
+
+        :param key: the key for which to return values
+        """
+        return [
+            HistoryEntry(commit.id, commit.timestamp, commit.label, commit.params[key])
+            for commit in self.search_commits(key=key)
+        ]
+
     @abstractmethod
     def save_temp_commit(self, commit):
         pass
@@ -94,3 +109,17 @@ class Metadata:
     def __post_init__(self):
         self.id = self.id or ""
         self.timestamp = self.timestamp or pd.Timestamp(time.time_ns())
+
+
+@dataclass
+class HistoryEntry:
+    """The value (Param) of a key in a commit"""
+
+    commit_id: str
+    timestamp: pd.Timestamp
+    label: Optional[str]
+    param: Any
+
+    @property
+    def local_timestamp(self):
+        return self.timestamp.tz_localize(UTC_TZ).tz_convert(LOCAL_TZ)
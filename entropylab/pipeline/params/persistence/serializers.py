@@ -0,0 +1,344 @@
+"""Serializers of the data of ParamStore persistence backends (commits and their
+Params, timestamps, numpy arrays etc.).
+
+BinarySerializer encodes data in the MessagePack format (https://msgpack.org) with the
+optional `msgpack` package, with extension types for Params, timestamps, numpy arrays
+and other types that MessagePack does not support natively. JSONSerializer encodes the
+same types as tagged JSON objects, for persistence backends that need text (e.g. JSON
+database columns). Both encode types that they do not support natively with
+jsonpickle. JSONSerializer also decodes jsonpickle JSON, as written by JSONPickleSerializer.
+"""
+from __future__ import annotations
+
+import base64
+import datetime
+import gc
+import json
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple
+
+import jsonpickle
+import numpy as np
+import pandas as pd
+from tinydb.table import Document
+
+from entropylab.config import settings
+from entropylab.pipeline.api.errors import EntropyError
+from entropylab.pipeline.params.persistence.blobs import BlobRef
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+# binary data starts with a byte that is never used by MessagePack (nor by JSON text):
+BINARY_MAGIC = b"\xc1EP1"
+
+_DEFAULT_SERIALIZER = "jsonpickle"
+
+
+class Serializer(ABC):
+    """Encodes the data of a ParamStore persistence backend as bytes"""
+
+    @abstractmethod
+    def dumps(self, obj: Any) -> bytes:
+        pass
+
+    @abstractmethod
+    def loads(self, data: bytes) -> Any:
+        pass
+
+
+class JSONPickleSerializer(Serializer):
+    """Encodes data as jsonpickle JSON"""
+
+    def dumps(self, obj: Any) -> bytes:
+        return jsonpickle.encode(obj).encode("utf-8")
+
+    def loads(self, data: bytes | str) -> Any:
+        return jsonpickle.decode(_text_of(data))
+
+
+class JSONSerializer(Serializer):
+    """Encodes data as JSON, with tagged JSON objects for Params, timestamps, numpy
+    arrays etc. (e.g. {"~param": {"value": 1.0, ...}}).
+
+    Also decodes jsonpickle JSON."""
+
+    def dumps(self, obj: Any) -> bytes:
+        return self.encode(obj).encode("utf-8")
+
+    def loads(self, data: bytes | str) -> Any:
+        return self.decode(_text_of(data))
+
+    @staticmethod
+    def encode(obj: Any) -> str:
+        return json.dumps(_to_json(obj), separators=(",", ":"))
+
+    @staticmethod
+    def decode(text: str) -> Any:
+        if '"py/' in text:
+            # possibly encoded by jsonpickle:
+            try:
+                return json.loads(text, object_hook=_from_json_or_jsonpickle)
+            except _JSONPickleEncoded:
+                return jsonpickle.decode(text)
+        return json.loads(text, object_hook=_from_json)
+
+
+class BinarySerializer(Serializer):
+    """Encodes data in the MessagePack format, with extension types for Params,
+    timestamps, numpy arrays etc.
+
+    Numpy arrays are encoded as their raw bytes, so they are much smaller and faster to
+    encode and decode than in JSON.
+
+    Requires the optional `msgpack` package (install it with
+    'pip install entropylab[msgpack]')."""
+
+    def __init__(self):
+        if msgpack is None:
+            raise EntropyError(
+                "The 'binary' ParamStore serializer requires the 'msgpack' package. "
+                "Install it with 'pip install entropylab[msgpack]'"
+            )
+
+    def dumps(self, obj: Any) -> bytes:
+        try:
+            return BINARY_MAGIC + _msgpack_packb(obj)
+        except OverflowError:
+            # ints beyond 64 bits, that MessagePack does not support, so obj is encoded
+            # as jsonpickle:
+            return BINARY_MAGIC + _msgpack_packb(
+                msgpack.ExtType(
+                    _JSONPICKLE.code, _msgpack_packb(jsonpickle.encode(obj))
+                )
+            )
+
+    def loads(self, data: bytes) -> Any:
+        if not data.startswith(BINARY_MAGIC):
+            raise EntropyError("Data was not encoded by BinarySerializer")
+        # decoding creates many objects (e.g. Params), and is faster without garbage
+        # collections triggered by their allocation:
+        is_gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return _msgpack_unpackb(memoryview(data)[len(BINARY_MAGIC) :])
+        finally:
+            if is_gc_enabled:
+                gc.enable()
+
+
+SERIALIZERS: Dict[str, Callable[[], Serializer]] = {
+    "binary": BinarySerializer,
+    "json": JSONSerializer,
+    "jsonpickle": JSONPickleSerializer,
+}
+
+
+def get_serializer(name: str | None = None) -> Serializer:
+    """Returns the serializer with the given name ("binary", "json" or
+    "jsonpickle"), or the one named by the `param_store_serializer` config setting"""
+    if name is None:
+        name = settings.get("param_store_serializer", _DEFAULT_SERIALIZER)
+    if name not in SERIALIZERS:
+        raise EntropyError(
+            f"Unknown ParamStore serializer '{name}'. "
+            f"Serializers are: {', '.join(SERIALIZERS)}"
+        )
+    return SERIALIZERS[name]()
+
+
+def deserialize(data: bytes) -> Any:
+    """Decodes data that was encoded by any of the serializers"""
+    if data.startswith(BINARY_MAGIC):
+        return BinarySerializer().loads(data)
+    return JSONSerializer().loads(data)
+
+
+def _text_of(data: bytes | str) -> str:
+    return data.decode("utf-8") if isinstance(data, bytes) else data
+
+
+""" Extension types """
+
+
+class _Ext(NamedTuple):
+    code: int
+    name: str
+    decode: Callable[[Any], Any]
+
+
+@lru_cache(maxsize=None)
+def _param_type() -> type:
+    # imported lazily, because param_store imports the persistence backends:
+    from entropylab.pipeline.params.param_store import Param
+
+    return Param
+
+
+def _param_of(state: Dict) -> Any:
+    param = _param_type()(None)
+    param.__dict__.update(state)
+    return param
+
+
+def _ndarray_of(state: List) -> np.ndarray:
+    dtype, shape, data = state
+    # copied, so that the array is writable:
+    return np.frombuffer(data, dtype=np.dtype(dtype)).reshape(shape).copy()
+
+
+def _numpy_scalar_of(state: List) -> np.generic:
+    dtype, data = state
+    return np.frombuffer(data, dtype=np.dtype(dtype))[0]
+
+
+_JSONPICKLE = _Ext(0, "jsonpickle", jsonpickle.decode)
+_PARAM = _Ext(1, "param", _param_of)
+_TIMESTAMP = _Ext(2, "timestamp", pd.Timestamp)
+_NDARRAY = _Ext(3, "ndarray", _ndarray_of)
+_NUMPY_SCALAR = _Ext(4, "npscalar", _numpy_scalar_of)
+_TIMEDELTA = _Ext(5, "timedelta", pd.Timedelta)
+_PY_TIMEDELTA = _Ext(6, "pytimedelta", lambda state: datetime.timedelta(*state))
+_TUPLE = _Ext(7, "tuple", tuple)
+_SET = _Ext(8, "set", set)
+_COMPLEX = _Ext(9, "complex", lambda state: complex(*state))
+_BLOB_REF = _Ext(10, "blob", BlobRef)
+# JSON only (bytes and dicts are native to MessagePack):
+_BYTES = _Ext(11, "bytes", base64.b64decode)
+_DICT = _Ext(12, "dict", dict)
+
+_EXTS_BY_CODE = {
+    ext.code: ext
+    for ext in [
+        _JSONPICKLE,
+        _PARAM,
+        _TIMESTAMP,
+        _NDARRAY,
+        _NUMPY_SCALAR,
+        _TIMEDELTA,
+        _PY_TIMEDELTA,
+        _TUPLE,
+        _SET,
+        _COMPLEX,
+        _BLOB_REF,
+        _BYTES,
+        _DICT,
+    ]
+}
+_EXTS_BY_TAG = {"~" + ext.name: ext for ext in _EXTS_BY_CODE.values()}
+
+
+def _is_plain(dtype: np.dtype) -> bool:
+    """Whether arrays of dtype can be encoded as their raw bytes"""
+    return dtype.fields is None and dtype.kind not in "OV" and dtype.itemsize > 0
+
+
+def _ext_of(obj: Any) -> Tuple[_Ext, Any]:
+    """Returns the extension type of obj and the state to encode it by"""
+    cls = type(obj)
+    if cls is _param_type():
+        return _PARAM, vars(obj)
+    if cls is pd.Timestamp and obj.tz is None:
+        return _TIMESTAMP, obj.value
+    if cls is np.ndarray and _is_plain(obj.dtype):
+        return _NDARRAY, [
+            obj.dtype.str,
+            list(obj.shape),
+            np.ascontiguousarray(obj).tobytes(),
+        ]
+    if isinstance(obj, np.generic) and _is_plain(obj.dtype):
+        return _NUMPY_SCALAR, [obj.dtype.str, obj.tobytes()]
+    if cls is pd.Timedelta:
+        return _TIMEDELTA, obj.value
+    if cls is datetime.timedelta:
+        return _PY_TIMEDELTA, [obj.days, obj.seconds, obj.microseconds]
+    if cls is tuple:
+        return _TUPLE, list(obj)
+    if cls is set:
+        return _SET, list(obj)
+    if cls is complex:
+        return _COMPLEX, [obj.real, obj.imag]
+    if cls is BlobRef:
+        return _BLOB_REF, obj.digest
+    return _JSONPICKLE, jsonpickle.encode(obj)
+
+
+""" JSON """
+
+_JSON_SCALARS = {str, float, bool, type(None)}
+_MAX_INT = 2**63
+# prefixes of the keys of tagged objects (of JSONSerializer and of jsonpickle):
+_TAG_PREFIXES = ("~", "py/")
+
+
+def _to_json(obj: Any) -> Any:
+    cls = type(obj)
+    if cls in _JSON_SCALARS or (cls is int and -_MAX_INT <= obj < _MAX_INT):
+        return obj
+    if cls is dict or cls is Document:
+        if all(type(key) is str and not key.startswith(_TAG_PREFIXES) for key in obj):
+            return {key: _to_json(value) for key, value in obj.items()}
+        # keys that JSON does not support, or that could be mistaken for tags:
+        return {
+            "~dict": [[_to_json(key), _to_json(value)] for key, value in obj.items()]
+        }
+    if cls is list:
+        return [_to_json(value) for value in obj]
+    if cls is bytes:
+        return {"~bytes": base64.b64encode(obj).decode("ascii")}
+    ext, state = _ext_of(obj)
+    return {"~" + ext.name: _to_json(state)}
+
+
+def _from_json(obj: Dict) -> Any:
+    if len(obj) == 1:
+        ((tag, state),) = obj.items()
+        ext = _EXTS_BY_TAG.get(tag)
+        if ext is not None:
+            return ext.decode(state)
+    return obj
+
+
+class _JSONPickleEncoded(Exception):
+    pass
+
+
+def _from_json_or_jsonpickle(obj: Dict) -> Any:
+    # jsonpickle tags are the first keys of objects, and are never written by
+    # JSONSerializer (which tags objects with such keys as "~dict"):
+    if obj and next(iter(obj)).startswith("py/"):
+        raise _JSONPickleEncoded()
+    return _from_json(obj)
+
+
+""" MessagePack """
+
+
+def _msgpack_packb(obj: Any) -> bytes:
+    # strict types, so that subclasses (e.g. Param, a subclass of dict) are encoded
+    # by _msgpack_default():
+    return msgpack.packb(
+        obj, default=_msgpack_default, use_bin_type=True, strict_types=True
+    )
+
+
+def _msgpack_default(obj: Any) -> Any:
+    if type(obj) is Document:
+        return dict(obj)
+    ext, state = _ext_of(obj)
+    return msgpack.ExtType(ext.code, _msgpack_packb(state))
+
+
+def _msgpack_unpackb(data: bytes | memoryview) -> Any:
+    return msgpack.unpackb(
+        data, ext_hook=_msgpack_ext_hook, raw=False, strict_map_key=False
+    )
+
+
+def _msgpack_ext_hook(code: int, data: bytes) -> Any:
+    if code not in _EXTS_BY_CODE:
+        raise EntropyError(f"Unknown MessagePack extension type {code}")
+    return _EXTS_BY_CODE[code].decode(_msgpack_unpackb(data))
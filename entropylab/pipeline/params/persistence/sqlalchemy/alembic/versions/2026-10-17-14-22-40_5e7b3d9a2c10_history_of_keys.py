@@ -0,0 +1,102 @@
+"""history of keys
+
+Revision ID: 5e7b3d9a2c10
+Revises: 000c6a88457f
+Create Date: 2026-10-17 14:22:40.318204+00:00
+
+"""
+import json
+import uuid
+
+import jsonpickle
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "5e7b3d9a2c10"
+down_revision = "000c6a88457f"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    _encode_values_separately()
+    history = op.create_table(
+        "history",
+        sa.Column("key", sa.String(), nullable=False),
+        sa.Column("commit_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["commit_id"],
+            ["commit.id"],
+        ),
+        sa.PrimaryKeyConstraint("key", "commit_id"),
+    )
+    # the keys of existing commits are indexed from their params:
+    rows = op.get_bind().execute(sa.text('SELECT id, params FROM "commit"'))
+    op.bulk_insert(
+        history,
+        [
+            dict(key=key, commit_id=uuid.UUID(str(commit_id)))
+            for commit_id, params in rows.fetchall()
+            for key in _keys_of(params)
+        ],
+    )
+
+
+def _keys_of(params) -> list:
+    params = _json_of(params)
+    return list(params) if isinstance(params, dict) else []
+
+
+def _encode_values_separately() -> None:
+    """The history of a key is read by extracting its value from the params of each
+    commit, which only works if the value does not reference the values of other keys.
+    Params that were encoded by jsonpickle as a whole document (with "py/id"
+    references between values) are re-encoded with each value encoded by itself, as
+    a tagged jsonpickle value of JSONSerializer"""
+    conn = op.get_bind()
+    rows = conn.execute(sa.text('SELECT id, params FROM "commit"')).fetchall()
+    for commit_id, params in rows:
+        if not _has_jsonpickle_tags(_json_of(params)):
+            continue
+        if not isinstance(params, str):
+            params = json.dumps(params)
+        conn.execute(
+            sa.text('UPDATE "commit" SET params=:params WHERE id=:id'),
+            dict(
+                params=json.dumps(_encode_each(jsonpickle.decode(params))), id=commit_id
+            ),
+        )
+
+
+def _encode_each(params: dict) -> dict:
+    encoded = {}
+    for key, value in params.items():
+        value_json = jsonpickle.encode(value)
+        if _has_jsonpickle_tags(json.loads(value_json)):
+            encoded[key] = {"~jsonpickle": value_json}
+        else:
+            encoded[key] = json.loads(value_json)
+    return encoded
+
+
+def _has_jsonpickle_tags(obj) -> bool:
+    if isinstance(obj, dict):
+        return any(
+            (isinstance(key, str) and key.startswith("py/"))
+            or _has_jsonpickle_tags(value)
+            for key, value in obj.items()
+        )
+    if isinstance(obj, list):
+        return any(_has_jsonpickle_tags(value) for value in obj)
+    return False
+
+
+def _json_of(params):
+    # JSON is decoded by PostgreSQL drivers, but not by sqlite:
+    return json.loads(params) if isinstance(params, str) else params
+
+
+def downgrade() -> None:
+    op.drop_table("history")
@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Column, String, DateTime
+from sqlalchemy import Column, String, DateTime, ForeignKey
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import declarative_base, declarative_mixin
@@ -81,3 +81,15 @@ class TempTable(CommitMixin, Base):
 
     def __repr__(self):
         return f"<TempTable(commit_id={self.id}, label={self.label})>"
+
+
+class HistoryTable(Base):
+    """The keys of the params in each commit, by which the commits that contain a key
+    are found (see SqlAlchemyPersistence.get_history)"""
+
+    __tablename__ = "history"
+    key = Column(String, primary_key=True)
+    commit_id = Column(UUID(as_uuid=True), ForeignKey("commit.id"), primary_key=True)
+
+    def __repr__(self):
+        return f"<HistoryTable(key={self.key}, commit_id={self.commit_id})>"
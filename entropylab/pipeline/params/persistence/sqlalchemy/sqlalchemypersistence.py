@@ -4,18 +4,27 @@ from uuid import UUID
 from pathlib import Path
 from typing import Optional, Set, List
 
-import jsonpickle
+import pandas as pd
+
 from alembic import command
 from alembic.config import Config
-from sqlalchemy import create_engine, text
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine
 from sqlalchemy.engine import Connection
 from sqlalchemy.orm import sessionmaker, close_all_sessions
 
 from entropylab.pipeline.api.errors import EntropyError
-from entropylab.pipeline.params.persistence.persistence import Persistence, Commit
+from entropylab.pipeline.params.persistence.persistence import (
+    Persistence,
+    Commit,
+    HistoryEntry,
+)
+from entropylab.pipeline.params.persistence.serializers import JSONSerializer
 from entropylab.pipeline.params.persistence.sqlalchemy.model import (
     CommitTable,
     TempTable,
+    HistoryTable,
 )
 
 TEMP_COMMIT_ID = UUID("00000000-0000-0000-0000-000000000000")
@@ -23,19 +32,27 @@ TEMP_COMMIT_ID = UUID("00000000-0000-0000-0000-000000000000")
 
 class SqlAlchemyPersistence(Persistence):
     def __init__(self, url: Optional[str] = None):
+        # JSONSerializer also decodes rows that were encoded by jsonpickle:
         self.engine = create_engine(
             url,
-            json_serializer=jsonpickle.encode,
-            json_deserializer=jsonpickle.decode,
+            json_serializer=JSONSerializer.encode,
+            json_deserializer=JSONSerializer.decode,
         )
         self.__session_maker = sessionmaker(bind=self.engine)
-        if self._db_is_empty():
-            self.__init()
+        self.__upgrade()
 
-    def __init(self):
+    def __upgrade(self):
+        """Creates the schema in empty dbs, and upgrades the schema of existing ones
+        (unless they are already at the head revision)"""
         with self.engine.connect() as connection:
             alembic_cfg = self.__alembic_build_config(connection)
-            command.upgrade(alembic_cfg, "head")
+            current = MigrationContext.configure(connection).get_current_revision()
+            head = ScriptDirectory.from_config(alembic_cfg).get_current_head()
+            if current != head:
+                command.upgrade(alembic_cfg, "head")
+                # alembic does not commit the transaction that was begun by reading
+                # the current revision:
+                connection.commit()
 
     def __alembic_build_config(self, connection: Connection) -> Config:
         config_location = self._abs_path_to("alembic.ini")
@@ -116,6 +133,12 @@ class SqlAlchemyPersistence(Persistence):
         commit_table.tags = commit.tags
         with self.__session_maker() as session:
             session.add(commit_table)
+            # flushed first, so that history rows are inserted after the commit row:
+            session.flush()
+            session.add_all(
+                HistoryTable(key=key, commit_id=commit_table.id)
+                for key in commit.params
+            )
             session.commit()
             return commit.id
 
@@ -134,6 +157,25 @@ class SqlAlchemyPersistence(Persistence):
                 commits = commits.filter(CommitTable.params.contains(key))
             return commits.all()
 
+    def get_history(self, key: str) -> List[HistoryEntry]:
+        with self.__session_maker() as session:
+            rows = (
+                session.query(
+                    CommitTable.id,
+                    CommitTable.timestamp,
+                    CommitTable.label,
+                    CommitTable.params[key],
+                )
+                .join(HistoryTable, HistoryTable.commit_id == CommitTable.id)
+                .filter(HistoryTable.key == key)
+                .order_by(CommitTable.timestamp.asc())
+                .all()
+            )
+            return [
+                HistoryEntry(str(commit_id), pd.Timestamp(timestamp), label, param)
+                for commit_id, timestamp, label, param in rows
+            ]
+
     def save_temp_commit(self, commit: Commit) -> None:
         with self.__session_maker() as session:
             temp = session.get(TempTable, TEMP_COMMIT_ID)
@@ -170,10 +212,3 @@ class SqlAlchemyPersistence(Persistence):
                     tags=temp.tags,
                 )
             return commit
-
-    def _db_is_empty(self) -> bool:
-        with self.__session_maker() as session:
-            result = session.execute(
-                text("SELECT sql FROM sqlite_master WHERE type = 'table'")
-            )
-            return len(result.fetchall()) == 0
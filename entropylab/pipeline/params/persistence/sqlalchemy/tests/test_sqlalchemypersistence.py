@@ -1,5 +1,6 @@
 from uuid import UUID
 
+import jsonpickle
 import pandas as pd
 import pytest
 from sqlalchemy import text
@@ -7,6 +8,7 @@ from sqlalchemy import text
 from entropylab.pipeline.api.errors import EntropyError
 from entropylab.pipeline.params.param_store import Param
 from entropylab.pipeline.params.persistence.persistence import Commit
+from entropylab.pipeline.params.persistence.sqlalchemy import sqlalchemypersistence
 from entropylab.pipeline.params.persistence.sqlalchemy.sqlalchemypersistence import (
     SqlAlchemyPersistence,
 )
@@ -27,13 +29,84 @@ def test_ctor_creates_schema(target):
         cursor = connection.execute(
             text("SELECT sql FROM sqlite_master WHERE type = 'table'")
         )
-        assert len(cursor.fetchall()) == 3
+        assert len(cursor.fetchall()) == 4
 
 
 def test_ctor_stamps_head(target):
     with target.engine.connect() as connection:
         cursor = connection.execute(text("SELECT version_num FROM alembic_version"))
-        assert cursor.first() == ("000c6a88457f",)
+        assert cursor.first() == ("5e7b3d9a2c10",)
+
+
+def test_ctor_when_db_has_commits_then_history_of_their_keys_is_created(tmp_path):
+    # arrange
+    url = f"sqlite:///{tmp_path / 'sqlite.db'}"
+    target = SqlAlchemyPersistence(url)
+    commit_id = "f74c808e-2388-4b0a-a051-17eb9eb14339"
+    with target.engine.begin() as connection:
+        connection.execute(text("DROP TABLE history"))
+        connection.execute(
+            text("UPDATE alembic_version SET version_num = '000c6a88457f'")
+        )
+        connection.execute(
+            text(
+                "INSERT INTO 'commit' VALUES "
+                f"('{UUID(commit_id).hex}', '{pd.Timestamp.now()}', 'bar', "
+                "'{\"foo\": 1, \"baz\": 2}', '{}');"
+            )
+        )
+    # act
+    actual = SqlAlchemyPersistence(url)
+    # assert
+    history = actual.get_history("foo")
+    assert [entry.commit_id for entry in history] == [commit_id]
+    assert history[0].param == 1
+    assert actual.get_history("baz")[0].label == "bar"
+
+
+def test_ctor_when_params_reference_each_other_then_history_resolves_them(tmp_path):
+    # arrange
+    url = f"sqlite:///{tmp_path / 'sqlite.db'}"
+    target = SqlAlchemyPersistence(url)
+    commit_id = "f74c808e-2388-4b0a-a051-17eb9eb14339"
+    shared = Param(pd.Timestamp(5))
+    # encoded by jsonpickle as a whole, so "bar" is a "py/id" reference to "foo":
+    params = jsonpickle.encode({"foo": shared, "bar": shared})
+    assert "py/id" in params
+    with target.engine.begin() as connection:
+        connection.execute(text("DROP TABLE history"))
+        connection.execute(
+            text("UPDATE alembic_version SET version_num = '000c6a88457f'")
+        )
+        connection.execute(
+            text(
+                "INSERT INTO 'commit' VALUES "
+                f"('{UUID(commit_id).hex}', '{pd.Timestamp.now()}', NULL, "
+                ":params, '{}');"
+            ),
+            dict(params=params),
+        )
+    # act
+    actual = SqlAlchemyPersistence(url)
+    # assert
+    assert actual.get_history("bar")[0].param.value == pd.Timestamp(5)
+    assert actual.get_commit(commit_id).params["bar"].value == pd.Timestamp(5)
+
+
+def test_ctor_when_db_is_at_head_then_it_is_not_upgraded(tmp_path, monkeypatch):
+    # arrange
+    url = f"sqlite:///{tmp_path / 'sqlite.db'}"
+    SqlAlchemyPersistence(url)
+    upgrades = []
+    monkeypatch.setattr(
+        sqlalchemypersistence.command,
+        "upgrade",
+        lambda *args, **kwargs: upgrades.append(args),
+    )
+    # act
+    SqlAlchemyPersistence(url)
+    # assert
+    assert upgrades == []
 
 
 """ get_commit """
@@ -79,6 +152,24 @@ def test_get_commit_when_commit_num_does_not_exist_then_error_is_raised(target):
         target.get_commit(commit_num=2)
 
 
+""" get_history """
+
+
+def test_get_history_returns_values_of_key_in_commits_that_contain_it(target):
+    # arrange
+    commit_id1 = target.commit(
+        Commit(params={"foo": Param(1), "bar": Param(1)}, tags={}, label="alpha")
+    )
+    target.commit(Commit(params={"bar": Param(2)}, tags={}))
+    commit_id3 = target.commit(Commit(params={"foo": Param(3)}, tags={}))
+    # act
+    actual = target.get_history("foo")
+    # assert
+    assert [entry.commit_id for entry in actual] == [commit_id1, commit_id3]
+    assert [entry.param.value for entry in actual] == [1, 3]
+    assert actual[0].label == "alpha"
+
+
 def test_save_temp_commit_can_be_called_more_than_once_with_params(target):
     commit1 = Commit(params={"foo": Param("bar")}, tags={})
     target.save_temp_commit(commit1)
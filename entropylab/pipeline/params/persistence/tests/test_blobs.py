@@ -0,0 +1,44 @@
+import os
+
+import numpy as np
+
+from entropylab.pipeline.params.param_store import Param
+from entropylab.pipeline.params.persistence.blobs import BlobStore, BlobRef
+
+
+def test_put_when_value_is_saved_twice_then_it_is_saved_once(tmp_path):
+    # arrange
+    target = BlobStore(tmp_path)
+    # act
+    ref1 = target.put(np.arange(100))
+    ref2 = target.put(np.arange(100))
+    # assert
+    assert ref1 == ref2
+    assert os.listdir(tmp_path) == [f"{ref1.digest}.npy"]
+
+
+def test_put_when_dtypes_differ_then_refs_differ(tmp_path):
+    target = BlobStore(tmp_path)
+    assert target.put(np.zeros(8, np.int8)) != target.put(np.zeros(1, np.int64))
+
+
+def test_to_refs_replaces_only_large_values(tmp_path):
+    # arrange
+    target = BlobStore(tmp_path, threshold=1000)
+    params = {"small": Param(np.arange(10)), "large": Param(np.arange(1000))}
+    # act
+    actual = target.to_refs(params)
+    # assert
+    assert actual["small"] is params["small"]
+    assert isinstance(actual["large"].value, BlobRef)
+    assert isinstance(params["large"].value, np.ndarray)
+
+
+def test_from_refs_restores_values(tmp_path):
+    # arrange
+    target = BlobStore(tmp_path, threshold=1000)
+    params = target.to_refs({"large": Param(np.arange(1000))})
+    # act
+    actual = target.from_refs(params)
+    # assert
+    assert np.array_equal(actual["large"].value, np.arange(1000))
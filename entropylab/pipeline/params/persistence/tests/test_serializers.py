@@ -0,0 +1,157 @@
+import datetime
+from fractions import Fraction
+
+import jsonpickle
+import numpy as np
+import pandas as pd
+import pytest
+
+from entropylab.pipeline.api.errors import EntropyError
+from entropylab.pipeline.params.param_store import Param
+from entropylab.pipeline.params.persistence import serializers
+from entropylab.pipeline.params.persistence.blobs import BlobRef
+from entropylab.pipeline.params.persistence.serializers import (
+    BINARY_MAGIC,
+    BinarySerializer,
+    JSONPickleSerializer,
+    JSONSerializer,
+    deserialize,
+    get_serializer,
+)
+
+SERIALIZERS = ["binary", "json", "jsonpickle"]
+
+
+@pytest.fixture(params=SERIALIZERS)
+def serializer(request):
+    if request.param == "binary" and serializers.msgpack is None:
+        pytest.skip("msgpack is not installed")
+    return get_serializer(request.param)
+
+
+def _param(value, expiration=None):
+    param = Param(value)
+    param.commit_id = "abc"
+    param.expiration = expiration
+    return param
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        None,
+        True,
+        -1,
+        2**40,
+        -(2**40),
+        2**70,
+        1.5,
+        "foo" * 20,
+        b"bar",
+        [1, [2, "3"]],
+        (1, 2),
+        {3, 4},
+        1 + 2j,
+        {"foo": {"bar": 1}},
+        np.float32(1.5),
+        np.int64(7),
+        pd.Timestamp(1_650_000_000_000_000_001),
+        pd.Timestamp(1, tz="UTC"),
+        pd.Timedelta(seconds=60),
+        datetime.timedelta(days=1, seconds=2, microseconds=3),
+        BlobRef("0123abcd"),
+        Fraction(1, 3),
+        _param(42, pd.Timestamp(1_650_000_000_000_000_000)),
+    ],
+)
+def test_loads_when_value_is_dumped_then_it_is_restored(serializer, value):
+    # act
+    actual = serializer.loads(serializer.dumps({"key": value}))["key"]
+    # assert
+    assert actual == value
+    assert type(actual) is type(value)
+    if isinstance(value, Param):
+        assert vars(actual) == vars(value)
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        np.arange(12, dtype=np.int16).reshape(3, 4),
+        np.arange(12.0).reshape(3, 4).T,
+        np.array([1 + 2j, 3 - 4j]),
+        np.array(["foo", "bar"]),
+        np.array([1, "foo"], dtype=object),
+        np.zeros(0),
+    ],
+)
+def test_loads_when_array_is_dumped_then_it_is_restored(serializer, value):
+    # act
+    actual = serializer.loads(serializer.dumps(_param(value))).value
+    # assert
+    assert actual.dtype == value.dtype
+    assert np.array_equal(actual, value)
+
+
+@pytest.mark.parametrize("serializer", ["binary", "json"], indirect=True)
+@pytest.mark.parametrize(
+    "value",
+    [{1: "foo", (2, 3): "bar", None: "baz"}, {"~param": 1, "py/object": 2}],
+)
+def test_loads_when_dict_keys_are_not_json_keys_then_they_are_restored(
+    serializer, value
+):
+    # act
+    actual = serializer.loads(serializer.dumps(value))
+    # assert
+    assert actual == value
+
+
+@pytest.mark.parametrize("serializer", ["binary"], indirect=True)
+def test_dumps_binary_is_message_pack(serializer):
+    # act
+    actual = serializer.dumps({"a": [1, -1, None, True, 1.5]})
+    # assert
+    assert actual == BINARY_MAGIC + (
+        b"\x81\xa1a\x95\x01\xff\xc0\xc3\xcb\x3f\xf8\x00\x00\x00\x00\x00\x00"
+    )
+
+
+def test_binary_serializer_when_msgpack_is_not_installed_then_error_is_raised(
+    monkeypatch,
+):
+    # arrange
+    monkeypatch.setattr(serializers, "msgpack", None)
+    # act & assert
+    with pytest.raises(EntropyError, match="msgpack"):
+        get_serializer("binary")
+
+
+def test_loads_json_when_data_is_jsonpickle_then_it_is_decoded():
+    # arrange
+    data = jsonpickle.encode({"foo": _param((1, 2), pd.Timestamp(5))})
+    # act
+    actual = JSONSerializer().loads(data)
+    # assert
+    assert vars(actual["foo"]) == vars(_param((1, 2), pd.Timestamp(5)))
+
+
+def test_deserialize_decodes_data_of_all_serializers(serializer):
+    # act
+    actual = deserialize(serializer.dumps({"foo": _param(42)}))
+    # assert
+    assert vars(actual["foo"]) == vars(_param(42))
+
+
+def test_loads_binary_when_data_is_not_binary_then_error_is_raised():
+    with pytest.raises(EntropyError):
+        BinarySerializer().loads(b'{"foo": 42}')
+
+
+def test_get_serializer_when_name_is_unknown_then_error_is_raised():
+    with pytest.raises(EntropyError):
+        get_serializer("foo")
+
+
+def test_get_serializer_default_is_jsonpickle():
+    assert isinstance(get_serializer(), JSONPickleSerializer)
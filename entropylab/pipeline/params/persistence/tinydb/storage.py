@@ -1,40 +1,78 @@
 from __future__ import annotations
 
 import os
+from typing import Optional, Tuple
 
-import jsonpickle as jsonpickle
 from tinydb import Storage
 
 from entropylab.logger import logger
+from entropylab.pipeline.params.persistence.serializers import (
+    Serializer,
+    JSONPickleSerializer,
+    deserialize,
+    get_serializer,
+)
 
 
-class JSONPickleStorage(Storage):
-    def __init__(self, filename):
+class FileStorage(Storage):
+    """A TinyDB storage of a file encoded by a Serializer.
+
+    Files are written by the given serializer (by default, the one named by the
+    `param_store_serializer` config setting), and are read whatever serializer they
+    were written by.
+
+    The decoded data is kept in memory and is read from the file again only when the
+    file is changed (e.g. by another process), as detected by its modification time
+    and size. Note that the data returned by read() is the kept data, and should be
+    copied before it is changed by anything but TinyDB."""
+
+    def __init__(self, filename, serializer: Optional[Serializer] = None):
         self.filename = filename
+        self.serializer = serializer or get_serializer()
+        self._data = None
+        # (modification time, size) of the file when _data was read or written:
+        self.stamp: Optional[Tuple[int, int]] = None
 
     def read(self):
-        if not os.path.isfile(self.filename):
+        stamp = _stamp_of(self.filename)
+        if stamp is None:
             return None
-        with open(self.filename) as handle:
+        if stamp == self.stamp:
+            return self._data
+        with open(self.filename, "rb") as handle:
             # noinspection PyBroadException
             try:
-                s = handle.read()
-                data = jsonpickle.decode(s)
+                data = deserialize(handle.read())
+                self._data, self.stamp = data, stamp
                 return data
             except BaseException:
-                logger.exception(
-                    f"Exception decoding TinyDB JSON file '{self.filename}'"
-                )
+                logger.exception(f"Exception decoding TinyDB file '{self.filename}'")
                 return None
 
     def write(self, data):
         # noinspection PyBroadException
         try:
-            with open(self.filename, "w+") as handle:
-                s = jsonpickle.encode(data)
-                handle.write(s)
+            with open(self.filename, "wb") as handle:
+                handle.write(self.serializer.dumps(data))
+            self._data, self.stamp = data, _stamp_of(self.filename)
         except BaseException:
-            logger.exception(f"Exception encoding TinyDB JSON file '{self.filename}'")
+            self._data, self.stamp = None, None
+            logger.exception(f"Exception encoding TinyDB file '{self.filename}'")
 
     def close(self):
         pass
+
+
+class JSONPickleStorage(FileStorage):
+    """A TinyDB storage of a jsonpickle-encoded JSON file"""
+
+    def __init__(self, filename):
+        super().__init__(filename, JSONPickleSerializer())
+
+
+def _stamp_of(filename: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(filename)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
@@ -7,7 +7,7 @@ import os
 import string
 from pathlib import Path
 from random import SystemRandom
-from typing import Optional, Callable, List, Set
+from typing import Optional, Callable, List, Set, Dict
 
 from filelock import FileLock
 from tinydb import TinyDB, Query
@@ -16,11 +16,16 @@ from tinydb.table import Table, Document
 
 from entropylab.logger import logger
 from entropylab.pipeline.api.errors import EntropyError
+from entropylab.pipeline.params.persistence.blobs import BlobStore
 from entropylab.pipeline.params.persistence.persistence import (
     Persistence,
     Commit,
+    HistoryEntry,
+)
+from entropylab.pipeline.params.persistence.tinydb.storage import (
+    FileStorage,
+    JSONPickleStorage,
 )
-from entropylab.pipeline.params.persistence.tinydb.storage import JSONPickleStorage
 
 CURRENT_VERSION = "0.2"
 
@@ -31,11 +36,37 @@ TEMP_TABLE = "temp"
 VERSION_KEY = "version"
 REVISION_KEY = "revision"
 
+# stamp of an index that has not been built yet (see TinyDbPersistence.__update_index):
+_NO_STAMP = object()
+
 
 class TinyDbPersistence(Persistence):
-    def __init__(self, path: Optional[str] | Optional[Path] = None):
+    """Persists ParamStore commits as documents in a TinyDB file.
+
+    Commits are found by an in-memory index of commit ids to document ids, and the
+    values of a key by an in-memory index of keys to the documents that contain them.
+    The indices (and the latest commit) are kept up to date by commits of this
+    instance, and are rebuilt when the file is changed by others, as detected by the
+    modification time and size of the file (see FileStorage)."""
+
+    def __init__(
+        self, path: Optional[str] | Optional[Path] = None, save_blobs: bool = False
+    ):
+        """
+        :param path: the path of the TinyDB file, or None to persist in memory
+        :param save_blobs: whether to save large param values once, in a
+                 `params_blobs` directory next to the file, instead of in every commit
+                 (see BlobStore). Files with such values cannot be read by earlier
+                 versions of entropylab.
+        """
+        self.__doc_ids_by_commit_id: Dict[str, List[int]] = dict()
+        self.__docs_by_key: Dict[str, List[Document]] = dict()
+        self.__latest_doc: Optional[Document] = None
+        self.__index_stamp = _NO_STAMP
         if path is None:
             self.__is_in_memory_mode = True
+            self.__blobs = None
+            self.__save_blobs = False
             self.__db = TinyDB(storage=MemoryStorage)
             self.__filelock = contextlib.nullcontext()
             with self.__filelock:
@@ -43,8 +74,11 @@ class TinyDbPersistence(Persistence):
         else:
             self.__is_in_memory_mode = False
             path = str(path)
+            # large param values (if saved outside the TinyDB file) are read from:
+            self.__blobs = BlobStore.beside(path)
+            self.__save_blobs = save_blobs
             is_new = not os.path.isfile(path)
-            self.__db = TinyDB(path, storage=JSONPickleStorage)
+            self.__db = TinyDB(path, storage=FileStorage)
             Table.default_query_cache_capacity = 0
             self.__filelock = FileLock(path + ".lock")
             with self.__filelock:
@@ -78,15 +112,16 @@ class TinyDbPersistence(Persistence):
 
     def __get_commit_by_id(self, commit_id: str) -> Document:
         with self.__filelock:
-            result = self.__db.search(Query().metadata.id == commit_id)
-            if len(result) == 0:
+            self.__update_index()
+            doc_ids = self.__doc_ids_by_commit_id.get(commit_id, [])
+            if len(doc_ids) == 0:
                 raise EntropyError(f"Commit with id '{commit_id}' not found")
-            if len(result) > 1:
+            if len(doc_ids) > 1:
                 raise EntropyError(
-                    f"{len(result)} commits with id '{commit_id}' found. "
+                    f"{len(doc_ids)} commits with id '{commit_id}' found. "
                     f"Only one commit is allowed per id"
                 )
-            return result[0]
+            return self.__db.get(doc_id=doc_ids[0])
 
     def __get_commit_by_num(self, commit_num: int) -> Document:
         with self.__filelock:
@@ -103,23 +138,53 @@ class TinyDbPersistence(Persistence):
             else:
                 return None
 
-    @staticmethod
-    def __doc_to_commit(doc: Optional[Document]) -> Optional[Commit]:
+    def __doc_to_commit(self, doc: Optional[Document]) -> Optional[Commit]:
         if not doc:
             return None
         else:
+            # copied, so that changes to the commit do not change the (in-memory) db:
             return Commit(
                 id=doc["metadata"]["id"],
                 timestamp=doc["metadata"]["timestamp"],
                 label=doc["metadata"]["label"],
-                params=doc["params"],
-                tags=doc["tags"],
+                params=self.__from_blob_refs(copy.deepcopy(doc["params"])),
+                tags=copy.deepcopy(doc["tags"]),
             )
 
+    def __from_blob_refs(self, params: Dict) -> Dict:
+        return params if self.__blobs is None else self.__blobs.from_refs(params)
+
     def __get_latest_doc(self) -> Optional[Document]:
         with self.__filelock:
-            docs = self.__db.all()
-            return docs[-1] if docs else None
+            self.__update_index()
+            return self.__latest_doc
+
+    def __update_index(self) -> None:
+        """Rebuilds the indices of commit ids to document ids and of keys to documents
+        (and the latest document) if the db has been changed since the indices were
+        last updated"""
+        if self.__storage_stamp() == self.__index_stamp:
+            return
+        docs = self.__db.all()
+        self.__doc_ids_by_commit_id = dict()
+        self.__docs_by_key = dict()
+        for doc in docs:
+            self.__add_to_index(doc)
+        self.__latest_doc = docs[-1] if docs else None
+        self.__index_stamp = self.__storage_stamp()
+
+    def __add_to_index(self, doc: Document) -> None:
+        commit_id = doc["metadata"]["id"]
+        self.__doc_ids_by_commit_id.setdefault(commit_id, []).append(doc.doc_id)
+        for key in doc["params"]:
+            self.__docs_by_key.setdefault(key, []).append(doc)
+
+    def __storage_stamp(self):
+        # reading a FileStorage re-reads its file only if the file was changed:
+        self.__db.storage.read()
+        # in-memory storages are only changed by this instance, so their index is
+        # always up to date once built:
+        return getattr(self.__db.storage, "stamp", None)
 
     def commit(
         self,
@@ -133,6 +198,9 @@ class TinyDbPersistence(Persistence):
         with self.__filelock:
             doc.doc_id = self.__next_doc_id()
             self.__db.insert(doc)
+            self.__add_to_index(doc)
+            self.__latest_doc = doc
+            self.__index_stamp = self.__storage_stamp()
         return commit.id
 
     @staticmethod
@@ -149,12 +217,14 @@ class TinyDbPersistence(Persistence):
         :return: a dictionary describing the current state of the ParamStore
         """
         metadata = commit.to_metadata()
-        if self.__is_in_memory_mode:
-            params = copy.deepcopy(commit.params)
-        else:
-            params = commit.params
+        # copied, so that changes to the ParamStore do not change the (in-memory) db:
+        params = commit.params
+        if self.__save_blobs:
+            params = self.__blobs.to_refs(params)
+        params = copy.deepcopy(params)
+        tags = copy.deepcopy(commit.tags)
         return Document(
-            dict(metadata=metadata.__dict__, params=params, tags=commit.tags),
+            dict(metadata=metadata.__dict__, params=params, tags=tags),
             doc_id=0,
         )
 
@@ -182,13 +252,33 @@ class TinyDbPersistence(Persistence):
             )
             return list(map(self.__doc_to_commit, docs))
 
+    def get_history(self, key: str) -> List[HistoryEntry]:
+        with self.__filelock:
+            self.__update_index()
+            docs = list(self.__docs_by_key.get(key, []))
+        return [self.__doc_to_history_entry(doc, key) for doc in docs]
+
+    def __doc_to_history_entry(self, doc: Document, key: str) -> HistoryEntry:
+        # copied, so that changes to the param do not change the (in-memory) db:
+        params = self.__from_blob_refs({key: copy.deepcopy(doc["params"][key])})
+        return HistoryEntry(
+            commit_id=doc["metadata"]["id"],
+            timestamp=doc["metadata"]["timestamp"],
+            label=doc["metadata"]["label"],
+            param=params[key],
+        )
+
     # noinspection PyShadowingNames
     def save_temp_commit(self, commit: Commit) -> None:
         with self.__filelock:
             table = self.__db.table(TEMP_TABLE)
             doc = self.__build_document(commit)
             doc.doc_id = TEMP_DOC_ID
+            is_index_up_to_date = self.__storage_stamp() == self.__index_stamp
             table.upsert(doc)
+            if is_index_up_to_date:
+                # commits are not changed by the temp commit:
+                self.__index_stamp = self.__storage_stamp()
 
     """ Temporary State """
 
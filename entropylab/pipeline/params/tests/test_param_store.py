@@ -1,3 +1,4 @@
+import os
 import time
 from datetime import datetime
 from datetime import timedelta
@@ -29,11 +30,12 @@ from entropylab.pipeline.params.persistence.tinydb.tinydbpersistence import set_
 """ Test fixtures """
 
 # The two test fixtures below will provide test targets (ParamStore instances) to any
-# test that requests them. By default, all 3 possible test targets are provided:
+# test that requests them. By default, all 4 possible test targets are provided:
 
 DB_SQLITE = "ParamStore;SqlAlchemyPersistence;SQLite"
 TINY_JSON_FILE = "ParamStore;TinyDbPersistence;JSON file"
 TINY_IN_MEMORY = "ParamStore;TinyDbPersistence;In-memory"
+COMMIT_LOG_FILE = "ParamStore;CommitLogPersistence;Log file"
 
 # Alternatively, test authors can pick and choose specific test targets like so:
 # @pytest.mark.parametrize("create_target", [TINY_JSON_FILE, DB_SQLITE], indirect=True)
@@ -44,13 +46,16 @@ def target(create_target) -> ParamStore:
     return create_target()
 
 
-@pytest.fixture(params=[TINY_IN_MEMORY, TINY_JSON_FILE, DB_SQLITE])
+@pytest.fixture(params=[TINY_IN_MEMORY, TINY_JSON_FILE, DB_SQLITE, COMMIT_LOG_FILE])
 def create_target(request, tmp_path) -> Callable[[], ParamStore]:
     if request.param == TINY_IN_MEMORY:
         yield lambda: ParamStore()
     elif request.param == TINY_JSON_FILE:
         file_path = tmp_path / "tiny_db.json"
         yield lambda: ParamStore(file_path)
+    elif request.param == COMMIT_LOG_FILE:
+        file_path = tmp_path / "params.log"
+        yield lambda: ParamStore(log_path=file_path)
     else:
         file_path = tmp_path / "sqlite.db"
         url = f"sqlite:///{file_path}"
@@ -479,6 +484,46 @@ def test_commit_in_memory_when_param_changes_commit_doesnt_change():
     assert target.get_value("foo", commit_id) == "bar"
 
 
+@pytest.mark.parametrize("path_kwarg", ["path", "log_path"])
+def test_commit_when_large_array_is_committed_twice_then_it_is_saved_once(
+    path_kwarg, tmp_path
+):
+    # arrange
+    target = ParamStore(**{path_kwarg: tmp_path / "params"}, save_blobs=True)
+    target["foo"] = np.arange(100_000)
+    commit_id = target.commit()
+    target["bar"] = 1
+    target.commit()
+    target["foo"] = np.zeros(1)
+    target.commit()
+    # act
+    target.checkout(commit_id)
+    # assert
+    assert np.array_equal(target["foo"], np.arange(100_000))
+    assert len(os.listdir(tmp_path / "params_blobs")) == 1
+    assert np.array_equal(
+        ParamStore(**{path_kwarg: tmp_path / "params"}).get_value("foo", commit_id),
+        np.arange(100_000),
+    )
+
+
+@pytest.mark.parametrize("path_kwarg", ["path", "log_path"])
+def test_commit_when_blobs_are_not_opted_in_then_large_array_is_in_file(
+    path_kwarg, tmp_path
+):
+    # arrange
+    target = ParamStore(**{path_kwarg: tmp_path / "params"})
+    target["foo"] = np.arange(100_000)
+    # act
+    commit_id = target.commit()
+    # assert
+    assert not os.path.exists(tmp_path / "params_blobs")
+    assert np.array_equal(
+        ParamStore(**{path_kwarg: tmp_path / "params"}).get_value("foo", commit_id),
+        np.arange(100_000),
+    )
+
+
 def test_commit_when_body_is_empty_does_not_throw(tinydb_file_path):
     target = ParamStore(tinydb_file_path)
     target.foo = "bar"
@@ -997,6 +1042,33 @@ def test_list_values_then_when_key_is_deleted_it_is_not_in_list_of_values():
     assert actual.iloc[2]["label"] is None
 
 
+# noinspection PyCallingNonCallable
+@pytest.mark.parametrize(
+    "create_target", [TINY_JSON_FILE, DB_SQLITE, COMMIT_LOG_FILE], indirect=True
+)
+def test_list_values_when_store_is_reopened_then_values_of_all_commits_are_returned(
+    create_target,
+):
+    # arrange
+    with create_target() as param_store:
+        param_store["foo"] = 1
+        param_store["bar"] = 1
+        param_store.commit("alpha")
+        param_store["bar"] = 2
+        param_store.commit("beta")
+        del param_store["foo"]
+        param_store.commit("gamma")
+        param_store["foo"] = 3
+        param_store.commit("delta")
+    target = create_target()
+    # act
+    actual = target.list_values("foo")
+    # assert
+    assert list(actual["value"]) == [1, 1, 3]
+    assert list(actual["label"]) == ["alpha", "beta", "delta"]
+    assert all(isinstance(time, pd.Timestamp) for time in actual["time"])
+
+
 """ Tags """
 
 
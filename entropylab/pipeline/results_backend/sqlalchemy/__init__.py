@@ -5,6 +5,7 @@ from entropylab.pipeline.results_backend.sqlalchemy.db_initializer import (
     _DbInitializer,
     _DbUpgrader,
 )
+from entropylab.pipeline.results_backend.sqlalchemy.export import export_project
 
 
 def init_db(path: str):
@@ -19,3 +20,13 @@ def upgrade_db(path: str):
     :param path: The path to the SQLite database to be upgraded
     """
     _DbUpgrader(path).upgrade_db()
+
+
+def rebuild_storage_index(path: str):
+    """Rebuilds the index of results and metadata saved in the HDF5 files of an
+    Entropy project
+
+    :param path: The path to the Entropy project directory
+    """
+    _, storage = _DbInitializer(path).init_db()
+    storage.rebuild_index()
@@ -0,0 +1,45 @@
+"""storage_index
+
+Revision ID: 5b3e1c7d9a20
+Revises: 997e336572b8
+Create Date: 2026-10-17 08:12:41.183520+00:00
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5b3e1c7d9a20"
+down_revision = "997e336572b8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The index is populated by _DbUpgrader after all migrations are applied, when
+    # results and metadata have been migrated to HDF5 files
+    op.create_table(
+        "StorageIndex",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("experiment_id", sa.Integer(), nullable=False),
+        sa.Column("entity_type", sa.Integer(), nullable=False),
+        sa.Column("stage", sa.Integer(), nullable=True),
+        sa.Column("label", sa.String(), nullable=True),
+        sa.Column("path", sa.String(), nullable=False),
+        sa.Column("dtype", sa.String(), nullable=True),
+        sa.Column("shape", sa.String(), nullable=True),
+        sa.Column("time", sa.DATETIME(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_StorageIndex_entity_type_label_stage",
+        "StorageIndex",
+        ["entity_type", "label", "stage"],
+    )
+    op.create_index("ix_StorageIndex_experiment_id", "StorageIndex", ["experiment_id"])
+
+
+def downgrade():
+    op.drop_index("ix_StorageIndex_experiment_id", table_name="StorageIndex")
+    op.drop_index("ix_StorageIndex_entity_type_label_stage", table_name="StorageIndex")
+    op.drop_table("StorageIndex")
@@ -0,0 +1,50 @@
+"""query_indexes
+
+Revision ID: c4a8e61f0b93
+Revises: 5b3e1c7d9a20
+Create Date: 2026-10-17 10:04:27.529104+00:00
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c4a8e61f0b93"
+down_revision = "5b3e1c7d9a20"
+branch_labels = None
+depends_on = None
+
+# (index name, table name, columns), matching the filters of SqlAlchemyDB queries:
+_INDEXES = [
+    ("ix_Experiments_label_start_time", "Experiments", ["label", "start_time"]),
+    ("ix_Experiments_start_time", "Experiments", ["start_time"]),
+    ("ix_Experiments_end_time", "Experiments", ["end_time"]),
+    (
+        "ix_Results_experiment_id_label_stage",
+        "Results",
+        ["experiment_id", "label", "stage"],
+    ),
+    ("ix_Results_label_stage", "Results", ["label", "stage"]),
+    (
+        "ix_ExperimentMetadata_experiment_id_label_stage",
+        "ExperimentMetadata",
+        ["experiment_id", "label", "stage"],
+    ),
+    ("ix_ExperimentMetadata_label_stage", "ExperimentMetadata", ["label", "stage"]),
+    ("ix_Nodes_label_experiment_id", "Nodes", ["label", "experiment_id"]),
+    ("ix_Nodes_experiment_id", "Nodes", ["experiment_id"]),
+    ("ix_Plots_experiment_id", "Plots", ["experiment_id"]),
+    ("ix_Figures_experiment_id", "Figures", ["experiment_id"]),
+    ("ix_Debug_experiment_id", "Debug", ["experiment_id"]),
+]
+
+
+def upgrade():
+    for index_name, table_name, columns in _INDEXES:
+        op.create_index(index_name, table_name, columns)
+    # gather statistics for the query planner to choose between the new indexes:
+    op.execute("ANALYZE")
+
+
+def downgrade():
+    for index_name, table_name, _ in reversed(_INDEXES):
+        op.drop_index(index_name, table_name=table_name)
@@ -0,0 +1,99 @@
+"""binary_figures
+
+Revision ID: 66b8b30feca3
+Revises: c4a8e61f0b93
+Create Date: 2026-10-17 11:20:53.271946+00:00
+
+"""
+import json
+from io import BytesIO
+
+import numpy as np
+import sqlalchemy as sa
+from alembic import op
+from plotly import graph_objects as go
+from plotly.io import from_json, to_json
+from plotly.io.json import to_json_plotly
+from sqlalchemy import text
+
+from entropylab.logger import logger
+
+# revision identifiers, used by Alembic.
+revision = "66b8b30feca3"
+down_revision = "c4a8e61f0b93"
+branch_labels = None
+depends_on = None
+
+# The figure encoding below is copied from model.py as of this revision, so that this
+# migration keeps producing the same format if the model changes later.
+
+_BINARY_FIGURE_ARRAY_KINDS = "biuf"
+_FIGURE_ARRAY_REF = "__entropy_array__"
+
+
+def _encode_figure(figure: go.Figure) -> bytes:
+    arrays = {}
+
+    def extract_arrays(value):
+        if (
+            isinstance(value, np.ndarray)
+            and value.dtype.kind in _BINARY_FIGURE_ARRAY_KINDS
+        ):
+            name = f"a{len(arrays)}"
+            arrays[name] = value
+            return {_FIGURE_ARRAY_REF: name}
+        if isinstance(value, dict):
+            return {key: extract_arrays(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [extract_arrays(item) for item in value]
+        return value
+
+    figure_json = to_json_plotly(extract_arrays(figure.to_plotly_json()))
+    bio = BytesIO()
+    np.savez(bio, figure=np.frombuffer(figure_json.encode("utf-8"), np.uint8), **arrays)
+    return bio.getvalue()
+
+
+def _decode_figure(data: bytes) -> go.Figure:
+    with np.load(BytesIO(data), allow_pickle=False) as npz:
+
+        def restore_arrays(value):
+            if isinstance(value, dict):
+                if len(value) == 1 and _FIGURE_ARRAY_REF in value:
+                    return npz[value[_FIGURE_ARRAY_REF]]
+                return {key: restore_arrays(item) for key, item in value.items()}
+            if isinstance(value, list):
+                return [restore_arrays(item) for item in value]
+            return value
+
+        return go.Figure(restore_arrays(json.loads(npz["figure"].tobytes())))
+
+
+def upgrade():
+    with op.batch_alter_table("Figures") as batch_op:
+        batch_op.add_column(sa.Column("figure_data", sa.LargeBinary(), nullable=True))
+        batch_op.alter_column("figure", existing_type=sa.String(), nullable=True)
+    conn = op.get_bind()
+    rows = conn.execute(text("SELECT id, figure FROM Figures")).fetchall()
+    logger.debug(f"Encoding {len(rows)} figures as binary")
+    for figure_id, figure_json in rows:
+        conn.execute(
+            text("UPDATE Figures SET figure_data=:data, figure=NULL WHERE id=:id"),
+            dict(data=_encode_figure(from_json(figure_json)), id=figure_id),
+        )
+
+
+def downgrade():
+    conn = op.get_bind()
+    rows = conn.execute(
+        text("SELECT id, figure_data FROM Figures WHERE figure_data IS NOT NULL")
+    ).fetchall()
+    logger.debug(f"Decoding {len(rows)} binary figures to JSON")
+    for figure_id, figure_data in rows:
+        conn.execute(
+            text("UPDATE Figures SET figure=:figure WHERE id=:id"),
+            dict(figure=to_json(_decode_figure(figure_data)), id=figure_id),
+        )
+    with op.batch_alter_table("Figures") as batch_op:
+        batch_op.drop_column("figure_data")
+        batch_op.alter_column("figure", existing_type=sa.String(), nullable=False)
@@ -0,0 +1,51 @@
+"""binary_param_store
+
+Revision ID: 8d2f4a6c1b57
+Revises: 66b8b30feca3
+Create Date: 2026-10-17 13:05:12.418305+00:00
+
+"""
+import os
+
+from entropylab.logger import logger
+from entropylab.pipeline.api.errors import EntropyError
+from entropylab.pipeline.params.persistence.migrations import convert_param_store_file
+from entropylab.pipeline.params.persistence.serializers import (
+    BINARY_MAGIC,
+    JSONPickleSerializer,
+)
+from entropylab.pipeline.results_backend.sqlalchemy.alembic.alembic_util import (
+    AlembicUtil,
+)
+
+# revision identifiers, used by Alembic.
+revision = "8d2f4a6c1b57"
+down_revision = "66b8b30feca3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # ParamStore files are converted to the serializer of the `param_store_serializer`
+    # config setting when they are next written to, so that upgrading does not depend
+    # on the config of the process that runs it
+    pass
+
+
+def downgrade():
+    path = str(AlembicUtil.get_param_store_file_path())
+    if not _is_binary(path):
+        return
+    logger.debug(f"Attempting to convert ParamStore file {path} to jsonpickle")
+    try:
+        convert_param_store_file(path, f"{revision}.downgraded", JSONPickleSerializer())
+    except EntropyError as ee:
+        logger.warning(str(ee))
+    logger.debug("Done converting ParamStore file to jsonpickle")
+
+
+def _is_binary(path: str) -> bool:
+    if not os.path.isfile(path):
+        return False
+    with open(path, "rb") as file:
+        return file.read(len(BINARY_MAGIC)) == BINARY_MAGIC
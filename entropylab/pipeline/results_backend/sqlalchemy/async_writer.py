@@ -0,0 +1,121 @@
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from entropylab.logger import logger
+from entropylab.pipeline.api.errors import EntropyError
+
+_DEFAULT_QUEUE_SIZE = 1000
+
+
+@dataclass
+class AsyncWriterMetrics:
+    """Metrics of the background writer of a SqlAlchemyDB in async write mode"""
+
+    # number of writes waiting in the queue:
+    queue_depth: int
+    # number of writes completed (successfully or not):
+    completed_count: int
+    # number of writes that failed:
+    failed_count: int
+    # mean time (in seconds) between queueing a write and completing it:
+    mean_latency: float
+    # maximal time (in seconds) between queueing a write and completing it:
+    max_latency: float
+
+
+class _Write:
+    def __init__(self, experiment_id: int, func: Callable, args: tuple):
+        self.experiment_id = experiment_id
+        self.func = func
+        self.args = args
+        self.queued_at = time.monotonic()
+
+
+class _AsyncWriter:
+    """Runs writes in a dedicated background thread, in the order in which they were
+    submitted. The queue of writes is bounded: when it is full, submit() blocks until
+    the writer thread catches up. Errors are collected per experiment and raised by
+    raise_errors()"""
+
+    def __init__(self, queue_size: int = _DEFAULT_QUEUE_SIZE):
+        self._queue: "queue.Queue[Optional[_Write]]" = queue.Queue(maxsize=queue_size)
+        self._errors: Dict[int, List[Exception]] = {}
+        self._lock = threading.Lock()
+        self._completed_count = 0
+        self._failed_count = 0
+        self._total_latency = 0.0
+        self._max_latency = 0.0
+        self._thread = threading.Thread(
+            target=self._run, name="entropy-async-writer", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, experiment_id: int, func: Callable, *args) -> None:
+        if not self._thread.is_alive():
+            raise EntropyError("Async writer has been closed")
+        self._queue.put(_Write(experiment_id, func, args))
+
+    def wait(self) -> None:
+        """Blocks until all submitted writes are completed"""
+        self._queue.join()
+
+    def raise_errors(self, experiment_id: int) -> None:
+        """Waits for submitted writes and raises an EntropyError if any write of the
+        given experiment failed"""
+        self.wait()
+        with self._lock:
+            errors = self._errors.pop(experiment_id, [])
+        if errors:
+            raise EntropyError(
+                f"{len(errors)} asynchronous write(s) of experiment_id "
+                f"[{experiment_id}] failed. First error: {errors[0]}"
+            ) from errors[0]
+
+    def close(self) -> None:
+        """Waits for submitted writes and stops the writer thread"""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    @property
+    def metrics(self) -> AsyncWriterMetrics:
+        with self._lock:
+            completed = self._completed_count
+            return AsyncWriterMetrics(
+                queue_depth=self._queue.qsize(),
+                completed_count=completed,
+                failed_count=self._failed_count,
+                mean_latency=self._total_latency / completed if completed else 0.0,
+                max_latency=self._max_latency,
+            )
+
+    def _run(self) -> None:
+        while True:
+            write = self._queue.get()
+            try:
+                if write is None:
+                    return
+                self._execute(write)
+            finally:
+                self._queue.task_done()
+
+    def _execute(self, write: _Write) -> None:
+        error = None
+        try:
+            write.func(*write.args)
+        except Exception as e:
+            logger.exception(
+                f"Asynchronous write of experiment_id [{write.experiment_id}] failed"
+            )
+            error = e
+        latency = time.monotonic() - write.queued_at
+        with self._lock:
+            self._completed_count += 1
+            self._total_latency += latency
+            self._max_latency = max(self._max_latency, latency)
+            if error is not None:
+                self._failed_count += 1
+                self._errors.setdefault(write.experiment_id, []).append(error)
@@ -1,6 +1,16 @@
 from datetime import datetime
 from contextlib import contextmanager
-from typing import List, TypeVar, Optional, ContextManager, Iterable, Union, Any
+from typing import (
+    Callable,
+    List,
+    TypeVar,
+    Optional,
+    ContextManager,
+    Iterable,
+    Iterator,
+    Union,
+    Any,
+)
 from typing import Set
 from warnings import warn
 
@@ -9,7 +19,7 @@ from pandas import DataFrame
 from plotly import graph_objects as go
 from sqlalchemy import text, desc
 from sqlalchemy.exc import DBAPIError
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.orm import sessionmaker, Session, Query
 from sqlalchemy.sql import Selectable
 
 from entropylab.components.instrument_driver import Function, Parameter
@@ -23,9 +33,11 @@ from entropylab.components.lab_topology import (
     ResourceRecord,
 )
 from entropylab.config import settings
+from entropylab.logger import logger
 from entropylab.pipeline.api.data_reader import (
     DataReader,
     ExperimentRecord,
+    ExperimentsPage,
     ResultRecord,
     MetadataRecord,
     DebugRecord,
@@ -41,8 +53,13 @@ from entropylab.pipeline.api.data_writer import (
     Debug,
     PlotSpec,
     NodeData,
+    _snapshot_of,
 )
 from entropylab.pipeline.api.errors import EntropyError
+from entropylab.pipeline.results_backend.sqlalchemy.async_writer import (
+    _AsyncWriter,
+    AsyncWriterMetrics,
+)
 from entropylab.pipeline.results_backend.sqlalchemy.db_initializer import _DbInitializer
 from entropylab.pipeline.results_backend.sqlalchemy.model import (
     ExperimentTable,
@@ -58,6 +75,9 @@ T = TypeVar(
     "T",
 )
 
+# number of rows fetched from the database at a time by the iter_*() methods:
+_ITER_BATCH_SIZE = 100
+
 
 class SqlAlchemyDB(DataWriter, DataReader, PersistentLabDB):
     """
@@ -70,17 +90,61 @@ class SqlAlchemyDB(DataWriter, DataReader, PersistentLabDB):
             Initializes database and HDF5 files for an Entropy project
         :param path: path to directory containing an Entropy project
         :param echo: if True, the database engine will log all statements
+        :key async_writes: if True, results, metadata and nodes are written by a
+                 background thread so that experiments do not wait for disk I/O.
+                 Errors in writing are raised when the experiment ends. Overrides
+                 the `db.async_writes` config setting
+        :key async_write_queue_size: maximal number of writes waiting for the
+                 background thread. Saving blocks while the queue is full. Overrides
+                 the `db.async_write_queue_size` config setting
         """
         super(SqlAlchemyDB, self).__init__()
         self._enable_hdf5_storage = kwargs.get("enable_hdf5_storage")
         self._engine, self._storage = _DbInitializer(path, echo=echo).init_db()
         self._Session = sessionmaker(bind=self._engine)
+        self._async_writer = self.__create_async_writer(
+            kwargs.get("async_writes"), kwargs.get("async_write_queue_size")
+        )
+
+    def __create_async_writer(
+        self, async_writes: Optional[bool], queue_size: Optional[int]
+    ) -> Optional[_AsyncWriter]:
+        """Class member set in __init__() overrides config setting"""
+        if async_writes is None:
+            async_writes = settings.get("db.async_writes", False)
+        if not async_writes:
+            return None
+        if self._engine.url.database == ":memory:":
+            # each thread gets its own in-memory SQLite database
+            logger.warning("Async writes are not supported by an in-memory database")
+            return None
+        if queue_size is None:
+            queue_size = settings.get("db.async_write_queue_size", 1000)
+        return _AsyncWriter(queue_size)
+
+    @property
+    def async_writer_metrics(self) -> Optional[AsyncWriterMetrics]:
+        """Queue depth and latency of the background writer, or None if async
+        writes are disabled"""
+        if self._async_writer is None:
+            return None
+        return self._async_writer.metrics
+
+    def close(self) -> None:
+        """Waits for pending asynchronous writes and stops the background writer, and
+        closes the open HDF5 files (adding their pending rows to the storage index)"""
+        if self._async_writer is not None:
+            self._async_writer.close()
+        if self.__hdf5_storage_enabled():
+            self._storage.close()
 
     def save_experiment_initial_data(self, initial_data: ExperimentInitialData) -> int:
         transaction = ExperimentTable.from_initial_data(initial_data)
         return self._execute_transaction(transaction)
 
     def save_experiment_end_data(self, experiment_id: int, end_data: ExperimentEndData):
+        if self._async_writer is not None:
+            self._async_writer.wait()
         with self._session_maker() as sess:
             query = (
                 sess.query(ExperimentTable)
@@ -91,12 +155,18 @@ class SqlAlchemyDB(DataWriter, DataReader, PersistentLabDB):
                 query.end_time = end_data.end_time
                 query.success = end_data.success
                 sess.flush()
+        if self.__hdf5_storage_enabled():
+            # flush the experiment's HDF5 file and release its handle:
+            self._storage.close(experiment_id)
+        if self._async_writer is not None:
+            self._async_writer.raise_errors(experiment_id)
 
     def save_result(self, experiment_id: int, result: RawResultData):
-        if result.label is None:
-            raise TypeError("result.label cannot be None")
-        if result.label == "":
-            raise ValueError("result.label cannot be empty")
+        self.__validate_label(result.label, "result")
+        self.__validate_append(result)
+        return self.__write(experiment_id, self.__save_result, result)
+
+    def __save_result(self, experiment_id: int, result: RawResultData):
         if self.__hdf5_storage_enabled():
             try:
                 self._storage.save_result(experiment_id, result)
@@ -114,11 +184,36 @@ class SqlAlchemyDB(DataWriter, DataReader, PersistentLabDB):
             transaction = ResultTable.from_model(experiment_id, result)
             return self._execute_transaction(transaction)
 
+    def save_results(self, experiment_id: int, results: Iterable[RawResultData]):
+        results = list(results)
+        for result in results:
+            self.__validate_label(result.label, "result")
+            self.__validate_append(result)
+        return self.__write(experiment_id, self.__save_results, results)
+
+    def __save_results(self, experiment_id: int, results: List[RawResultData]):
+        if self.__hdf5_storage_enabled():
+            try:
+                self._storage.save_results(experiment_id, results)
+            except ValueError as ve:
+                raise ValueError(
+                    f"Result already exists (experiment_id=[{experiment_id}])"
+                ) from ve
+            except RuntimeError as re:
+                raise EntropyError(
+                    f"Failed to write results to HDF5 file (experiment_id="
+                    f"[{experiment_id}])"
+                ) from re
+        else:
+            self._execute_bulk_transaction(
+                [ResultTable.from_model(experiment_id, result) for result in results]
+            )
+
     def save_metadata(self, experiment_id: int, metadata: Metadata):
-        if metadata.label is None:
-            raise TypeError("metadata.label cannot be None")
-        if metadata.label == "":
-            raise ValueError("metadata.label cannot be empty")
+        self.__validate_label(metadata.label, "metadata")
+        return self.__write(experiment_id, self.__save_metadata, metadata)
+
+    def __save_metadata(self, experiment_id: int, metadata: Metadata):
         if self.__hdf5_storage_enabled():
             try:
                 self._storage.save_metadata(experiment_id, metadata)
@@ -136,6 +231,39 @@ class SqlAlchemyDB(DataWriter, DataReader, PersistentLabDB):
             transaction = MetadataTable.from_model(experiment_id, metadata)
             return self._execute_transaction(transaction)
 
+    def save_metadata_records(
+        self, experiment_id: int, metadata_records: Iterable[Metadata]
+    ):
+        metadata_records = list(metadata_records)
+        for metadata in metadata_records:
+            self.__validate_label(metadata.label, "metadata")
+        return self.__write(
+            experiment_id, self.__save_metadata_records, metadata_records
+        )
+
+    def __save_metadata_records(
+        self, experiment_id: int, metadata_records: List[Metadata]
+    ):
+        if self.__hdf5_storage_enabled():
+            try:
+                self._storage.save_metadata_records(experiment_id, metadata_records)
+            except ValueError as ve:
+                raise ValueError(
+                    f"Metadata already exists (experiment_id=[{experiment_id}])"
+                ) from ve
+            except RuntimeError as re:
+                raise EntropyError(
+                    f"Failed to write metadata to HDF5 file (experiment_id="
+                    f"[{experiment_id}])"
+                ) from re
+        else:
+            self._execute_bulk_transaction(
+                [
+                    MetadataTable.from_model(experiment_id, metadata)
+                    for metadata in metadata_records
+                ]
+            )
+
     def save_debug(self, experiment_id: int, debug: Debug):
         transaction = DebugTable.from_model(experiment_id, debug)
         return self._execute_transaction(transaction)
@@ -154,27 +282,73 @@ class SqlAlchemyDB(DataWriter, DataReader, PersistentLabDB):
         return self._execute_transaction(transaction)
 
     def save_node(self, experiment_id: int, node_data: NodeData):
+        return self.__write(experiment_id, self.__save_node, node_data)
+
+    def __save_node(self, experiment_id: int, node_data: NodeData):
         transaction = NodeTable.from_model(experiment_id, node_data)
         return self._execute_transaction(transaction)
 
+    def save_nodes(self, experiment_id: int, nodes_data: Iterable[NodeData]):
+        return self.__write(experiment_id, self.__save_nodes, list(nodes_data))
+
+    def __save_nodes(self, experiment_id: int, nodes_data: List[NodeData]):
+        self._execute_bulk_transaction(
+            [NodeTable.from_model(experiment_id, node_data) for node_data in nodes_data]
+        )
+
+    def __write(self, experiment_id: int, save_func: Callable, entities: Any):
+        """Saves entities now, or queues them for the background writer if async
+        writes are enabled"""
+        if self._async_writer is None:
+            return save_func(experiment_id, entities)
+        self._async_writer.submit(
+            experiment_id, save_func, experiment_id, _snapshot_of(entities)
+        )
+
+    def __wait_for_writes(self):
+        """Makes writes that were queued before a read visible to the read"""
+        if self._async_writer is not None:
+            self._async_writer.wait()
+
     def get_experiments_range(
         self, starting_from_index: int, count: int, success: bool = None
     ) -> DataFrame:
         with self._session_maker() as sess:
-            query = sess.query(ExperimentTable).with_entities(
-                ExperimentTable.id,
-                ExperimentTable.label,
-                ExperimentTable.start_time,
-                ExperimentTable.end_time,
-                ExperimentTable.user,
-                ExperimentTable.success,
-                ExperimentTable.favorite,
-            )
-            if success is not None:
-                query = query.filter(ExperimentTable.success == success)
-            query = query.slice(starting_from_index, starting_from_index + count)
+            query = self.__experiments_range_query(sess, success)
+            query = query.offset(starting_from_index).limit(count)
             return self._query_pandas(query)
 
+    def get_experiments_page(
+        self, count: int, cursor: Optional[int] = None, success: bool = None
+    ) -> ExperimentsPage:
+        with self._session_maker() as sess:
+            query = self.__experiments_range_query(sess, success)
+            if cursor is not None:
+                query = query.filter(ExperimentTable.id < int(cursor))
+            # one more row than requested tells whether there is a next page:
+            experiments = self._query_pandas(query.limit(count + 1))
+        if len(experiments) > count:
+            experiments = experiments.iloc[:count]
+            next_cursor = int(experiments["id"].iloc[-1])
+        else:
+            next_cursor = None
+        return ExperimentsPage(experiments, next_cursor)
+
+    @staticmethod
+    def __experiments_range_query(sess: Session, success: Optional[bool]) -> Query:
+        query = sess.query(ExperimentTable).with_entities(
+            ExperimentTable.id,
+            ExperimentTable.label,
+            ExperimentTable.start_time,
+            ExperimentTable.end_time,
+            ExperimentTable.user,
+            ExperimentTable.success,
+            ExperimentTable.favorite,
+        )
+        if success is not None:
+            query = query.filter(ExperimentTable.success == success)
+        return query.order_by(desc(ExperimentTable.id))
+
     def get_experiment_record(self, experiment_id: int) -> Optional[ExperimentRecord]:
         with self._session_maker() as sess:
             query = (
@@ -193,29 +367,70 @@ class SqlAlchemyDB(DataWriter, DataReader, PersistentLabDB):
         success: Optional[bool] = None,
     ) -> Iterable[ExperimentRecord]:
         with self._session_maker() as sess:
-            query = sess.query(ExperimentTable)
-            if label is not None:
-                query = query.filter(ExperimentTable.label == label)
-            if success is not None:
-                query = query.filter(ExperimentTable.success == success)
-            if start_after is not None:
-                query = query.filter(ExperimentTable.start_time > start_after)
-            if end_after is not None:
-                query = query.filter(ExperimentTable.end_time > end_after)
+            query = self.__experiments_query(
+                sess, label, start_after, end_after, success
+            )
             return [item.to_record() for item in query.all()]
 
+    def iter_experiments(
+        self,
+        label: Optional[str] = None,
+        start_after: Optional[datetime] = None,
+        end_after: Optional[datetime] = None,
+        success: Optional[bool] = None,
+    ) -> Iterator[ExperimentRecord]:
+        with self._session_maker() as sess:
+            query = self.__experiments_query(
+                sess, label, start_after, end_after, success
+            )
+            for item in query.yield_per(_ITER_BATCH_SIZE):
+                yield item.to_record()
+
+    @staticmethod
+    def __experiments_query(
+        sess: Session,
+        label: Optional[str] = None,
+        start_after: Optional[datetime] = None,
+        end_after: Optional[datetime] = None,
+        success: Optional[bool] = None,
+    ) -> Query:
+        query = sess.query(ExperimentTable)
+        if label is not None:
+            query = query.filter(ExperimentTable.label == label)
+        if success is not None:
+            query = query.filter(ExperimentTable.success == success)
+        if start_after is not None:
+            query = query.filter(ExperimentTable.start_time > start_after)
+        if end_after is not None:
+            query = query.filter(ExperimentTable.end_time > end_after)
+        return query
+
     def get_results(
         self,
         experiment_id: Optional[int] = None,
         label: Optional[str] = None,
         stage: Optional[int] = None,
     ) -> Iterable[ResultRecord]:
+        self.__wait_for_writes()
         if self.__hdf5_storage_enabled():
             return self._storage.get_result_records(experiment_id, stage, label)
         else:
             return self.__get_results_from_sqlalchemy(experiment_id, label, stage)
 
-        pass
+    def iter_results(
+        self,
+        experiment_id: Optional[int] = None,
+        label: Optional[str] = None,
+        stage: Optional[int] = None,
+    ) -> Iterator[ResultRecord]:
+        self.__wait_for_writes()
+        if self.__hdf5_storage_enabled():
+            yield from self._storage.iter_result_records(experiment_id, stage, label)
+        else:
+            with self._session_maker() as sess:
+                query = self.__results_query(sess, experiment_id, label, stage)
+                for item in query.yield_per(_ITER_BATCH_SIZE):
+                    yield item.to_record()
 
     def __get_results_from_sqlalchemy(
         self,
@@ -225,33 +440,85 @@ class SqlAlchemyDB(DataWriter, DataReader, PersistentLabDB):
         saved_in_hdf5: Optional[bool] = None,
     ) -> Iterable[ResultRecord]:
         with self._session_maker() as sess:
-            query = sess.query(ResultTable)
-            if experiment_id is not None:
-                query = query.filter(ResultTable.experiment_id == int(experiment_id))
-            if label is not None:
-                query = query.filter(ResultTable.label == str(label))
-            if stage is not None:
-                query = query.filter(ResultTable.stage == int(stage))
-            if self.__hdf5_storage_enabled() and saved_in_hdf5 is not None:
-                query = query.filter(ResultTable.saved_in_hdf5 == bool(saved_in_hdf5))
+            query = self.__results_query(
+                sess, experiment_id, label, stage, saved_in_hdf5
+            )
             return [item.to_record() for item in query.all()]
 
+    def __results_query(
+        self,
+        sess: Session,
+        experiment_id: Optional[int] = None,
+        label: Optional[str] = None,
+        stage: Optional[int] = None,
+        saved_in_hdf5: Optional[bool] = None,
+    ) -> Query:
+        query = sess.query(ResultTable)
+        if experiment_id is not None:
+            query = query.filter(ResultTable.experiment_id == int(experiment_id))
+        if label is not None:
+            query = query.filter(ResultTable.label == str(label))
+        if stage is not None:
+            query = query.filter(ResultTable.stage == int(stage))
+        if self.__hdf5_storage_enabled() and saved_in_hdf5 is not None:
+            query = query.filter(ResultTable.saved_in_hdf5 == bool(saved_in_hdf5))
+        return query
+
     def get_metadata_records(
         self,
         experiment_id: Optional[int] = None,
         label: Optional[str] = None,
         stage: Optional[int] = None,
+    ) -> Iterable[MetadataRecord]:
+        self.__wait_for_writes()
+        if self.__hdf5_storage_enabled():
+            return self._storage.get_metadata_records(experiment_id, stage, label)
+        else:
+            return self.__get_metadata_records_from_sqlalchemy(
+                experiment_id, label, stage
+            )
+
+    def iter_metadata_records(
+        self,
+        experiment_id: Optional[int] = None,
+        label: Optional[str] = None,
+        stage: Optional[int] = None,
+    ) -> Iterator[MetadataRecord]:
+        self.__wait_for_writes()
+        if self.__hdf5_storage_enabled():
+            yield from self._storage.iter_metadata_records(experiment_id, stage, label)
+        else:
+            with self._session_maker() as sess:
+                query = self.__metadata_query(sess, experiment_id, label, stage)
+                for item in query.yield_per(_ITER_BATCH_SIZE):
+                    yield item.to_record()
+
+    def __get_metadata_records_from_sqlalchemy(
+        self,
+        experiment_id: Optional[int] = None,
+        label: Optional[str] = None,
+        stage: Optional[int] = None,
     ) -> Iterable[MetadataRecord]:
         with self._session_maker() as sess:
-            query = sess.query(MetadataTable)
-            if experiment_id is not None:
-                query = query.filter(MetadataTable.experiment_id == int(experiment_id))
-            if label is not None:
-                query = query.filter(MetadataTable.label == label)
-            if stage is not None:
-                query = query.filter(MetadataTable.stage == stage)
+            query = self.__metadata_query(sess, experiment_id, label, stage)
             return [item.to_record() for item in query.all()]
 
+    @staticmethod
+    def __metadata_query(
+        sess: Session,
+        experiment_id: Optional[int] = None,
+        label: Optional[str] = None,
+        stage: Optional[int] = None,
+    ) -> Query:
+        query = sess.query(MetadataTable)
+        if experiment_id is not None:
+            query = query.filter(MetadataTable.experiment_id == int(experiment_id))
+        if label is not None:
+            query = query.filter(MetadataTable.label == label)
+        if stage is not None:
+            query = query.filter(MetadataTable.stage == stage)
+        return query
+
     def get_debug_record(self, experiment_id: int) -> Optional[DebugRecord]:
         with self._session_maker() as sess:
             query = (
@@ -263,6 +530,7 @@ class SqlAlchemyDB(DataWriter, DataReader, PersistentLabDB):
                 return query.to_record()
 
     def get_all_results_with_label(self, exp_id, name) -> DataFrame:
+        self.__wait_for_writes()
         with self._session_maker() as sess:
             query = (
                 sess.query(ResultTable)
@@ -301,6 +569,7 @@ class SqlAlchemyDB(DataWriter, DataReader, PersistentLabDB):
     def get_node_stage_ids_by_label(
         self, label: str, experiment_id: Optional[int] = None
     ) -> List[int]:
+        self.__wait_for_writes()
         with self._session_maker() as sess:
             query = sess.query(NodeTable).filter(NodeTable.label == label)
             if experiment_id is not None:
@@ -314,6 +583,7 @@ class SqlAlchemyDB(DataWriter, DataReader, PersistentLabDB):
     def get_last_result_of_experiment(
         self, experiment_id: int
     ) -> Optional[ResultRecord]:
+        self.__wait_for_writes()
         if self.__hdf5_storage_enabled():
             return self._storage.get_last_result_of_experiment(experiment_id)
         else:
@@ -336,8 +606,10 @@ class SqlAlchemyDB(DataWriter, DataReader, PersistentLabDB):
         with self._session_maker() as sess:
             if isinstance(query, str):
                 selectable = text(query)
-            else:
+            elif isinstance(query, Query):
                 selectable = query.statement
+            else:
+                selectable = query
 
             result = sess.execute(selectable)
             return DataFrame(result.all(), columns=result.keys())
@@ -348,6 +620,11 @@ class SqlAlchemyDB(DataWriter, DataReader, PersistentLabDB):
             sess.flush()
             return transaction.id
 
+    def _execute_bulk_transaction(self, transactions: List[T]):
+        if len(transactions) > 0:
+            with self._session_maker() as sess:
+                sess.add_all(transactions)
+
     @staticmethod
     def _query_pandas(query):
         result = query.session.execute(query.statement)
@@ -514,6 +791,22 @@ class SqlAlchemyDB(DataWriter, DataReader, PersistentLabDB):
             ).update({"favorite": favorite})
             sess.commit()
 
+    @staticmethod
+    def __validate_label(label: Optional[str], entity_name: str):
+        if label is None:
+            raise TypeError(f"{entity_name}.label cannot be None")
+        if label == "":
+            raise ValueError(f"{entity_name}.label cannot be empty")
+
+    def __validate_append(self, result: RawResultData):
+        # results are appended to only in HDF5 files:
+        if result.append and not self.__hdf5_storage_enabled():
+            raise EntropyError(
+                f"Cannot append to result '{result.label}' because HDF5 storage is "
+                f"disabled. Enable the 'toggles.hdf5_storage' setting, or save the "
+                f"data as separate results"
+            )
+
     def __hdf5_storage_enabled(self) -> bool:
         """Feature toggle for 'hdf5 storage' feature
 
@@ -4,7 +4,7 @@ from pathlib import Path
 from typing import TypeVar, Type, Tuple
 
 import sqlalchemy.engine
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 from sqlalchemy.orm import sessionmaker
 
 from entropylab.logger import logger
@@ -12,6 +12,10 @@ from entropylab.pipeline.api.errors import EntropyError
 from entropylab.pipeline.results_backend.sqlalchemy.alembic.alembic_util import (
     AlembicUtil,
 )
+from entropylab.pipeline.results_backend.sqlalchemy.engine import (
+    create_sqlite_engine,
+    _SQL_ALCHEMY_MEMORY,
+)
 from entropylab.pipeline.results_backend.sqlalchemy.model import (
     Base,
     ResultTable,
@@ -28,7 +32,6 @@ from entropylab.pipeline.results_backend.sqlalchemy.storage import (
 
 T = TypeVar("T", bound=Base)
 
-_SQL_ALCHEMY_MEMORY = ":memory:"
 _ENTROPY_DIRNAME = ".entropy"
 _DB_FILENAME = "entropy.db"
 _HDF5_FILENAME = "entropy.hdf5"
@@ -45,8 +48,8 @@ class _DbInitializer:
 
         if path is None or path == _SQL_ALCHEMY_MEMORY:
             logger.debug("_DbInitializer is in in-memory mode")
-            self._storage = HDF5Storage()
-            self._engine = create_engine("sqlite:///" + _SQL_ALCHEMY_MEMORY, echo=echo)
+            self._engine = create_sqlite_engine(echo=echo)
+            self._storage = HDF5Storage(index_engine=self._engine)
             self._alembic_util = AlembicUtil(self._engine)
         else:
             logger.debug("_DbInitializer is in project directory mode")
@@ -61,8 +64,8 @@ class _DbInitializer:
             hdf5_dir_path = os.path.join(entropy_dir_path, _HDF5_DIRNAME)
             logger.debug(f"hdf5 directory is at: {hdf5_dir_path}")
 
-            self._engine = create_engine("sqlite:///" + db_file_path, echo=echo)
-            self._storage = HDF5Storage(hdf5_dir_path)
+            self._engine = create_sqlite_engine(db_file_path, echo=echo)
+            self._storage = HDF5Storage(hdf5_dir_path, index_engine=self._engine)
             self._alembic_util = AlembicUtil(self._engine)
             if creating_new:
                 self._print_project_created(path)
@@ -136,10 +139,8 @@ class _DbUpgrader:
         old_global_hdf5_file_path = None
         if self._path is None or self._path == _SQL_ALCHEMY_MEMORY:
             logger.debug("_DbUpgrader is in in-memory mode")
-            self._storage = HDF5Storage()
-            self._engine = create_engine(
-                "sqlite:///" + _SQL_ALCHEMY_MEMORY, echo=self._echo
-            )
+            self._engine = create_sqlite_engine(echo=self._echo)
+            self._storage = HDF5Storage(index_engine=self._engine)
         else:
             logger.debug("_DbUpgrader is in project directory mode")
             if not os.path.exists(self._path):
@@ -150,10 +151,12 @@ class _DbUpgrader:
             db_file_path = os.path.join(entropy_dir_path, _DB_FILENAME)
             hdf5_dir_path = os.path.join(entropy_dir_path, _HDF5_DIRNAME)
             old_global_hdf5_file_path = os.path.join(entropy_dir_path, _HDF5_FILENAME)
-            self._engine = create_engine("sqlite:///" + db_file_path, echo=self._echo)
-            self._storage = HDF5Storage(hdf5_dir_path)
+            self._engine = create_sqlite_engine(db_file_path, echo=self._echo)
+            self._storage = HDF5Storage(hdf5_dir_path, index_engine=self._engine)
         self._alembic_util = AlembicUtil(self._engine)
         self._alembic_util.upgrade()
+        # an empty index is either new or belongs to a project without results:
+        index_needs_rebuild = self._storage.index_is_empty()
         if old_global_hdf5_file_path and os.path.isfile(old_global_hdf5_file_path):
             # old, global hdf5 file exists so migrate from it to new "per experiment"
             # hdf5 files
@@ -165,6 +168,8 @@ class _DbUpgrader:
             # "per experiment" hdf5 files
             self._migrate_results_from_db_to_hdf5()
             self._migrate_metadata_from_db_to_hdf5()
+        if index_needs_rebuild:
+            self._storage.rebuild_index()
         self.log_success()
 
     def log_success(self):
@@ -0,0 +1,61 @@
+import sqlalchemy.engine
+from sqlalchemy import create_engine, event
+
+from entropylab.config import settings
+
+_SQL_ALCHEMY_MEMORY = ":memory:"
+
+# SQLite settings that let experiments write while the dashboard reads. Each can be
+# overridden with the `db.sqlite.<name>` config setting:
+_DEFAULT_PRAGMAS = {
+    # time (in ms) to wait for a lock before raising "database is locked". Set first
+    # so that it applies to setting the journal mode too:
+    "busy_timeout": 5000,
+    # readers do not block the writer and the writer does not block readers:
+    "journal_mode": "wal",
+    # in WAL mode, NORMAL is safe from corruption and syncs less often than FULL:
+    "synchronous": "normal",
+    # size (in bytes) of the database that is read through memory mapping:
+    "mmap_size": 256 * 1024 * 1024,
+    # page cache size. Negative values are in KiB:
+    "cache_size": -64 * 1024,
+}
+_DEFAULT_POOL_SIZE = 5
+
+
+def create_sqlite_engine(
+    db_file_path: str = _SQL_ALCHEMY_MEMORY, echo=False
+) -> sqlalchemy.engine.Engine:
+    """Creates an engine for an Entropy SQLite database. Connections to a database
+    file are pooled and configured for concurrent access by an experiment and the
+    dashboard. The configuration can be changed with the `db.sqlite.*` config
+    settings.
+
+    :param db_file_path: path to the SQLite database file, or ":memory:" for an
+             in-memory database
+    :param echo: if True, the engine will log all statements
+    """
+    url = "sqlite:///" + db_file_path
+    if db_file_path == _SQL_ALCHEMY_MEMORY:
+        return create_engine(url, echo=echo)
+    engine = create_engine(
+        url,
+        echo=echo,
+        pool_size=settings.get("db.sqlite.pool_size", _DEFAULT_POOL_SIZE),
+    )
+    pragmas = {
+        name: settings.get(f"db.sqlite.{name}", default)
+        for name, default in _DEFAULT_PRAGMAS.items()
+    }
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, _):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                if value is not None:
+                    cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+    return engine
@@ -0,0 +1,292 @@
+"""Exports experiments, nodes and results of an Entropy project to partitioned,
+columnar files (Parquet or Arrow IPC) that analytics tools can read directly.
+
+The export directory is laid out as a hive-partitioned dataset, one directory per
+table:
+
+    <output_dir>/experiments/experiment_label=<label>/date=<date>/part-<ids>.parquet
+    <output_dir>/nodes/experiment_label=<label>/date=<date>/part-<ids>.parquet
+    <output_dir>/results/experiment_label=<label>/date=<date>/part-<ids>.parquet
+
+where label and date are those of the experiment. Requires the optional `pyarrow`
+package.
+"""
+import json
+import os
+import shutil
+from typing import Optional, Dict, List, Any, Iterable
+from urllib.parse import quote
+
+import numpy as np
+from pandas import DataFrame
+from sqlalchemy import select
+
+from entropylab.logger import logger
+from entropylab.pipeline.api.data_reader import ResultRecord
+from entropylab.pipeline.api.errors import EntropyError
+from entropylab.pipeline.results_backend.sqlalchemy.db import SqlAlchemyDB
+from entropylab.pipeline.results_backend.sqlalchemy.model import (
+    ExperimentTable,
+    NodeTable,
+)
+from entropylab.pipeline.results_backend.sqlalchemy.storage import LazyHDF5Array
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover
+    pa = None
+    pq = None
+
+_FILE_EXTENSIONS = {"parquet": ".parquet", "arrow": ".arrow"}
+_STATE_FILE_NAME = "export_state.json"
+_TABLE_DIRS = ("experiments", "nodes", "results")
+_DEFAULT_BATCH_SIZE = 100
+
+if pa is not None:
+    _RESULTS_SCHEMA = pa.schema(
+        [
+            ("experiment_id", pa.int64()),
+            ("id", pa.string()),
+            ("label", pa.string()),
+            ("stage", pa.int64()),
+            ("story", pa.string()),
+            ("time", pa.timestamp("us")),
+            # scalar numeric data:
+            ("value", pa.float64()),
+            # string data:
+            ("text", pa.string()),
+            # numeric array data, flattened in row-major (C) order:
+            ("array", pa.list_(pa.float64())),
+            ("shape", pa.list_(pa.int64())),
+        ]
+    )
+
+
+def export_project(
+    path: str,
+    output_dir: str,
+    file_format: str = "parquet",
+    incremental: bool = True,
+    batch_size: int = _DEFAULT_BATCH_SIZE,
+) -> int:
+    """Exports the experiments, nodes and results of an Entropy project to
+    partitioned Parquet or Arrow IPC files. Experiments are exported in batches
+    so that memory use is bounded regardless of the size of the project. Only
+    experiments that have ended are exported, up to the first experiment that is
+    still running.
+
+    :param path: path to the Entropy project directory
+    :param output_dir: path to the directory that exported files are written to
+    :param file_format: "parquet" or "arrow" (Arrow IPC file format)
+    :param incremental: if True, only experiments that were not exported to
+             output_dir before are exported. If False, previously exported files
+             in output_dir are deleted and all experiments are exported.
+    :param batch_size: number of experiments that are read and written at a time
+    :return: the number of experiments exported
+    """
+    if pa is None:
+        raise EntropyError(
+            "Exporting requires the 'pyarrow' package. "
+            "Install it with 'pip install pyarrow'"
+        )
+    if file_format not in _FILE_EXTENSIONS:
+        raise ValueError(
+            f"Export file format must be one of {tuple(_FILE_EXTENSIONS)} but "
+            f"'{file_format}' was given"
+        )
+    if not incremental:
+        _delete_previous_export(output_dir)
+    db = SqlAlchemyDB(path)
+    last_experiment_id = _read_last_exported_id(output_dir)
+    exported_count = 0
+    while True:
+        experiments = _read_experiments_batch(db, last_experiment_id, batch_size)
+        if experiments.empty:
+            break
+        exporter = _BatchExporter(output_dir, file_format, experiments)
+        exporter.write_experiments()
+        exporter.write_nodes(_read_nodes(db, experiments["id"].tolist()))
+        exporter.write_results(
+            db.iter_results(experiment_id=experiment_id)
+            for experiment_id in experiments["id"]
+        )
+        last_experiment_id = int(experiments["id"].iloc[-1])
+        _write_last_exported_id(output_dir, last_experiment_id)
+        exported_count += len(experiments)
+        logger.debug(f"Exported experiments up to id [{last_experiment_id}]")
+        if len(experiments) < batch_size:
+            break
+    return exported_count
+
+
+def _read_experiments_batch(
+    db: SqlAlchemyDB, after_id: int, batch_size: int
+) -> DataFrame:
+    query = (
+        select(
+            ExperimentTable.id,
+            ExperimentTable.label,
+            ExperimentTable.start_time,
+            ExperimentTable.end_time,
+            ExperimentTable.user,
+            ExperimentTable.story,
+            ExperimentTable.success,
+            ExperimentTable.favorite,
+        )
+        .where(ExperimentTable.id > after_id)
+        .order_by(ExperimentTable.id)
+        .limit(batch_size)
+    )
+    experiments = db.custom_query(query)
+    # experiments that are still running may save more results later:
+    running = experiments["end_time"].isna()
+    if running.any():
+        experiments = experiments.iloc[: running.values.argmax()]
+    return experiments
+
+
+def _read_nodes(db: SqlAlchemyDB, experiment_ids: List[int]) -> DataFrame:
+    query = (
+        select(
+            NodeTable.experiment_id,
+            NodeTable.id,
+            NodeTable.stage_id,
+            NodeTable.label,
+            NodeTable.start,
+            NodeTable.is_key_node,
+        )
+        .where(NodeTable.experiment_id.in_(experiment_ids))
+        .order_by(NodeTable.id)
+    )
+    return db.custom_query(query)
+
+
+class _BatchExporter:
+    """Writes the tables of a single batch of experiments, one file per partition"""
+
+    def __init__(self, output_dir: str, file_format: str, experiments: DataFrame):
+        self._output_dir = output_dir
+        self._file_format = file_format
+        self._experiments = experiments
+        self._file_name = (
+            f"part-{experiments['id'].iloc[0]}-{experiments['id'].iloc[-1]}"
+            f"{_FILE_EXTENSIONS[file_format]}"
+        )
+        self._partitions = {
+            int(row.id): _partition_path(row.label, row.start_time)
+            for row in experiments.itertuples()
+        }
+
+    def write_experiments(self) -> None:
+        self._write_partitioned("experiments", self._experiments, "id")
+
+    def write_nodes(self, nodes: DataFrame) -> None:
+        self._write_partitioned("nodes", nodes, "experiment_id")
+
+    def write_results(self, results: Iterable[Iterable[ResultRecord]]) -> None:
+        columns: Dict[str, Dict[str, List[Any]]] = {}
+        for experiment_results in results:
+            for result in experiment_results:
+                row = _result_row(result)
+                if row is None:
+                    logger.debug(
+                        f"Result [{result.id}] of experiment [{result.experiment_id}] "
+                        f"was not exported because its data is not a number, a "
+                        f"string or a numeric array"
+                    )
+                    continue
+                partition = self._partitions[result.experiment_id]
+                partition_columns = columns.setdefault(
+                    partition, {name: [] for name in _RESULTS_SCHEMA.names}
+                )
+                for name, value in row.items():
+                    partition_columns[name].append(value)
+        for partition, partition_columns in columns.items():
+            table = pa.Table.from_pydict(partition_columns, schema=_RESULTS_SCHEMA)
+            self._write_table("results", partition, table)
+
+    def _write_partitioned(
+        self, table_dir: str, data: DataFrame, experiment_id_column: str
+    ) -> None:
+        if data.empty:
+            return
+        partitions = data[experiment_id_column].map(self._partitions)
+        for partition, partition_data in data.groupby(partitions, sort=False):
+            table = pa.Table.from_pandas(partition_data, preserve_index=False)
+            self._write_table(table_dir, partition, table)
+
+    def _write_table(self, table_dir: str, partition: str, table: "pa.Table") -> None:
+        dir_path = os.path.join(self._output_dir, table_dir, partition)
+        os.makedirs(dir_path, exist_ok=True)
+        file_path = os.path.join(dir_path, self._file_name)
+        if self._file_format == "parquet":
+            pq.write_table(table, file_path)
+        else:
+            with pa.OSFile(file_path, "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+
+
+def _result_row(result: ResultRecord) -> Optional[Dict[str, Any]]:
+    """Converts a result to a row of the results table. Returns None if the result
+    data is not a real number, a string or a real numeric array"""
+    data = result.data
+    row = dict(
+        experiment_id=result.experiment_id,
+        id=str(result.id),
+        label=result.label,
+        stage=result.stage,
+        story=result.story,
+        time=result.time,
+        value=None,
+        text=None,
+        array=None,
+        shape=None,
+    )
+    if isinstance(data, str):
+        row["text"] = data
+    elif isinstance(data, (bool, int, float, np.bool_, np.integer, np.floating)):
+        row["value"] = float(data)
+    elif isinstance(data, (np.ndarray, LazyHDF5Array, list, tuple)):
+        try:
+            array = np.asarray(data)
+        except ValueError:  # ragged nested sequences
+            return None
+        if array.dtype.kind not in "biuf":
+            return None
+        row["array"] = array.astype(np.float64, copy=False).ravel()
+        row["shape"] = list(array.shape)
+    else:
+        return None
+    return row
+
+
+def _partition_path(label: Optional[str], start_time) -> str:
+    label = quote(label or "", safe="")
+    return os.path.join(
+        f"experiment_label={label}", f"date={start_time.date().isoformat()}"
+    )
+
+
+def _read_last_exported_id(output_dir: str) -> int:
+    state_path = os.path.join(output_dir, _STATE_FILE_NAME)
+    if not os.path.isfile(state_path):
+        return 0
+    with open(state_path) as state_file:
+        return json.load(state_file)["last_experiment_id"]
+
+
+def _write_last_exported_id(output_dir: str, last_experiment_id: int) -> None:
+    os.makedirs(output_dir, exist_ok=True)
+    state_path = os.path.join(output_dir, _STATE_FILE_NAME)
+    with open(state_path, "w") as state_file:
+        json.dump({"last_experiment_id": last_experiment_id}, state_file)
+
+
+def _delete_previous_export(output_dir: str) -> None:
+    for table_dir in _TABLE_DIRS:
+        shutil.rmtree(os.path.join(output_dir, table_dir), ignore_errors=True)
+    state_path = os.path.join(output_dir, _STATE_FILE_NAME)
+    if os.path.isfile(state_path):
+        os.remove(state_path)
@@ -1,13 +1,16 @@
 import enum
+import functools
 import importlib
+import json
 import pickle
 from datetime import datetime
 from io import BytesIO
-from typing import Any
+from typing import Any, Callable, Optional
 
 import numpy as np
 from plotly import graph_objects as go
-from plotly.io import from_json, to_json
+from plotly.io import from_json
+from plotly.io.json import to_json_plotly
 from sqlalchemy import (
     Column,
     Integer,
@@ -17,6 +20,8 @@ from sqlalchemy import (
     BLOB,
     Enum,
     Boolean,
+    Index,
+    LargeBinary,
 )
 from sqlalchemy.orm import declarative_base, relationship
 
@@ -80,6 +85,79 @@ def _decode_serialized_data(serialized_data, data_type):
     return data
 
 
+# dtype kinds of the figure arrays that are encoded as binary (see numpy.dtype.kind):
+_BINARY_FIGURE_ARRAY_KINDS = "biuf"
+# key of the JSON objects that reference binary arrays in encoded figures:
+_FIGURE_ARRAY_REF = "__entropy_array__"
+
+
+def _encode_figure(figure: go.Figure) -> bytes:
+    """Encodes a figure as an (uncompressed) npz archive, in which the numeric arrays
+    of the figure are saved as binary arrays, and the rest of the figure is saved as
+    plotly JSON that references them"""
+    arrays = {}
+
+    def extract_arrays(value):
+        if (
+            isinstance(value, np.ndarray)
+            and value.dtype.kind in _BINARY_FIGURE_ARRAY_KINDS
+        ):
+            name = f"a{len(arrays)}"
+            arrays[name] = value
+            return {_FIGURE_ARRAY_REF: name}
+        if isinstance(value, dict):
+            return {key: extract_arrays(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [extract_arrays(item) for item in value]
+        return value
+
+    figure_json = to_json_plotly(extract_arrays(figure.to_plotly_json()))
+    bio = BytesIO()
+    np.savez(bio, figure=np.frombuffer(figure_json.encode("utf-8"), np.uint8), **arrays)
+    return bio.getvalue()
+
+
+def _decode_figure(data: bytes) -> go.Figure:
+    with np.load(BytesIO(data), allow_pickle=False) as npz:
+
+        def restore_arrays(value):
+            if isinstance(value, dict):
+                if len(value) == 1 and _FIGURE_ARRAY_REF in value:
+                    return npz[value[_FIGURE_ARRAY_REF]]
+                return {key: restore_arrays(item) for key, item in value.items()}
+            if isinstance(value, list):
+                return [restore_arrays(item) for item in value]
+            return value
+
+        return go.Figure(restore_arrays(json.loads(npz["figure"].tobytes())))
+
+
+class _LazyFigureRecord(FigureRecord):
+    """A FigureRecord whose figure is decoded on first access"""
+
+    def __init__(self, *args, **kwargs):
+        self._load_figure: Optional[Callable[[], go.Figure]] = None
+        super().__init__(*args, **kwargs)
+
+    @property
+    def figure(self) -> go.Figure:
+        if self._load_figure is not None:
+            self._figure = self._load_figure()
+            self._load_figure = None
+        return self._figure
+
+    @figure.setter
+    def figure(self, value: go.Figure) -> None:
+        self._figure = value
+        self._load_figure = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_figure"] = self.figure
+        state["_load_figure"] = None
+        return state
+
+
 Base = declarative_base()
 
 
@@ -95,6 +173,11 @@ class ExperimentTable(Base):
     story = Column(String)
     success = Column(Boolean, default=False)
     favorite = Column(Boolean, default=False)
+    __table_args__ = (
+        Index("ix_Experiments_label_start_time", "label", "start_time"),
+        Index("ix_Experiments_start_time", "start_time"),
+        Index("ix_Experiments_end_time", "end_time"),
+    )
     results = relationship("ResultTable", cascade="all, delete-orphan")
     experiment_metadata = relationship("MetadataTable", cascade="all, delete-orphan")
     debug = relationship("DebugTable", cascade="all, delete-orphan")
@@ -145,6 +228,12 @@ class ResultTable(Base):
     data = Column(BLOB)
     data_type = Column(Enum(ResultDataType))
     saved_in_hdf5 = Column(Boolean, nullable=False, default=False)
+    __table_args__ = (
+        Index(
+            "ix_Results_experiment_id_label_stage", "experiment_id", "label", "stage"
+        ),
+        Index("ix_Results_label_stage", "label", "stage"),
+    )
 
     def __repr__(self):
         return f"<Result(id='{self.id}')>"
@@ -169,7 +258,7 @@ class ResultTable(Base):
             stage=result.stage,
             story=result.story,
             label=result.label,
-            time=datetime.now(),
+            time=result.time or datetime.now(),
             data=serialized_data,
             data_type=data_type,
             saved_in_hdf5=False,
@@ -187,6 +276,15 @@ class MetadataTable(Base):
     data = Column(BLOB)
     data_type = Column(Enum(ResultDataType))
     saved_in_hdf5 = Column(Boolean, nullable=False, default=False)
+    __table_args__ = (
+        Index(
+            "ix_ExperimentMetadata_experiment_id_label_stage",
+            "experiment_id",
+            "label",
+            "stage",
+        ),
+        Index("ix_ExperimentMetadata_label_stage", "label", "stage"),
+    )
 
     def __repr__(self):
         return f"<Metadata(id='{self.id}')>"
@@ -209,7 +307,7 @@ class MetadataTable(Base):
             experiment_id=experiment_id,
             stage=metadata.stage,
             label=metadata.label,
-            time=datetime.now(),
+            time=metadata.time or datetime.now(),
             data=serialized_data,
             data_type=data_type,
             saved_in_hdf5=False,
@@ -224,6 +322,10 @@ class NodeTable(Base):
     label = Column(String)
     start = Column(DATETIME, nullable=False)
     is_key_node = Column(Boolean)
+    __table_args__ = (
+        Index("ix_Nodes_label_experiment_id", "label", "experiment_id"),
+        Index("ix_Nodes_experiment_id", "experiment_id"),
+    )
 
     def __repr__(self):
         return f"<Node(id='{self.id}')>"
@@ -251,6 +353,7 @@ class PlotTable(Base):
     time = Column(DATETIME)
     label = Column(String)
     story = Column(String)
+    __table_args__ = (Index("ix_Plots_experiment_id", "experiment_id"),)
 
     def __repr__(self):
         return f"<Plot(id='{self.id}')>"
@@ -286,29 +389,65 @@ class FigureTable(Base):
     __tablename__ = "Figures"
     id = Column(Integer, primary_key=True)
     experiment_id = Column(Integer, ForeignKey("Experiments.id", ondelete="CASCADE"))
+    # plotly JSON of figures that were saved before figure_data was added:
     figure = Column(String)
+    # figures encoded by _encode_figure():
+    figure_data = Column(LargeBinary)
     time = Column(DATETIME)
+    __table_args__ = (Index("ix_Figures_experiment_id", "experiment_id"),)
 
     def __repr__(self):
         return f"<FigureTable(id='{self.id}')>"
 
     def to_record(self) -> FigureRecord:
-        return FigureRecord(
+        record = _LazyFigureRecord(
             experiment_id=self.experiment_id,
             id=self.id,
-            figure=from_json(self.figure),
+            figure=None,
             time=self.time,
         )
+        if self.figure_data is not None:
+            record._load_figure = functools.partial(_decode_figure, self.figure_data)
+        else:
+            record._load_figure = functools.partial(from_json, self.figure)
+        return record
 
     @staticmethod
     def from_model(experiment_id: int, figure: go.Figure):
         return FigureTable(
             experiment_id=experiment_id,
-            figure=to_json(figure),
+            figure_data=_encode_figure(figure),
             time=datetime.now(),
         )
 
 
+class StorageIndexTable(Base):
+    """Index of the result and metadata datasets saved in per-experiment HDF5 files.
+    Used to find the files to read from without opening every file in the project"""
+
+    __tablename__ = "StorageIndex"
+
+    id = Column(Integer, primary_key=True)
+    experiment_id = Column(Integer, nullable=False)
+    entity_type = Column(Integer, nullable=False)
+    stage = Column(Integer)
+    label = Column(String)
+    path = Column(String, nullable=False)
+    dtype = Column(String)
+    shape = Column(String)
+    time = Column(DATETIME)
+
+    __table_args__ = (
+        Index(
+            "ix_StorageIndex_entity_type_label_stage", "entity_type", "label", "stage"
+        ),
+        Index("ix_StorageIndex_experiment_id", "experiment_id"),
+    )
+
+    def __repr__(self):
+        return f"<StorageIndex(id='{self.id}')>"
+
+
 class DebugTable(Base):
     __tablename__ = "Debug"
 
@@ -318,6 +457,7 @@ class DebugTable(Base):
     python_history = Column(String)
     station_specs = Column(String)
     extra = Column(String)
+    __table_args__ = (Index("ix_Debug_experiment_id", "experiment_id"),)
 
     def __repr__(self):
         return f"<Debug(id='{self.id}')>"
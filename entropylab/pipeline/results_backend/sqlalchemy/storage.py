@@ -1,25 +1,136 @@
+import atexit
+import functools
 import os.path
 import pickle
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
-from typing import Optional, Any, Iterable, TypeVar, Callable, List
+from typing import (
+    Optional,
+    Any,
+    Iterable,
+    Iterator,
+    TypeVar,
+    Callable,
+    List,
+    ContextManager,
+    Dict,
+    Tuple,
+    Union,
+)
 
 import h5py
 import numpy as np
+from numpy.lib.mixins import NDArrayOperatorsMixin
+import sqlalchemy.engine
+from sqlalchemy import insert, select, delete
+from sqlalchemy.exc import DBAPIError
 
 from entropylab import RawResultData
+from entropylab.config import settings
 from entropylab.pipeline.api.data_reader import ResultRecord, MetadataRecord
 from entropylab.pipeline.api.data_writer import Metadata
+from entropylab.pipeline.api.errors import EntropyError
 from entropylab.logger import logger
 from entropylab.pipeline.results_backend.sqlalchemy.model import (
     ResultDataType,
     ResultTable,
     Base,
+    StorageIndexTable,
 )
 
 T = TypeVar("T", bound=Base)
 R = TypeVar("R", ResultRecord, MetadataRecord)
 
+_DEFAULT_MAX_OPEN_FILES = 16
+_DEFAULT_IDLE_CLOSE_SECONDS = 1.0
+_DEFAULT_READ_WORKERS = 1
+# number of pending index rows (of all experiments) at which they are added:
+_INDEX_BATCH_SIZE = 1000
+# target size of a single chunk of an appendable dataset:
+_APPEND_CHUNK_BYTES = 64 * 1024
+_BUILT_IN_COMPRESSION_FILTERS = ("gzip", "lzf")
+_NUMERIC_DTYPE_KINDS = "biufc"
+# file attribute holding the name of the last result dataset saved to the file:
+_LAST_RESULT_ATTR = "last_result"
+# minimal size of a dataset for it to be read as a memory map:
+_MEMMAP_MIN_SIZE = 1024 * 1024
+
+
+@dataclass
+class HDF5CompressionPolicy:
+    """
+    Compression and chunking options for HDF5 datasets of numeric ndarrays. Smaller
+    datasets and non-numeric data are always stored uncompressed and contiguous.
+    """
+
+    # "gzip", "lzf" or None for no compression:
+    compression: Optional[str] = None
+    # gzip compression level (0-9):
+    compression_opts: Optional[int] = None
+    # apply the byte shuffle filter before compressing:
+    shuffle: bool = True
+    # True for automatic chunk shape, or an explicit chunk shape:
+    chunks: Union[bool, Tuple[int, ...]] = True
+    # minimal size (in bytes) of data for compression to be applied:
+    min_size: int = 64 * 1024
+
+    def __post_init__(self):
+        if (
+            self.compression is not None
+            and self.compression not in _BUILT_IN_COMPRESSION_FILTERS
+        ):
+            raise ValueError(
+                f"HDF5 compression must be one of {_BUILT_IN_COMPRESSION_FILTERS} or "
+                f"None, not [{self.compression}]"
+            )
+        if isinstance(self.chunks, list):
+            self.chunks = tuple(self.chunks)
+
+    @staticmethod
+    def from_settings() -> "HDF5CompressionPolicy":
+        """Builds a policy from the `storage.hdf5.*` config settings"""
+        return HDF5CompressionPolicy(
+            compression=settings.get("storage.hdf5.compression", None),
+            compression_opts=settings.get("storage.hdf5.compression_opts", None),
+            shuffle=settings.get("storage.hdf5.shuffle", True),
+            chunks=settings.get("storage.hdf5.chunks", True),
+            min_size=settings.get("storage.hdf5.compression_min_size", 64 * 1024),
+        )
+
+    def dataset_kwargs(self, data: Any) -> Dict[str, Any]:
+        """Returns the keyword arguments to pass to `h5py.Group.create_dataset()` when
+        creating a dataset for the given data"""
+        if (
+            self.compression is None
+            or not isinstance(data, np.ndarray)
+            or data.dtype.kind not in _NUMERIC_DTYPE_KINDS
+            or data.nbytes < self.min_size
+        ):
+            return {}
+        kwargs = self.filter_kwargs()
+        if isinstance(self.chunks, tuple) and len(self.chunks) != data.ndim:
+            kwargs["chunks"] = True
+        else:
+            kwargs["chunks"] = self.chunks
+        return kwargs
+
+    def filter_kwargs(self) -> Dict[str, Any]:
+        """Returns the compression filter keyword arguments for datasets that are
+        chunked already"""
+        if self.compression is None:
+            return {}
+        kwargs = dict(compression=self.compression, shuffle=self.shuffle)
+        if self.compression == "gzip" and self.compression_opts is not None:
+            kwargs["compression_opts"] = self.compression_opts
+        return kwargs
+
 
 def _experiment_from(dset: h5py.Dataset) -> int:
     return dset.attrs["experiment_id"]
@@ -60,6 +171,138 @@ def _time_from(dset: h5py.Dataset) -> datetime:
     return datetime.fromisoformat(dset.attrs["time"])
 
 
+def _memmap_from(dset: h5py.Dataset) -> Optional[np.memmap]:
+    """Returns a read-only, zero-copy memory map of a large, contiguous and
+    uncompressed numeric dataset. Returns None if the dataset cannot be memory
+    mapped"""
+    if (
+        dset.dtype.kind not in _NUMERIC_DTYPE_KINDS
+        or "data_type" in dset.attrs
+        or dset.chunks is not None
+        or dset.nbytes < _MEMMAP_MIN_SIZE
+    ):
+        return None
+    offset = dset.id.get_offset()
+    if offset is None:  # storage is not allocated yet
+        return None
+    return np.memmap(
+        dset.file.filename,
+        mode="r",
+        dtype=np.dtype(dset.dtype.str),
+        shape=dset.shape,
+        offset=offset,
+    )
+
+
+def _is_sliceable(dset: h5py.Dataset) -> bool:
+    """Large, chunked (e.g. compressed or appendable) numeric datasets are sliced
+    from the file, as they cannot be memory mapped"""
+    return (
+        dset.dtype.kind in _NUMERIC_DTYPE_KINDS
+        and "data_type" not in dset.attrs
+        and dset.chunks is not None
+        and dset.nbytes >= _MEMMAP_MIN_SIZE
+    )
+
+
+class LazyHDF5Array(NDArrayOperatorsMixin):
+    """A read-only, array-like view of a chunked HDF5 dataset.
+
+    Indexing the view (e.g. `record.data[1000:2000]`) reads only the selected part of
+    the dataset from its file. Any other use of the view as an array (numpy functions,
+    operators, iteration or ndarray methods such as `mean()`) reads the whole dataset
+    once. Pickled views are unpickled as ndarrays."""
+
+    def __init__(
+        self, read: Callable[[Any], np.ndarray], shape: Tuple[int, ...], dtype
+    ):
+        """
+        :param read: reads a selection (an h5py index) of the dataset
+        """
+        self._read = read
+        self._array: Optional[np.ndarray] = None
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+
+    @property
+    def ndim(self) -> int:
+        return len(self.shape)
+
+    @property
+    def size(self) -> int:
+        return int(np.prod(self.shape))
+
+    @property
+    def nbytes(self) -> int:
+        return self.size * self.dtype.itemsize
+
+    def __len__(self) -> int:
+        if self.ndim == 0:
+            raise TypeError("len() of unsized object")
+        return self.shape[0]
+
+    def __getitem__(self, key):
+        if self._array is not None:
+            return self._array[key]
+        try:
+            return self._read(key)
+        except TypeError:  # selections that h5py does not support, e.g. unsorted
+            return self._load()[key]
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __array__(self, dtype=None, copy=None):
+        array = self._load()
+        return array if dtype is None else array.astype(dtype, copy=False)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        inputs = tuple(np.asarray(x) if x is self else x for x in inputs)
+        return getattr(ufunc, method)(*inputs, **kwargs)
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._load(), name)
+
+    def __reduce__(self):
+        return self._load().__reduce__()
+
+    def __repr__(self) -> str:
+        return f"LazyHDF5Array(shape={self.shape}, dtype={self.dtype})"
+
+    def _load(self) -> np.ndarray:
+        if self._array is None:
+            self._array = self._read(())
+        return self._array
+
+
+class _LazyResultRecord(ResultRecord):
+    """A ResultRecord whose data is read from its HDF5 dataset on first access"""
+
+    def __init__(self, *args, **kwargs):
+        self._load_data: Optional[Callable[[], Any]] = None
+        super().__init__(*args, **kwargs)
+
+    @property
+    def data(self) -> Any:
+        if self._load_data is not None:
+            self._data = self._load_data()
+            self._load_data = None
+        return self._data
+
+    @data.setter
+    def data(self, value: Any) -> None:
+        self._data = value
+        self._load_data = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_data"] = self.data
+        state["_load_data"] = None
+        return state
+
+
 def _build_result_record(dset: h5py.Dataset) -> ResultRecord:
     return ResultRecord(
         experiment_id=_experiment_from(dset),
@@ -105,11 +348,79 @@ def _get_all_or_single(group: h5py.Group, name: Optional[str] = None):
             return []
 
 
+def _groups_in(group: h5py.Group) -> List[h5py.Group]:
+    if not isinstance(group, h5py.Group):
+        return []
+    return [child for child in group.values() if isinstance(child, h5py.Group)]
+
+
 class EntityType(Enum):
     RESULT = 1
     METADATA = 2
 
 
+class _HDF5Index:
+    """Maintains an index of HDF5 datasets (one row per result or metadata) in the
+    StorageIndex table of the project database"""
+
+    def __init__(self, engine: sqlalchemy.engine.Engine):
+        self._engine = engine
+
+    def add(self, entity_type: EntityType, dset: h5py.Dataset) -> None:
+        self.add_rows([self.row_from(entity_type, dset)])
+
+    def add_rows(self, rows: List[Dict[str, Any]]) -> None:
+        if len(rows) > 0:
+            with self._engine.begin() as connection:
+                connection.execute(insert(StorageIndexTable), rows)
+
+    @staticmethod
+    def row_from(entity_type: EntityType, dset: h5py.Dataset) -> Dict[str, Any]:
+        return dict(
+            experiment_id=int(_experiment_from(dset)),
+            entity_type=entity_type.value,
+            stage=int(_stage_from(dset)),
+            label=str(_label_from(dset)),
+            path=dset.name,
+            dtype=str(dset.dtype),
+            shape=str(dset.shape),
+            time=_time_from(dset).replace(tzinfo=None),
+        )
+
+    def get_experiment_ids(
+        self,
+        entity_type: EntityType,
+        stage: Optional[int] = None,
+        label: Optional[str] = None,
+    ) -> List[int]:
+        query = (
+            select(StorageIndexTable.experiment_id)
+            .distinct()
+            .where(StorageIndexTable.entity_type == entity_type.value)
+        )
+        if stage is not None:
+            query = query.where(StorageIndexTable.stage == int(stage))
+        if label is not None:
+            query = query.where(StorageIndexTable.label == str(label))
+        query = query.order_by(StorageIndexTable.experiment_id)
+        with self._engine.connect() as connection:
+            return [row[0] for row in connection.execute(query)]
+
+    def get_indexed_experiment_ids(self) -> List[int]:
+        query = select(StorageIndexTable.experiment_id).distinct()
+        with self._engine.connect() as connection:
+            return [row[0] for row in connection.execute(query)]
+
+    def is_empty(self) -> bool:
+        with self._engine.connect() as connection:
+            query = select(StorageIndexTable.id).limit(1)
+            return connection.execute(query).first() is None
+
+    def clear(self) -> None:
+        with self._engine.begin() as connection:
+            connection.execute(delete(StorageIndexTable))
+
+
 class _HDF5Reader:
     def get_result_records(
         self,
@@ -118,7 +429,11 @@ class _HDF5Reader:
         label: Optional[str] = None,
     ) -> Iterable[ResultRecord]:
         return self._get_records(
-            EntityType.RESULT, _build_result_record, experiment_id, stage, label
+            EntityType.RESULT,
+            self._build_lazy_result_record,
+            experiment_id,
+            stage,
+            label,
         )
 
     def get_metadata_records(
@@ -131,6 +446,52 @@ class _HDF5Reader:
             EntityType.METADATA, _build_metadata_record, experiment_id, stage, label
         )
 
+    def iter_result_records(
+        self,
+        experiment_id: Optional[int] = None,
+        stage: Optional[int] = None,
+        label: Optional[str] = None,
+        read_workers: Optional[int] = None,
+    ) -> Iterator[ResultRecord]:
+        """Yields result records one experiment file at a time, in the order in
+        which the files are read.
+
+        :param read_workers: number of worker processes that read experiment files
+                 in parallel. Overrides the `storage.hdf5.read_workers` config
+                 setting.
+        """
+        return self._iter_records(
+            EntityType.RESULT,
+            self._build_lazy_result_record,
+            experiment_id,
+            stage,
+            label,
+            read_workers,
+        )
+
+    def iter_metadata_records(
+        self,
+        experiment_id: Optional[int] = None,
+        stage: Optional[int] = None,
+        label: Optional[str] = None,
+        read_workers: Optional[int] = None,
+    ) -> Iterator[MetadataRecord]:
+        """Yields metadata records one experiment file at a time, in the order in
+        which the files are read.
+
+        :param read_workers: number of worker processes that read experiment files
+                 in parallel. Overrides the `storage.hdf5.read_workers` config
+                 setting.
+        """
+        return self._iter_records(
+            EntityType.METADATA,
+            _build_metadata_record,
+            experiment_id,
+            stage,
+            label,
+            read_workers,
+        )
+
     def _get_records(
         self,
         entity_type: EntityType,
@@ -139,19 +500,139 @@ class _HDF5Reader:
         stage: Optional[int] = None,
         label: Optional[str] = None,
     ) -> Iterable[T]:
-        entities = []
+        entities = self._iter_records(
+            entity_type, record_build_func, experiment_id, stage, label
+        )
+        return sorted(entities, key=lambda entity: entity.experiment_id)
+
+    def _iter_records(
+        self,
+        entity_type: EntityType,
+        record_build_func: Callable,
+        experiment_id: Optional[int] = None,
+        stage: Optional[int] = None,
+        label: Optional[str] = None,
+        read_workers: Optional[int] = None,
+    ) -> Iterator[T]:
         if experiment_id:
             experiment_ids = [experiment_id]
+        elif self._index is not None:
+            # noinspection PyUnresolvedReferences
+            self._add_pending_index_rows()
+            # noinspection PyUnresolvedReferences
+            experiment_ids = self._index.get_experiment_ids(entity_type, stage, label)
+            experiment_ids += self._list_unindexed_experiment_ids()
         else:
             experiment_ids = self._list_experiment_ids_in_fs()
+        # noinspection PyUnresolvedReferences
+        read_workers = self._get_read_workers(read_workers)
+        # noinspection PyUnresolvedReferences
+        if read_workers > 1 and len(experiment_ids) > 1 and not self._in_memory_mode:
+            yield from self._iter_records_in_parallel(
+                entity_type, experiment_ids, stage, label, read_workers
+            )
+        else:
+            for experiment_id in experiment_ids:
+                yield from self._get_experiment_entities(
+                    entity_type, record_build_func, experiment_id, stage, label
+                )
+
+    def _iter_records_in_parallel(
+        self,
+        entity_type: EntityType,
+        experiment_ids: List[int],
+        stage: Optional[int],
+        label: Optional[str],
+        read_workers: int,
+    ) -> Iterator[T]:
+        """Reads experiment files in worker processes and yields their records as
+        each file completes. h5py serializes all calls to the HDF5 library behind a
+        global lock, so reading files in threads would not run in parallel. Files
+        that are open for writing in this process are read here, after the rest."""
+        # noinspection PyUnresolvedReferences
+        pooled_paths = set(self._paths_in_pool())
+        local_ids, remote_ids = [], []
         for experiment_id in experiment_ids:
-            entities += self._get_experiment_entities(
+            # noinspection PyUnresolvedReferences
+            if self._build_hdf5_filepath(experiment_id) in pooled_paths:
+                local_ids.append(experiment_id)
+            else:
+                remote_ids.append(experiment_id)
+        with ProcessPoolExecutor(max_workers=read_workers) as executor:
+            futures = [
+                executor.submit(
+                    _read_experiment_records,
+                    # noinspection PyUnresolvedReferences
+                    self._path,
+                    entity_type,
+                    experiment_id,
+                    stage,
+                    label,
+                )
+                for experiment_id in remote_ids
+            ]
+            for future in as_completed(futures):
+                yield from future.result()
+        record_build_func = _EAGER_RECORD_BUILDERS[entity_type]
+        for experiment_id in local_ids:
+            yield from self._get_experiment_entities(
                 entity_type, record_build_func, experiment_id, stage, label
             )
-        return sorted(entities, key=lambda entity: entity.experiment_id)
+
+    def _build_lazy_result_record(self, dset: h5py.Dataset) -> ResultRecord:
+        experiment_id = _experiment_from(dset)
+        record = _LazyResultRecord(
+            experiment_id=experiment_id,
+            id=_id_from(dset),
+            label=_label_from(dset),
+            story=_story_from(dset),
+            stage=_stage_from(dset),
+            data=None,
+            time=_time_from(dset),
+        )
+        record._load_data = functools.partial(self._read_data, experiment_id, dset.name)
+        return record
+
+    def _read_data(self, experiment_id: int, dset_name: str) -> Any:
+        """Reads the data of a single dataset. Large contiguous numeric datasets are
+        memory mapped when their file is on disk and not open for writing, and large
+        chunked numeric datasets are returned as LazyHDF5Arrays"""
+        # noinspection PyUnresolvedReferences
+        can_memmap = not self._in_memory_mode and not self._paths_in_pool(experiment_id)
+        # noinspection PyUnresolvedReferences
+        with self._readable_hdf5(experiment_id) as file:
+            dset = file[dset_name]
+            if _is_sliceable(dset):
+                return LazyHDF5Array(
+                    functools.partial(self._read_selection, experiment_id, dset_name),
+                    dset.shape,
+                    dset.dtype,
+                )
+            memmap = _memmap_from(dset) if can_memmap else None
+            return memmap if memmap is not None else _data_from(dset)
+
+    def _read_selection(self, experiment_id: int, dset_name: str, key: Any) -> Any:
+        # noinspection PyUnresolvedReferences
+        with self._readable_hdf5(experiment_id) as file:
+            return file[dset_name][key]
+
+    def _list_unindexed_experiment_ids(self) -> List[int]:
+        """The experiments whose files have no rows in the index, e.g. because they
+        are still written to by another process (whose pending rows are added when
+        it closes the files), or because that process failed before adding them"""
+        # noinspection PyUnresolvedReferences
+        indexed = set(self._index.get_indexed_experiment_ids())
+        return sorted(
+            int(experiment_id)
+            for experiment_id in self._list_experiment_ids_in_fs()
+            if experiment_id.isdigit() and int(experiment_id) not in indexed
+        )
 
     def _list_experiment_ids_in_fs(self) -> List[int]:
         # noinspection PyUnresolvedReferences
+        if not os.path.isdir(self._path):  # e.g. in memory mode
+            return []
+        # noinspection PyUnresolvedReferences
         dir_list = os.listdir(self._path)
         # TODO: Better validation of experiment ids
         exp_files = filter(lambda f: f.endswith(".hdf5"), dir_list)
@@ -169,23 +650,36 @@ class _HDF5Reader:
         dsets = []
         try:
             # noinspection PyUnresolvedReferences
-            file = self._open_hdf5(experiment_id, "r")
-        except FileNotFoundError:
-            logger.error(f"HDF5 file for experiment_id [{experiment_id}] was not found")
-        else:
-            with file:
+            with self._readable_hdf5(experiment_id) as file:
                 stage_groups = _get_all_or_single(file, stage)
                 for stage_group in stage_groups:
                     label_groups = _get_all_or_single(stage_group, label)
                     for label_group in label_groups:
                         dset_name = entity_type.name.lower()
-                        dset = label_group[dset_name]
-                        dsets.append(convert_from_dset(dset))
+                        if dset_name in label_group:
+                            dset = label_group[dset_name]
+                            dsets.append(convert_from_dset(dset))
+        except FileNotFoundError:
+            logger.error(f"HDF5 file for experiment_id [{experiment_id}] was not found")
+        except OSError:
+            logger.exception(
+                f"HDF5 file for experiment_id [{experiment_id}] could not be opened. "
+                f"It may be open for writing by a running experiment"
+            )
         return dsets
 
     def get_last_result_of_experiment(
         self, experiment_id: int
     ) -> Optional[ResultRecord]:
+        try:
+            # noinspection PyUnresolvedReferences
+            with self._readable_hdf5(experiment_id) as file:
+                dset_name = file.attrs.get(_LAST_RESULT_ATTR)
+                if dset_name is not None and dset_name in file:
+                    return self._build_lazy_result_record(file[dset_name])
+        except OSError:
+            pass  # logged when reading all results below
+        # files saved before the last result was recorded in the file:
         results = list(self.get_result_records(experiment_id, None, None))
         if results and len(results) > 0:
             results.sort(key=lambda x: x.time, reverse=True)
@@ -197,30 +691,69 @@ class _HDF5Reader:
 class _HDF5Writer:
     def save_result(self, experiment_id: int, result: RawResultData) -> str:
         # noinspection PyUnresolvedReferences
-        with self._open_hdf5(experiment_id, "a") as file:
-            return self._save_entity_to_file(
-                file,
-                EntityType.RESULT,
-                experiment_id,
-                result.stage,
-                result.label,
-                result.data,
-                datetime.now(),
-                result.story,
-            )
+        with self._writable_hdf5(experiment_id) as file:
+            return self._save_result_to_file(file, experiment_id, result)
+
+    def save_results(
+        self, experiment_id: int, results: Iterable[RawResultData]
+    ) -> List[str]:
+        """Saves a batch of results, opening the experiment's file once for the whole
+        batch"""
+        # noinspection PyUnresolvedReferences
+        with self._writable_hdf5(experiment_id) as file:
+            return [
+                self._save_result_to_file(file, experiment_id, result)
+                for result in results
+            ]
 
     def save_metadata(self, experiment_id: int, metadata: Metadata):
         # noinspection PyUnresolvedReferences
-        with self._open_hdf5(experiment_id, "a") as file:
-            return self._save_entity_to_file(
-                file,
-                EntityType.METADATA,
-                experiment_id,
-                metadata.stage,
-                metadata.label,
-                metadata.data,
-                datetime.now(),
-            )
+        with self._writable_hdf5(experiment_id) as file:
+            return self._save_metadata_to_file(file, experiment_id, metadata)
+
+    def save_metadata_records(
+        self, experiment_id: int, metadata_records: Iterable[Metadata]
+    ) -> List[str]:
+        """Saves a batch of metadata, opening the experiment's file once for the whole
+        batch"""
+        # noinspection PyUnresolvedReferences
+        with self._writable_hdf5(experiment_id) as file:
+            return [
+                self._save_metadata_to_file(file, experiment_id, metadata)
+                for metadata in metadata_records
+            ]
+
+    def _save_result_to_file(
+        self, file: h5py.File, experiment_id: int, result: RawResultData
+    ) -> str:
+        save_entity_to_file = (
+            self._append_entity_to_file if result.append else self._save_entity_to_file
+        )
+        dset_name = save_entity_to_file(
+            file,
+            EntityType.RESULT,
+            experiment_id,
+            result.stage,
+            result.label,
+            result.data,
+            result.time or datetime.now(),
+            result.story,
+        )
+        file.attrs[_LAST_RESULT_ATTR] = dset_name
+        return dset_name
+
+    def _save_metadata_to_file(
+        self, file: h5py.File, experiment_id: int, metadata: Metadata
+    ) -> str:
+        return self._save_entity_to_file(
+            file,
+            EntityType.METADATA,
+            experiment_id,
+            metadata.stage,
+            metadata.label,
+            metadata.data,
+            metadata.time or datetime.now(),
+        )
 
     def _save_entity_to_file(
         self,
@@ -237,22 +770,156 @@ class _HDF5Writer:
         path = f"/{stage}/{label}"
         label_group = file.require_group(path)
         dset = self._create_dataset(label_group, entity_type, data)
+        self._create_entity_attrs(dset, experiment_id, stage, label, time, story)
+        if migrated_id:
+            dset.attrs.create("migrated_id", migrated_id or "")
+        self._index_dataset(entity_type, dset)
+        return dset.name
+
+    def _append_entity_to_file(
+        self,
+        file: h5py.File,
+        entity_type: EntityType,
+        experiment_id: int,
+        stage: int,
+        label: str,
+        data: Any,
+        time: datetime,
+        story: Optional[str] = None,
+    ) -> str:
+        """Appends data as a new row (along axis 0) of a resizable dataset. The time
+        of each row is appended to a companion "<entity type>_time" dataset as a
+        POSIX timestamp. The dtype and shape of the dataset are those of its first
+        row. Later rows must have the same shape, and a dtype that can be cast to the
+        dataset's dtype without loss (e.g. ints to a float dataset, but not floats to
+        an int dataset)."""
+        row = np.asarray(data)
+        if row.dtype.kind not in "biufc":
+            raise TypeError(
+                f"Only numeric data can be appended. Data of type [{type(data)}] "
+                f"has dtype [{row.dtype}]"
+            )
+        if row.size == 0:
+            raise EntropyError(
+                f"Empty data cannot be appended (stage=[{stage}], label=[{label}])"
+            )
+        path = f"/{stage}/{label}"
+        label_group = file.require_group(path)
+        name = entity_type.name.lower()
+        time_name = f"{name}_time"
+        if name in label_group:
+            dset = label_group[name]
+            if not dset.attrs.get("append", False):
+                raise ValueError(f"Dataset [{dset.name}] exists and is not appendable")
+            if dset.shape[1:] != row.shape:
+                raise EntropyError(
+                    f"Shape of appended data {row.shape} does not match the shape of "
+                    f"rows in dataset [{dset.name}] {dset.shape[1:]}"
+                )
+            if not np.can_cast(row.dtype, dset.dtype, casting="safe"):
+                raise EntropyError(
+                    f"Appended data of dtype [{row.dtype}] cannot be saved in dataset "
+                    f"[{dset.name}] of dtype [{dset.dtype}] without loss. The dtype of "
+                    f"the dataset is the dtype of its first row"
+                )
+        else:
+            rows_per_chunk = max(1, _APPEND_CHUNK_BYTES // max(1, row.nbytes))
+            # noinspection PyUnresolvedReferences
+            dset = label_group.create_dataset(
+                name=name,
+                shape=(0, *row.shape),
+                maxshape=(None, *row.shape),
+                chunks=(rows_per_chunk, *row.shape),
+                dtype=row.dtype,
+                **self._compression_policy.filter_kwargs(),
+            )
+            label_group.create_dataset(
+                name=time_name,
+                shape=(0,),
+                maxshape=(None,),
+                chunks=(_APPEND_CHUNK_BYTES // 8,),
+                dtype="f8",
+            )
+            self._create_entity_attrs(dset, experiment_id, stage, label, time, story)
+            dset.attrs.create("append", True)
+            self._index_dataset(entity_type, dset)
+        times = label_group[time_name]
+        index = dset.shape[0]
+        dset.resize(index + 1, axis=0)
+        dset[index] = row
+        times.resize(index + 1, axis=0)
+        times[index] = time.timestamp()
+        dset.attrs["time"] = time.astimezone().isoformat()
+        return dset.name
+
+    def _index_dataset(self, entity_type: EntityType, dset: h5py.Dataset) -> None:
+        """Index rows are added to the index in batches: when the experiment's file
+        is flushed or closed, before the index is queried, or when there are
+        _INDEX_BATCH_SIZE pending rows"""
+        # noinspection PyUnresolvedReferences
+        if self._index is None:
+            return
+        row = _HDF5Index.row_from(entity_type, dset)
+        # noinspection PyUnresolvedReferences
+        with self._open_files_lock:
+            # noinspection PyUnresolvedReferences
+            self._pending_index_rows.setdefault(row["experiment_id"], []).append(row)
+            # noinspection PyUnresolvedReferences
+            pending_count = sum(map(len, self._pending_index_rows.values()))
+        if pending_count >= _INDEX_BATCH_SIZE:
+            self._add_pending_index_rows()
+
+    def _add_pending_index_rows(self, experiment_id: Optional[int] = None) -> None:
+        """Adds the pending index rows of an experiment (or of all experiments, if
+        experiment_id is None) to the index in a single insert"""
+        # noinspection PyUnresolvedReferences
+        with self._open_files_lock:
+            # noinspection PyUnresolvedReferences
+            pending = self._pending_index_rows
+            if experiment_id is None:
+                experiment_ids = list(pending.keys())
+            else:
+                experiment_ids = [i for i in [int(experiment_id)] if i in pending]
+            rows = [row for i in experiment_ids for row in pending.pop(i)]
+            if rows:
+                self._add_index_rows(rows)
+
+    def _add_index_rows(self, rows: List[Dict[str, Any]]) -> None:
+        try:
+            # noinspection PyUnresolvedReferences
+            self._index.add_rows(rows)
+        except DBAPIError:
+            paths = ", ".join(row["path"] for row in rows)
+            logger.exception(
+                f"Failed to index HDF5 datasets [{paths}]. Use the Entropy CLI "
+                f"command `entropy index` to rebuild the index"
+            )
+
+    @staticmethod
+    def _create_entity_attrs(
+        dset: h5py.Dataset,
+        experiment_id: int,
+        stage: int,
+        label: str,
+        time: datetime,
+        story: Optional[str] = None,
+    ) -> None:
         dset.attrs.create("experiment_id", experiment_id)
         dset.attrs.create("stage", stage)
         dset.attrs.create("label", label)
         dset.attrs.create("time", time.astimezone().isoformat())
         if story:
             dset.attrs.create("story", story or "")
-        if migrated_id:
-            dset.attrs.create("migrated_id", migrated_id or "")
-        return dset.name
 
     def _create_dataset(
         self, group: h5py.Group, entity_type: EntityType, data: Any
     ) -> h5py.Dataset:
         name = entity_type.name.lower()
         try:
-            dset = group.create_dataset(name=name, data=data)
+            # noinspection PyUnresolvedReferences
+            dset = group.create_dataset(
+                name=name, data=data, **self._compression_policy.dataset_kwargs(data)
+            )
         except TypeError:
             data_type, pickled = self._pickle_data(data)
             # np.void turns our string to bytes (HDF5 Opaque):
@@ -345,13 +1012,52 @@ class _HDF5Migrator(_HDF5Writer):
         logger.debug("Global .hdf5 file migration done")
 
 
+# storages whose pooled files are closed when the interpreter exits:
+_storages_with_pools: "weakref.WeakSet[HDF5Storage]" = weakref.WeakSet()
+
+
+@atexit.register
+def _close_pools_at_exit() -> None:
+    # before h5py's own exit handlers (registered earlier, so run later), and while
+    # idle close timers (daemon threads) may still be waiting to run:
+    for storage in list(_storages_with_pools):
+        storage.close()
+
+
 class HDF5Storage(_HDF5Reader, _HDF5Migrator, _HDF5Writer):
-    def __init__(self, path=None):
+    def __init__(
+        self,
+        path=None,
+        max_open_files: Optional[int] = None,
+        compression_policy: Optional[HDF5CompressionPolicy] = None,
+        index_engine: Optional[sqlalchemy.engine.Engine] = None,
+        read_workers: Optional[int] = None,
+        idle_close_seconds: Optional[float] = None,
+    ):
         """Initializes a new storage class instance  for storing experiment results
                  and metadata in HDF5 files.
 
         :param path: filesystem path to a directory where HDF5 files reside. If no path
                  is given or the path is empty, HDF5 files are stored in memory only.
+        :param max_open_files: maximum number of HDF5 files that are kept open for
+                 writing between calls. The least recently used file is closed when
+                 the limit is exceeded. Overrides the `storage.hdf5.max_open_files`
+                 config setting.
+        :param compression_policy: compression and chunking options for new datasets.
+                 Overrides the `storage.hdf5.*` compression config settings.
+        :param index_engine: engine of the project database in which an index of the
+                 HDF5 datasets is maintained. If None, no index is maintained and
+                 queries across experiments read every HDF5 file.
+        :param read_workers: number of worker processes that read HDF5 files in
+                 parallel when querying across experiments. 1 reads the files
+                 sequentially. Overrides the `storage.hdf5.read_workers` config
+                 setting.
+        :param idle_close_seconds: number of seconds after which an open HDF5 file
+                 that is not written to is flushed and closed, so that other
+                 processes (e.g. the dashboard) can read it. HDF5 locks files that are
+                 open for writing. 0 or less keeps files open until they are closed
+                 explicitly. Overrides the `storage.hdf5.idle_close_seconds` config
+                 setting.
         """
         if path is None or path == "":  # memory files
             self._path = "./entropy_temp_hdf5"
@@ -360,6 +1066,178 @@ class HDF5Storage(_HDF5Reader, _HDF5Migrator, _HDF5Writer):
             self._path = path
             os.makedirs(self._path, exist_ok=True)
             self._in_memory_mode = False
+        self._max_open_files = max_open_files
+        self._open_files: Dict[str, h5py.File] = OrderedDict()
+        self._open_files_lock = threading.RLock()
+        self._idle_close_seconds = idle_close_seconds
+        self._last_write_times: Dict[str, float] = dict()  # path -> monotonic time
+        self._idle_close_timer: Optional[threading.Timer] = None
+        if compression_policy is None:
+            self._compression_policy = HDF5CompressionPolicy.from_settings()
+        else:
+            self._compression_policy = compression_policy
+        self._index = _HDF5Index(index_engine) if index_engine is not None else None
+        self._read_workers = read_workers
+        # experiment id -> rows that are not added to the index yet:
+        self._pending_index_rows: Dict[int, List[Dict[str, Any]]] = dict()
+        if not self._in_memory_mode:
+            _storages_with_pools.add(self)
+
+    @contextmanager
+    def _writable_hdf5(self, experiment_id: int) -> ContextManager[h5py.File]:
+        """Yields a writable file from the pool of open files. The file is opened
+        (and the least recently used file is closed) only if it is not in the pool
+        already. The file stays open when the context exits."""
+        path = self._build_hdf5_filepath(experiment_id)
+        with self._open_files_lock:
+            file = self._open_files.pop(path, None)
+            if file is None or not file.id.valid:
+                file = self._open_hdf5(experiment_id, "a")
+            self._open_files[path] = file
+            self._close_least_recently_used_files()
+            try:
+                yield file
+            finally:
+                self._last_write_times[path] = time.monotonic()
+                self._schedule_idle_close()
+
+    @contextmanager
+    def _readable_hdf5(self, experiment_id: int) -> ContextManager[h5py.File]:
+        """Yields the pooled file if it is open already, otherwise opens the file
+        for reading and closes it when the context exits."""
+        path = self._build_hdf5_filepath(experiment_id)
+        with self._open_files_lock:
+            file = self._open_files.get(path)
+            if file is not None and file.id.valid:
+                yield file
+                return
+        with self._open_hdf5(experiment_id, "r") as file:
+            yield file
+
+    def _close_least_recently_used_files(self):
+        while len(self._open_files) > self._get_max_open_files():
+            path, file = self._open_files.popitem(last=False)
+            self._close_pooled_file(path, file)
+
+    def _schedule_idle_close(self) -> None:
+        """Starts a timer that closes the files that are not written to for the idle
+        close timeout, unless a timer is running already. Files in memory are never
+        closed, as their contents would be lost."""
+        idle_close_seconds = self._get_idle_close_seconds()
+        if (
+            idle_close_seconds <= 0
+            or self._in_memory_mode
+            or self._idle_close_timer is not None
+        ):
+            return
+        self._idle_close_timer = threading.Timer(
+            idle_close_seconds, self._close_idle_files
+        )
+        self._idle_close_timer.daemon = True
+        self._idle_close_timer.start()
+
+    def _close_idle_files(self) -> None:
+        with self._open_files_lock:
+            self._idle_close_timer = None
+            idle_since = time.monotonic() - self._get_idle_close_seconds()
+            for path in list(self._open_files.keys()):
+                if self._last_write_times.get(path, 0) <= idle_since:
+                    logger.debug(f"Closing idle HDF5 file [{path}]")
+                    self._close_pooled_file(path, self._open_files.pop(path))
+            if len(self._open_files) > 0:
+                self._schedule_idle_close()
+
+    def _close_pooled_file(self, path: str, file: h5py.File) -> None:
+        """Closes a file that was removed from the pool, and adds the pending index
+        rows of its experiment"""
+        self._last_write_times.pop(path, None)
+        file.close()
+        self._add_pending_index_rows(self._experiment_id_of(path))
+
+    @staticmethod
+    def _experiment_id_of(path: str) -> int:
+        return int(os.path.basename(path)[: -len(".hdf5")])
+
+    def _get_max_open_files(self) -> int:
+        """Class member set in __init__() overrides config setting"""
+        if self._max_open_files is None:
+            return settings.get("storage.hdf5.max_open_files", _DEFAULT_MAX_OPEN_FILES)
+        else:
+            return self._max_open_files
+
+    def _get_idle_close_seconds(self) -> float:
+        """Class member set in __init__() overrides config setting"""
+        if self._idle_close_seconds is None:
+            return settings.get(
+                "storage.hdf5.idle_close_seconds", _DEFAULT_IDLE_CLOSE_SECONDS
+            )
+        else:
+            return self._idle_close_seconds
+
+    def _get_read_workers(self, read_workers: Optional[int] = None) -> int:
+        """Argument overrides class member set in __init__(), which overrides config
+        setting"""
+        if read_workers is not None:
+            return read_workers
+        if self._read_workers is not None:
+            return self._read_workers
+        return settings.get("storage.hdf5.read_workers", _DEFAULT_READ_WORKERS)
+
+    def flush(self, experiment_id: Optional[int] = None) -> None:
+        """Flushes open HDF5 files to disk
+
+        :param experiment_id: the id of the experiment whose file should be flushed.
+                 If None, all open files are flushed.
+        """
+        with self._open_files_lock:
+            for path in self._paths_in_pool(experiment_id):
+                self._open_files[path].flush()
+            self._add_pending_index_rows(experiment_id)
+
+    def close(self, experiment_id: Optional[int] = None) -> None:
+        """Flushes and closes open HDF5 files, removing them from the pool
+
+        :param experiment_id: the id of the experiment whose file should be closed.
+                 If None, all open files are closed.
+        """
+        with self._open_files_lock:
+            for path in self._paths_in_pool(experiment_id):
+                self._close_pooled_file(path, self._open_files.pop(path))
+            if len(self._open_files) == 0 and self._idle_close_timer is not None:
+                self._idle_close_timer.cancel()
+                self._idle_close_timer = None
+            self._add_pending_index_rows(experiment_id)
+
+    def rebuild_index(self) -> None:
+        """Rebuilds the index of HDF5 datasets by reading all the HDF5 files"""
+        if self._index is None:
+            raise EntropyError("HDF5Storage was initialized without an index")
+        logger.debug("Rebuilding HDF5 storage index")
+        with self._open_files_lock:
+            self._pending_index_rows.clear()  # the datasets are indexed below
+        self._index.clear()
+        experiment_ids = self._list_experiment_ids_in_fs()
+        for experiment_id in experiment_ids:
+            rows = []
+            with self._readable_hdf5(experiment_id) as file:
+                for stage_group in file.values():
+                    for label_group in _groups_in(stage_group):
+                        for entity_type in EntityType:
+                            dset_name = entity_type.name.lower()
+                            if dset_name in label_group:
+                                dset = label_group[dset_name]
+                                rows.append(_HDF5Index.row_from(entity_type, dset))
+            self._index.add_rows(rows)
+        logger.debug(f"Indexed HDF5 files of {len(experiment_ids)} experiments")
+
+    def index_is_empty(self) -> bool:
+        return self._index is None or self._index.is_empty()
+
+    def _paths_in_pool(self, experiment_id: Optional[int] = None) -> List[str]:
+        if experiment_id is None:
+            return list(self._open_files.keys())
+        path = self._build_hdf5_filepath(experiment_id)
+        return [path] if path in self._open_files else []
 
     def _open_hdf5(self, experiment_id: int, mode: str) -> h5py.File:
         path = self._build_hdf5_filepath(experiment_id)
@@ -378,3 +1256,30 @@ class HDF5Storage(_HDF5Reader, _HDF5Migrator, _HDF5Writer):
 
     def _build_hdf5_filepath(self, experiment_id: int) -> str:
         return os.path.join(self._path, f"{experiment_id}.hdf5")
+
+
+_EAGER_RECORD_BUILDERS = {
+    EntityType.RESULT: _build_result_record,
+    EntityType.METADATA: _build_metadata_record,
+}
+
+
+def _read_experiment_records(
+    path: str,
+    entity_type: EntityType,
+    experiment_id: int,
+    stage: Optional[int],
+    label: Optional[str],
+) -> List[R]:
+    """Reads the records of a single experiment file in a worker process. Record
+    data is read eagerly so that records can be returned to the calling process"""
+    storage = HDF5Storage(path, read_workers=1)
+    return list(
+        storage._get_experiment_entities(
+            entity_type,
+            _EAGER_RECORD_BUILDERS[entity_type],
+            experiment_id,
+            stage,
+            label,
+        )
+    )
@@ -1,11 +1,17 @@
 import os.path
 from datetime import datetime
 
+import numpy as np
 import pytest
 from plotly import express as px
 
 from entropylab import SqlAlchemyDB, RawResultData
-from entropylab.pipeline.api.data_writer import ExperimentInitialData, ExperimentEndData
+from entropylab.pipeline.api.data_writer import (
+    ExperimentInitialData,
+    ExperimentEndData,
+    Metadata,
+)
+from entropylab.pipeline.api.errors import EntropyError
 from entropylab.pipeline.results_backend.sqlalchemy.db_initializer import (
     _ENTROPY_DIRNAME,
     _HDF5_DIRNAME,
@@ -22,6 +28,104 @@ def test_save_result_raises_when_same_result_saved_twice(initialized_project_dir
         target.save_result(0, raw_result)
 
 
+def test_save_result_when_appending_same_result_then_rows_are_appended(
+    initialized_project_dir_path,
+):
+    # arrange
+    target = SqlAlchemyDB(initialized_project_dir_path)
+    # act
+    for i in range(3):
+        target.save_result(0, RawResultData(stage=1, label="foo", data=i, append=True))
+    # assert
+    actual = target.get_results(0, "foo", 1)
+    assert len(actual) == 1
+    assert list(actual[0].data) == [0, 1, 2]
+
+
+def test_save_result_when_appending_empty_array_then_error_is_not_already_exists(
+    initialized_project_dir_path,
+):
+    # arrange
+    target = SqlAlchemyDB(initialized_project_dir_path)
+    # act & assert
+    with pytest.raises(EntropyError) as error:
+        target.save_result(0, RawResultData(label="foo", data=[], append=True))
+    assert "already exists" not in str(error.value)
+    assert "Empty data" in str(error.value.__cause__)
+
+
+def test_save_result_when_appending_and_hdf5_is_disabled_then_error_is_raised(
+    initialized_project_dir_path,
+):
+    # arrange
+    target = SqlAlchemyDB(initialized_project_dir_path, enable_hdf5_storage=False)
+    # act & assert
+    with pytest.raises(EntropyError, match="HDF5"):
+        target.save_result(0, RawResultData(label="foo", data=1, append=True))
+    assert target.get_results(0) == []
+
+
+def test_get_metadata_records_when_hdf_is_enabled_then_metadata_is_from_hdf5(
+    initialized_project_dir_path,
+):
+    # arrange
+    target = SqlAlchemyDB(initialized_project_dir_path)
+    target.save_metadata(1, Metadata(label="foo", stage=0, data=42))
+    target.save_metadata(2, Metadata(label="bar", stage=0, data=43))
+    # act
+    actual = target.get_metadata_records(label="foo")
+    # assert
+    assert len(actual) == 1
+    assert actual[0].data == 42
+
+
+@pytest.mark.parametrize("enable_hdf5_storage", [True, False])
+def test_iter_results_yields_matching_results(
+    enable_hdf5_storage, initialized_project_dir_path
+):
+    # arrange
+    target = SqlAlchemyDB(
+        initialized_project_dir_path, enable_hdf5_storage=enable_hdf5_storage
+    )
+    for experiment_id in range(1, 4):
+        target.save_result(
+            experiment_id, RawResultData(label="foo", data=experiment_id)
+        )
+        target.save_result(experiment_id, RawResultData(label="bar", data=0))
+    # act
+    actual = target.iter_results(label="foo")
+    # assert
+    assert not isinstance(actual, list)
+    assert sorted(result.data for result in actual) == [1, 2, 3]
+
+
+@pytest.mark.parametrize("enable_hdf5_storage", [True, False])
+def test_iter_metadata_records_yields_matching_metadata(
+    enable_hdf5_storage, initialized_project_dir_path
+):
+    # arrange
+    target = SqlAlchemyDB(
+        initialized_project_dir_path, enable_hdf5_storage=enable_hdf5_storage
+    )
+    target.save_metadata(1, Metadata(label="foo", stage=0, data=42))
+    target.save_metadata(2, Metadata(label="bar", stage=0, data=43))
+    # act
+    actual = list(target.iter_metadata_records(label="foo"))
+    # assert
+    assert [metadata.data for metadata in actual] == [42]
+
+
+def test_iter_experiments_yields_matching_experiments():
+    # arrange
+    target = SqlAlchemyDB()
+    initial_data, _ = __save_one_record_to(target)
+    # act
+    actual = list(target.iter_experiments(label="foo", success=True))
+    # assert
+    assert len(actual) == 1
+    assert actual[0].story == initial_data.story
+
+
 def test_get_last_result_of_experiment_when_hdf_is_enabled_then_result_is_from_hdf5(
     initialized_project_dir_path,
 ):
@@ -64,6 +168,59 @@ def test_save_result_when_successful_then_result_is_saved_to_hdf5_dir(
     assert os.path.isfile(hdf5_path)
 
 
+def test_save_experiment_end_data_closes_hdf5_file(initialized_project_dir_path):
+    # arrange
+    target = SqlAlchemyDB(initialized_project_dir_path)
+    initial_data, end_data = __save_one_record_to(target)
+    target.save_result(1, RawResultData(label="foo", data=42))
+    # act
+    target.save_experiment_end_data(1, end_data)
+    # assert
+    assert len(target._storage._open_files) == 0
+    assert target.get_last_result_of_experiment(1).data == 42
+
+
+@pytest.mark.parametrize("enable_hdf5_storage", [True, False])
+def test_save_result_when_async_writes_then_result_is_readable(
+    enable_hdf5_storage, initialized_project_dir_path
+):
+    # arrange
+    target = SqlAlchemyDB(
+        initialized_project_dir_path,
+        enable_hdf5_storage=enable_hdf5_storage,
+        async_writes=True,
+    )
+    data = np.arange(3)
+    # act
+    target.save_result(1, RawResultData(label="foo", data=data))
+    data[0] = 42  # arrays are copied when the result is saved
+    # assert
+    assert target.get_results(1, label="foo")[0].data.tolist() == [0, 1, 2]
+    assert target.async_writer_metrics.completed_count == 1
+    assert target.async_writer_metrics.queue_depth == 0
+    target.close()
+
+
+def test_save_experiment_end_data_when_async_write_failed_then_raises(
+    initialized_project_dir_path,
+):
+    # arrange
+    target = SqlAlchemyDB(initialized_project_dir_path, async_writes=True)
+    __save_one_record_to(target)
+    target.save_result(1, RawResultData(label="foo", data=1))
+    target.save_result(1, RawResultData(label="foo", data=2))
+    # act & assert
+    with pytest.raises(EntropyError):
+        target.save_experiment_end_data(1, ExperimentEndData(datetime.now(), True))
+    assert target.async_writer_metrics.failed_count == 1
+    target.close()
+
+
+def test_ctor_when_async_writes_and_in_memory_then_writes_are_synchronous():
+    target = SqlAlchemyDB(async_writes=True)
+    assert target.async_writer_metrics is None
+
+
 def test_save_figure_(initialized_project_dir_path):
     # arrange
     db = SqlAlchemyDB(initialized_project_dir_path)
@@ -93,6 +250,48 @@ def test_get_experiments_range_reads_all_columns():
     assert not record["favorite"]
 
 
+def test_get_experiments_range_reads_newest_experiments_first():
+    # arrange
+    target = SqlAlchemyDB()
+    for _ in range(5):
+        __save_one_record_to(target)
+    # act
+    actual = target.get_experiments_range(1, 3)
+    # assert
+    assert actual["id"].tolist() == [4, 3, 2]
+
+
+def test_get_experiments_page_reads_all_pages_by_cursor():
+    # arrange
+    target = SqlAlchemyDB()
+    for _ in range(5):
+        __save_one_record_to(target)
+    # act
+    pages = [target.get_experiments_page(2)]
+    while pages[-1].next_cursor is not None:
+        pages.append(target.get_experiments_page(2, pages[-1].next_cursor))
+    # assert
+    assert [page.experiments["id"].tolist() for page in pages] == [
+        [5, 4],
+        [3, 2],
+        [1],
+    ]
+
+
+def test_get_experiments_page_is_stable_when_experiments_are_added():
+    # arrange
+    target = SqlAlchemyDB()
+    for _ in range(4):
+        __save_one_record_to(target)
+    first_page = target.get_experiments_page(2)
+    __save_one_record_to(target)
+    # act
+    actual = target.get_experiments_page(2, first_page.next_cursor)
+    # assert
+    assert actual.experiments["id"].tolist() == [2, 1]
+    assert actual.next_cursor is None
+
+
 @pytest.mark.parametrize("is_favorite", [True, False])
 def test_update_experiment_favorite(is_favorite):
     # arrange
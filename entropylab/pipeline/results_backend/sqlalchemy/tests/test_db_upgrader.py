@@ -2,6 +2,8 @@ import os
 import shutil
 
 import pytest
+from plotly import express as px
+from plotly.io import to_json
 from sqlalchemy import create_engine, text
 
 from entropylab import SqlAlchemyDB, RawResultData
@@ -10,6 +12,11 @@ from entropylab.logger import logger
 from entropylab.pipeline.api.data_writer import Metadata
 from entropylab.pipeline.api.errors import EntropyError
 from entropylab.pipeline.params.param_store import ParamStore
+from entropylab.pipeline.params.persistence.migrations import convert_param_store_file
+from entropylab.pipeline.params.persistence.serializers import (
+    BINARY_MAGIC,
+    JSONPickleSerializer,
+)
 from entropylab.pipeline.results_backend.sqlalchemy.db_initializer import (
     _ENTROPY_DIRNAME,
     _DB_FILENAME,
@@ -118,6 +125,7 @@ def test__migrate_results_to_hdf5(initialized_project_dir_path):
     )
     hdf5_results = storage.get_result_records()
     assert len(list(hdf5_results)) == 5
+    assert len(SqlAlchemyDB(initialized_project_dir_path).get_results(label="foo")) == 1
     with target._engine.connect() as connection:
         cur = connection.execute(text("SELECT * FROM Results WHERE saved_in_hdf5 = 1"))
         res = cur.all()
@@ -161,6 +169,8 @@ def test__migrate_metadata_to_hdf5(initialized_project_dir_path):
         "empty_after_2022-05-19-09-12-01_06140c96c8c4_wrapping_param_store_values.db",
         "empty_after_2022-06-16-09-26-06_7fa75ca1263f_del_results_and_metadata.db",
         "empty_after_2022-06-23-10-16-39_273a9fae6206_experiments_favorite_col.db",
+        "empty_after_2026-10-17-10-04-27_c4a8e61f0b93_query_indexes.db",
+        "empty_after_2026-10-17-11-20-53_66b8b30feca3_binary_figures.db",
     ],
     indirect=True,
 )
@@ -198,6 +208,59 @@ def test_upgrade_db_upgrades_params_json_from_0_1_to_0_2(
     assert param_store["qubit1.flux_capacitor"]["wave"] == "manifold"
 
 
+@pytest.mark.parametrize(
+    "initialized_project_dir_path",
+    ["empty_after_2026-10-17-11-20-53_66b8b30feca3_binary_figures.db"],
+    indirect=True,
+)
+def test_upgrade_db_when_binary_is_opted_in_then_params_json_is_converted_on_commit(
+    initialized_project_dir_path, binary_param_store_serializer
+):
+    # arrange
+    tinydb_file_path = str(param_store_file_path(initialized_project_dir_path))
+    param_store = ParamStore(tinydb_file_path)
+    param_store["foo"] = 42
+    commit_id = param_store.commit()
+    convert_param_store_file(tinydb_file_path, "test", JSONPickleSerializer())
+    target = _DbUpgrader(initialized_project_dir_path)
+    # act
+    target.upgrade_db()
+    # assert
+    with open(tinydb_file_path, "rb") as file:
+        assert not file.read().startswith(BINARY_MAGIC)
+    param_store = ParamStore(tinydb_file_path)
+    param_store["bar"] = 1
+    param_store.commit()
+    with open(tinydb_file_path, "rb") as file:
+        assert file.read().startswith(BINARY_MAGIC)
+    param_store.checkout(commit_id)
+    assert param_store["foo"] == 42
+
+
+@pytest.mark.parametrize(
+    "initialized_project_dir_path",
+    ["empty_after_2026-10-17-11-20-53_66b8b30feca3_binary_figures.db"],
+    indirect=True,
+)
+def test_upgrade_db_when_binary_is_not_opted_in_then_params_json_is_unchanged(
+    initialized_project_dir_path,
+):
+    # arrange
+    tinydb_file_path = str(param_store_file_path(initialized_project_dir_path))
+    param_store = ParamStore(tinydb_file_path)
+    param_store["foo"] = 42
+    param_store.commit()
+    with open(tinydb_file_path, "rb") as file:
+        expected = file.read()
+    target = _DbUpgrader(initialized_project_dir_path)
+    # act
+    target.upgrade_db()
+    # assert
+    with open(tinydb_file_path, "rb") as file:
+        assert file.read() == expected
+    assert not os.path.isfile(f"{tinydb_file_path}.8d2f4a6c1b57.bak")
+
+
 @pytest.mark.parametrize(
     "initialized_project_dir_path",
     [
@@ -248,3 +311,36 @@ def test_upgrade_db_adds_favorite_column_to_experiments_table(
         )
         res = cur.all()
     assert res[0][0] == 1
+
+
+@pytest.mark.parametrize(
+    "initialized_project_dir_path",
+    [
+        "empty_after_2026-10-17-10-04-27_c4a8e61f0b93_query_indexes.db",
+    ],
+    indirect=True,
+)
+def test_upgrade_db_encodes_json_figures_as_binary(initialized_project_dir_path):
+    # arrange
+    figure = px.line(x=["a", "b", "c"], y=[1, 3, 2], title="sample figure")
+    db_file_path = os.path.join(
+        initialized_project_dir_path, _ENTROPY_DIRNAME, _DB_FILENAME
+    )
+    with create_engine(f"sqlite:///{db_file_path}").begin() as connection:
+        connection.execute(
+            text(
+                "INSERT INTO Figures (experiment_id, figure, time) "
+                "VALUES (1, :figure, '2022-01-01 00:00:00.000000')"
+            ),
+            dict(figure=to_json(figure)),
+        )
+    target = _DbUpgrader(initialized_project_dir_path)
+    # act
+    target.upgrade_db()
+    # assert
+    with target._engine.connect() as connection:
+        res = connection.execute(text("SELECT figure, figure_data FROM Figures")).all()
+    assert res[0][0] is None
+    assert res[0][1] is not None
+    actual = SqlAlchemyDB(initialized_project_dir_path).get_figures(1)[0]
+    assert actual.figure == figure
@@ -0,0 +1,36 @@
+import os
+
+import pytest
+from sqlalchemy import text
+
+from entropylab.pipeline.results_backend.sqlalchemy.engine import create_sqlite_engine
+
+
+@pytest.mark.parametrize(
+    "pragma, expected",
+    [
+        ("journal_mode", "wal"),
+        ("synchronous", 1),  # NORMAL
+        ("busy_timeout", 5000),
+        ("cache_size", -64 * 1024),
+    ],
+)
+def test_create_sqlite_engine_sets_pragmas(pragma, expected, project_dir_path):
+    # arrange
+    os.makedirs(project_dir_path, exist_ok=True)
+    target = create_sqlite_engine(os.path.join(project_dir_path, "test.db"))
+    # act
+    with target.connect() as connection:
+        actual = connection.execute(text(f"PRAGMA {pragma}")).scalar()
+    # assert
+    assert actual == expected
+
+
+def test_create_sqlite_engine_when_in_memory_then_journal_mode_is_memory():
+    # arrange
+    target = create_sqlite_engine()
+    # act
+    with target.connect() as connection:
+        actual = connection.execute(text("PRAGMA journal_mode")).scalar()
+    # assert
+    assert actual == "memory"
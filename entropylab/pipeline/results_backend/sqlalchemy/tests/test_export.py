@@ -0,0 +1,129 @@
+import os
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from entropylab import SqlAlchemyDB, RawResultData
+from entropylab.pipeline.api.data_writer import (
+    ExperimentInitialData,
+    ExperimentEndData,
+    NodeData,
+)
+from entropylab.pipeline.results_backend.sqlalchemy.export import export_project
+
+ds = pytest.importorskip("pyarrow.dataset")
+
+
+@pytest.mark.parametrize("file_format", ["parquet", "arrow"])
+def test_export_project_writes_partitioned_tables(
+    file_format, initialized_project_dir_path, tmp_path
+):
+    # arrange
+    db = SqlAlchemyDB(initialized_project_dir_path)
+    _save_experiment(db, "foo", data=[42, "bar", np.arange(6).reshape(2, 3)])
+    _save_experiment(db, "baz", data=[{"not": "exported"}])
+    output_dir = str(tmp_path)
+    # act
+    count = export_project(initialized_project_dir_path, output_dir, file_format)
+    # assert
+    assert count == 2
+    assert os.path.isdir(os.path.join(output_dir, "results", "experiment_label=foo"))
+    results = _read_table(output_dir, "results", file_format)
+    assert results["label"].tolist() == ["0", "1", "2"]
+    assert results["value"][0] == 42
+    assert results["text"][1] == "bar"
+    assert list(results["array"][2]) == [0, 1, 2, 3, 4, 5]
+    assert list(results["shape"][2]) == [2, 3]
+    experiments = _read_table(output_dir, "experiments", file_format)
+    assert sorted(experiments["label"]) == ["baz", "foo"]
+    nodes = _read_table(output_dir, "nodes", file_format)
+    assert nodes["label"].tolist() == ["node", "node"]
+
+
+def test_export_project_when_incremental_then_only_new_experiments_are_exported(
+    initialized_project_dir_path, tmp_path
+):
+    # arrange
+    db = SqlAlchemyDB(initialized_project_dir_path)
+    _save_experiment(db, "foo", data=[1])
+    output_dir = str(tmp_path)
+    export_project(initialized_project_dir_path, output_dir)
+    _save_experiment(db, "foo", data=[2])
+    # act
+    count = export_project(initialized_project_dir_path, output_dir, batch_size=1)
+    # assert
+    assert count == 1
+    results = _read_table(output_dir, "results", "parquet")
+    assert sorted(results["value"]) == [1, 2]
+
+
+def test_export_project_when_experiment_is_running_then_it_is_not_exported(
+    initialized_project_dir_path, tmp_path
+):
+    # arrange
+    db = SqlAlchemyDB(initialized_project_dir_path)
+    _save_experiment(db, "foo", data=[1])
+    db.save_experiment_initial_data(_initial_data("running"))
+    _save_experiment(db, "foo", data=[3])
+    # act
+    count = export_project(initialized_project_dir_path, str(tmp_path))
+    # assert
+    assert count == 1
+
+
+def test_export_project_when_full_then_previous_export_is_replaced(
+    initialized_project_dir_path, tmp_path
+):
+    # arrange
+    db = SqlAlchemyDB(initialized_project_dir_path)
+    _save_experiment(db, "foo", data=[1])
+    output_dir = str(tmp_path)
+    export_project(initialized_project_dir_path, output_dir, batch_size=1)
+    # act
+    count = export_project(initialized_project_dir_path, output_dir, incremental=False)
+    # assert
+    assert count == 1
+    assert len(_read_table(output_dir, "results", "parquet")) == 1
+
+
+def test_export_project_when_format_is_unknown_then_raises(
+    initialized_project_dir_path, tmp_path
+):
+    with pytest.raises(ValueError):
+        export_project(initialized_project_dir_path, str(tmp_path), "csv")
+
+
+def _save_experiment(db: SqlAlchemyDB, label: str, data: list) -> int:
+    experiment_id = db.save_experiment_initial_data(_initial_data(label))
+    db.save_node(
+        experiment_id,
+        NodeData(stage_id=0, start_time=datetime.now(), label="node", is_key_node=True),
+    )
+    for i, item in enumerate(data):
+        db.save_result(experiment_id, RawResultData(label=str(i), data=item))
+    db.save_experiment_end_data(
+        experiment_id, ExperimentEndData(end_time=datetime.now(), success=True)
+    )
+    return experiment_id
+
+
+def _initial_data(label: str) -> ExperimentInitialData:
+    return ExperimentInitialData(
+        label=label,
+        user="user",
+        lab_topology="",
+        script="",
+        start_time=datetime.now(),
+        story="",
+    )
+
+
+def _read_table(output_dir: str, table_dir: str, file_format: str):
+    dataset = ds.dataset(
+        os.path.join(output_dir, table_dir),
+        format="ipc" if file_format == "arrow" else file_format,
+        partitioning="hive",
+    )
+    table = dataset.to_table().to_pandas()
+    return table.sort_values(["id"], kind="stable").reset_index(drop=True)
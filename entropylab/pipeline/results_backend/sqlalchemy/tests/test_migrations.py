@@ -23,8 +23,8 @@ def test_ctor_creates_up_to_date_schema_when_in_memory(path: str):
     [
         None,  # new db
         "empty.db",  # existing but empty
-        "empty_after_2022-08-07-11-53-59_997e336572b8_paramstore_json_v0_3.db"
-        # "empty_after_2022-06-28-12-13-39_09f3b5a1689c_fixing_param_qualified_name.db"
+        "empty_after_2026-10-17-13-05-12_8d2f4a6c1b57_binary_param_store.db"
+        # "empty_after_2022-08-07-11-53-59_997e336572b8_paramstore_json_v0_3.db"
         # ⬆ latest version in pipeline/results_backend/sqlalchemy/alembic/versions
     ],
     indirect=True,
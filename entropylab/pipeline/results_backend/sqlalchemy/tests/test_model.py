@@ -1,3 +1,4 @@
+import numpy as np
 from plotly import express as px
 from plotly.io import to_json
 
@@ -22,5 +23,17 @@ class TestFigureTable:
         actual = target.from_model(1, figure)
 
         assert actual.experiment_id == 1
-        assert actual.figure == to_json(figure)
+        assert actual.figure is None
+        assert actual.figure_data is not None
         assert actual.time is not None
+
+    def test_to_record_when_figure_is_binary_then_it_is_decoded_lazily(self):
+        figure = px.imshow(np.random.rand(20, 30))
+        target = FigureTable.from_model(1, figure)
+
+        actual = target.to_record()
+
+        assert actual._load_figure is not None
+        assert actual.figure == figure
+        assert actual._load_figure is None
+        assert isinstance(actual.figure.data[0].z, np.ndarray)
@@ -0,0 +1,132 @@
+from datetime import datetime, timedelta
+from typing import Callable, List
+
+import pytest
+from sqlalchemy import event, insert, text
+
+from entropylab import SqlAlchemyDB
+from entropylab.pipeline.results_backend.sqlalchemy.model import (
+    ExperimentTable,
+    ResultTable,
+    MetadataTable,
+    NodeTable,
+    FigureTable,
+    ResultDataType,
+)
+
+# Enough rows for SQLite's query planner to prefer an index over a table scan. The
+# plans do not change with larger databases once ANALYZE statistics exist:
+_EXPERIMENTS = 1_000
+_ROWS_PER_EXPERIMENT = 20
+_START = datetime(2022, 1, 1)
+
+
+def _populate(db: SqlAlchemyDB):
+    experiments, results, metadata, nodes, figures = [], [], [], [], []
+    for experiment_id in range(1, _EXPERIMENTS + 1):
+        start_time = _START + timedelta(minutes=experiment_id)
+        experiments.append(
+            dict(
+                id=experiment_id,
+                label=f"experiment{experiment_id % 50}",
+                start_time=start_time,
+                end_time=start_time,
+                success=True,
+            )
+        )
+        figures.append(dict(experiment_id=experiment_id, figure="{}", time=start_time))
+        for i in range(_ROWS_PER_EXPERIMENT):
+            row = dict(
+                experiment_id=experiment_id,
+                stage=i % 5,
+                label=f"label{i}",
+                time=start_time,
+                data=b"",
+                data_type=ResultDataType.String,
+                saved_in_hdf5=False,
+            )
+            results.append(row)
+            metadata.append(row)
+            nodes.append(
+                dict(
+                    experiment_id=experiment_id,
+                    stage_id=i,
+                    label=f"node{i}",
+                    start=start_time,
+                    is_key_node=False,
+                )
+            )
+    with db._engine.begin() as connection:
+        connection.execute(insert(ExperimentTable), experiments)
+        connection.execute(insert(ResultTable), results)
+        connection.execute(insert(MetadataTable), metadata)
+        connection.execute(insert(NodeTable), nodes)
+        connection.execute(insert(FigureTable), figures)
+        connection.execute(text("ANALYZE"))
+
+
+@pytest.fixture(scope="module")
+def populated_db(tmp_path_factory) -> SqlAlchemyDB:
+    db = SqlAlchemyDB(
+        str(tmp_path_factory.mktemp("query_plans")), enable_hdf5_storage=False
+    )
+    _populate(db)
+    return db
+
+
+def _query_plans_of(db: SqlAlchemyDB, func: Callable) -> List[str]:
+    """Calls func and returns the query plans of the SELECT statements it executed"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(db._engine, "before_cursor_execute", capture)
+    try:
+        func()
+    finally:
+        event.remove(db._engine, "before_cursor_execute", capture)
+    assert statements
+    plans = []
+    with db._engine.connect() as connection:
+        cursor = connection.connection.cursor()
+        for statement, parameters in statements:
+            cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            plans.append("\n".join(row[3] for row in cursor.fetchall()))
+        cursor.close()
+    return plans
+
+
+def _assert_uses_index(plan: str, table_name: str):
+    assert f"SCAN {table_name}\n" not in f"{plan}\n", plan
+    assert f"INDEX ix_{table_name}_" in plan, plan
+
+
+@pytest.mark.parametrize(
+    "table_name, func",
+    [
+        ("Results", lambda db: db.get_results(experiment_id=500)),
+        ("Results", lambda db: db.get_results(experiment_id=500, label="label3")),
+        ("Results", lambda db: db.get_results(label="label3", stage=3)),
+        ("Results", lambda db: db.get_last_result_of_experiment(500)),
+        ("ExperimentMetadata", lambda db: db.get_metadata_records(experiment_id=500)),
+        (
+            "ExperimentMetadata",
+            lambda db: db.get_metadata_records(label="label3", stage=3),
+        ),
+        ("Nodes", lambda db: db.get_node_stage_ids_by_label("node3", 500)),
+        ("Nodes", lambda db: db.get_node_stage_ids_by_label("node3")),
+        ("Figures", lambda db: db.get_figures(500)),
+        ("Experiments", lambda db: db.get_experiments(label="experiment3")),
+        (
+            "Experiments",
+            lambda db: db.get_experiments(start_after=_START + timedelta(days=365)),
+        ),
+    ],
+)
+def test_query_uses_index(table_name, func, populated_db):
+    # act
+    plans = _query_plans_of(populated_db, lambda: func(populated_db))
+    # assert
+    _assert_uses_index(plans[-1], table_name)
@@ -1,22 +1,32 @@
 import os
+import pickle
 import shutil
+import subprocess
+import sys
+import time
 from random import randrange
 from typing import Any
 
 import h5py
 import numpy as np
 import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
 
 from entropylab import RawResultData
 from entropylab.pipeline.api.data_writer import Metadata
+from entropylab.pipeline.api.errors import EntropyError
 from entropylab.conftest import _copy_template
 from entropylab.pipeline.results_backend.sqlalchemy.db_initializer import (
     _HDF5_DIRNAME,
     _HDF5_FILENAME,
 )
-from entropylab.pipeline.results_backend.sqlalchemy.model import ResultDataType
+from entropylab.pipeline.results_backend.sqlalchemy.model import ResultDataType, Base
 from entropylab.pipeline.results_backend.sqlalchemy.storage import (
     HDF5Storage,
+    HDF5CompressionPolicy,
+    EntityType,
+    LazyHDF5Array,
     _get_all_or_single,
 )
 
@@ -222,6 +232,39 @@ def test_get_last_result_of_experiment(project_dir_path):
     assert actual.label == "bar"
 
 
+def test_get_last_result_of_experiment_reads_only_last_result(project_dir_path):
+    target = HDF5Storage(project_dir_path)
+    # arrange
+    experiment_id = randrange(10000000)
+    for i in range(10):
+        target.save_result(experiment_id, RawResultData(label=f"foo{i}", data=i))
+    built = []
+    build = target._build_lazy_result_record
+    target._build_lazy_result_record = lambda dset: built.append(dset) or build(dset)
+    # act
+    actual = target.get_last_result_of_experiment(experiment_id)
+    # assert
+    assert actual.label == "foo9"
+    assert actual.data == 9
+    assert len(built) == 1
+
+
+def test_get_last_result_of_experiment_when_file_has_no_last_result_attr(
+    project_dir_path,
+):
+    target = HDF5Storage(project_dir_path)
+    # arrange
+    experiment_id = randrange(10000000)
+    target.save_result(experiment_id, RawResultData(stage=0, label="foo", data=1))
+    target.save_result(experiment_id, RawResultData(stage=1, label="bar", data=2))
+    with target._writable_hdf5(experiment_id) as file:
+        del file.attrs["last_result"]
+    # act
+    actual = target.get_last_result_of_experiment(experiment_id)
+    # assert
+    assert actual.label == "bar"
+
+
 def test_migrate_from_global_hdf5_to_per_experiment_hdf5_files(
     project_dir_path, request
 ):
@@ -282,6 +325,529 @@ def test_get_last_result_of_experiment_when_no_experiment(project_dir_path):
     assert actual is None
 
 
+def test_save_result_reuses_open_file_handle(project_dir_path):
+    target = HDF5Storage(project_dir_path)
+    # arrange
+    experiment_id = randrange(10000000)
+    target.save_result(experiment_id, RawResultData(stage=0, label="foo", data=1))
+    with target._writable_hdf5(experiment_id) as file:
+        expected = file.id.id
+    # act
+    target.save_result(experiment_id, RawResultData(stage=0, label="bar", data=2))
+    # assert
+    with target._writable_hdf5(experiment_id) as file:
+        assert file.id.id == expected
+    assert len(target.get_result_records(experiment_id)) == 2
+
+
+def test_save_result_when_max_open_files_exceeded_then_lru_file_is_closed(
+    project_dir_path,
+):
+    target = HDF5Storage(project_dir_path, max_open_files=2)
+    # act
+    for experiment_id in range(3):
+        target.save_result(experiment_id, RawResultData(label="foo", data=42))
+    # assert
+    assert len(target._open_files) == 2
+    assert target._build_hdf5_filepath(0) not in target._open_files
+    assert target.get_result_records(0)[0].data == 42
+
+
+def test_save_result_when_file_is_idle_then_another_process_can_read_it(
+    project_dir_path,
+):
+    target = HDF5Storage(project_dir_path, idle_close_seconds=0.1)
+    # arrange
+    experiment_id = randrange(10000000)
+    target.save_result(experiment_id, RawResultData(label="foo", data=42))
+    # act
+    time.sleep(0.5)
+    script = (
+        "from entropylab.pipeline.results_backend.sqlalchemy.storage import "
+        "HDF5Storage\n"
+        f"storage = HDF5Storage({project_dir_path!r})\n"
+        f"print(storage.get_last_result_of_experiment({experiment_id}).data)\n"
+    )
+    actual = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    )
+    # assert
+    assert actual.stdout.strip() == "42"
+    assert len(target._open_files) == 0
+    # the file is opened again by the next write:
+    target.save_result(experiment_id, RawResultData(label="bar", data=43))
+    assert target.get_last_result_of_experiment(experiment_id).data == 43
+
+
+def test_save_result_when_process_exits_then_pooled_file_is_closed(project_dir_path):
+    # arrange
+    experiment_id = randrange(10000000)
+    script = (
+        "from entropylab import RawResultData\n"
+        "from entropylab.pipeline.results_backend.sqlalchemy.storage import "
+        "HDF5Storage\n"
+        f"storage = HDF5Storage({project_dir_path!r}, idle_close_seconds=600)\n"
+        f"storage.save_result({experiment_id}, RawResultData(label='foo', data=42))\n"
+    )
+    # act
+    subprocess.run([sys.executable, "-c", script], check=True, timeout=60)
+    # assert
+    target = HDF5Storage(project_dir_path)
+    assert target.get_last_result_of_experiment(experiment_id).data == 42
+
+
+def test_save_result_when_idle_close_is_disabled_then_file_stays_open(
+    project_dir_path,
+):
+    target = HDF5Storage(project_dir_path, idle_close_seconds=0)
+    # arrange
+    experiment_id = randrange(10000000)
+    # act
+    target.save_result(experiment_id, RawResultData(label="foo", data=42))
+    time.sleep(0.2)
+    # assert
+    assert len(target._open_files) == 1
+    target.close()
+
+
+def test_close_flushes_and_releases_file(project_dir_path):
+    target = HDF5Storage(project_dir_path)
+    # arrange
+    experiment_id = randrange(10000000)
+    target.save_result(experiment_id, RawResultData(label="foo", data=42))
+    # act
+    target.close(experiment_id)
+    # assert
+    assert len(target._open_files) == 0
+    with h5py.File(target._build_hdf5_filepath(experiment_id), "r") as file:
+        assert file["-1/foo/result"][()] == 42
+
+
+def test_save_result_when_appending_scalars_then_data_is_one_dataset(
+    project_dir_path,
+):
+    target = HDF5Storage(project_dir_path)
+    # arrange
+    experiment_id = randrange(10000000)
+    # act
+    for i in range(5):
+        target.save_result(
+            experiment_id, RawResultData(label="foo", data=i * 1.5, append=True)
+        )
+    # assert
+    actual = target.get_result_records(experiment_id)
+    assert len(actual) == 1
+    assert (actual[0].data == np.arange(5) * 1.5).all()
+    with target._readable_hdf5(experiment_id) as file:
+        assert file["-1/foo/result_time"].shape == (5,)
+
+
+def test_save_result_when_appending_arrays_then_rows_are_stacked(project_dir_path):
+    target = HDF5Storage(project_dir_path)
+    # arrange
+    experiment_id = randrange(10000000)
+    # act
+    for i in range(3):
+        target.save_result(
+            experiment_id,
+            RawResultData(label="foo", data=np.arange(4) + i, stage=2, append=True),
+        )
+    # assert
+    actual = target.get_result_records(experiment_id, 2, "foo")[0]
+    assert actual.data.shape == (3, 4)
+    assert (actual.data[2] == np.arange(4) + 2).all()
+
+
+def test_save_result_when_appending_to_non_appendable_result_then_raises(
+    project_dir_path,
+):
+    target = HDF5Storage(project_dir_path)
+    # arrange
+    experiment_id = randrange(10000000)
+    target.save_result(experiment_id, RawResultData(label="foo", data=42))
+    # act & assert
+    with pytest.raises(ValueError):
+        target.save_result(
+            experiment_id, RawResultData(label="foo", data=43, append=True)
+        )
+
+
+def test_save_result_when_appending_row_of_different_shape_then_raises(
+    project_dir_path,
+):
+    target = HDF5Storage(project_dir_path)
+    # arrange
+    experiment_id = randrange(10000000)
+    target.save_result(
+        experiment_id, RawResultData(label="foo", data=np.arange(3), append=True)
+    )
+    # act & assert
+    with pytest.raises(EntropyError):
+        target.save_result(
+            experiment_id, RawResultData(label="foo", data=np.arange(4), append=True)
+        )
+
+
+@pytest.mark.parametrize("data", [2.7, np.array(5.9), np.array(1 + 2j)])
+def test_save_result_when_appending_row_that_would_lose_precision_then_raises(
+    data, project_dir_path
+):
+    target = HDF5Storage(project_dir_path)
+    # arrange
+    experiment_id = randrange(10000000)
+    target.save_result(experiment_id, RawResultData(label="foo", data=1, append=True))
+    # act & assert
+    with pytest.raises(EntropyError):
+        target.save_result(
+            experiment_id, RawResultData(label="foo", data=data, append=True)
+        )
+    assert target.get_result_records(experiment_id)[0].data.tolist() == [1]
+
+
+def test_save_result_when_appending_ints_to_float_result_then_they_are_cast(
+    project_dir_path,
+):
+    target = HDF5Storage(project_dir_path)
+    # arrange
+    experiment_id = randrange(10000000)
+    target.save_result(experiment_id, RawResultData(label="foo", data=1.5, append=True))
+    # act
+    target.save_result(experiment_id, RawResultData(label="foo", data=2, append=True))
+    # assert
+    assert target.get_result_records(experiment_id)[0].data.tolist() == [1.5, 2.0]
+
+
+def test_save_result_when_appending_empty_array_then_raises(project_dir_path):
+    target = HDF5Storage(project_dir_path)
+    # arrange
+    experiment_id = randrange(10000000)
+    # act & assert
+    with pytest.raises(EntropyError):
+        target.save_result(
+            experiment_id, RawResultData(label="foo", data=np.array([]), append=True)
+        )
+
+
+@pytest.mark.parametrize("compression", ["gzip", "lzf"])
+def test_save_result_when_compression_is_set_then_dataset_is_compressed(
+    compression, project_dir_path
+):
+    policy = HDF5CompressionPolicy(compression=compression, min_size=1024)
+    target = HDF5Storage(project_dir_path, compression_policy=policy)
+    # arrange
+    experiment_id = randrange(10000000)
+    data = np.zeros((64, 64))
+    # act
+    target.save_result(experiment_id, RawResultData(label="foo", data=data))
+    # assert
+    with target._readable_hdf5(experiment_id) as file:
+        dset = file["-1/foo/result"]
+        assert dset.compression == compression
+        assert dset.shuffle
+        assert dset.chunks is not None
+    assert (target.get_result_records(experiment_id)[0].data == data).all()
+
+
+@pytest.mark.parametrize("data", [np.zeros(8), "foo", 42])
+def test_save_result_when_data_is_small_or_not_numeric_then_not_compressed(
+    data, project_dir_path
+):
+    policy = HDF5CompressionPolicy(compression="gzip", min_size=1024)
+    target = HDF5Storage(project_dir_path, compression_policy=policy)
+    # arrange
+    experiment_id = randrange(10000000)
+    # act
+    target.save_result(experiment_id, RawResultData(label="foo", data=data))
+    # assert
+    with target._readable_hdf5(experiment_id) as file:
+        dset = file["-1/foo/result"]
+        assert dset.compression is None
+        assert dset.chunks is None
+
+
+def test_compression_policy_when_compression_is_not_built_in_then_raises():
+    with pytest.raises(ValueError):
+        HDF5CompressionPolicy(compression="szip")
+
+
+def test_get_result_records_when_indexed_then_only_matching_files_are_read(
+    project_dir_path,
+):
+    target = _indexed_storage(project_dir_path)
+    # arrange
+    target.save_result(1, RawResultData(label="foo", data=1))
+    target.save_result(2, RawResultData(label="bar", data=2))
+    target.save_result(3, RawResultData(label="foo", data=3))
+    target.close()
+    read_experiment_ids = []
+    get_entities = target._get_experiment_entities
+
+    def spy(entity_type, convert, experiment_id, stage, label):
+        read_experiment_ids.append(experiment_id)
+        return get_entities(entity_type, convert, experiment_id, stage, label)
+
+    target._get_experiment_entities = spy
+    # act
+    actual = target.get_result_records(label="foo")
+    # assert
+    assert [record.data for record in actual] == [1, 3]
+    assert read_experiment_ids == [1, 3]
+
+
+def test_rebuild_index_indexes_existing_files(project_dir_path):
+    # arrange
+    HDF5Storage(project_dir_path).save_metadata(7, Metadata("foo", 0, np.arange(3)))
+    target = _indexed_storage(project_dir_path)
+    assert target.index_is_empty()
+    # act
+    target.rebuild_index()
+    # assert
+    assert target._index.get_experiment_ids(EntityType.METADATA, 0, "foo") == [7]
+    assert target._index.get_experiment_ids(EntityType.RESULT) == []
+
+
+def test_get_result_records_reads_data_on_first_access_only(project_dir_path):
+    target = HDF5Storage(project_dir_path)
+    # arrange
+    experiment_id = randrange(10000000)
+    target.save_result(experiment_id, RawResultData(label="foo", data=np.arange(5)))
+    reads = []
+    read_data = target._read_data
+    target._read_data = lambda *args: reads.append(args) or read_data(*args)
+    # act
+    actual = target.get_result_records(experiment_id)[0]
+    # assert
+    assert actual.label == "foo"
+    assert len(reads) == 0
+    assert (actual.data == np.arange(5)).all()
+    assert (actual.data == np.arange(5)).all()
+    assert len(reads) == 1
+
+
+def test_get_result_records_when_large_and_contiguous_then_data_is_memory_mapped(
+    project_dir_path,
+):
+    target = HDF5Storage(project_dir_path)
+    # arrange
+    experiment_id = randrange(10000000)
+    data = np.arange(1_000_000, dtype=np.float64)
+    target.save_result(experiment_id, RawResultData(label="foo", data=data))
+    target.close(experiment_id)
+    # act
+    actual = target.get_result_records(experiment_id)[0]
+    # assert
+    assert isinstance(actual.data, np.memmap)
+    assert (actual.data[1000:2000] == data[1000:2000]).all()
+
+
+def test_get_result_records_when_compressed_then_data_is_not_memory_mapped(
+    project_dir_path,
+):
+    policy = HDF5CompressionPolicy(compression="lzf")
+    target = HDF5Storage(project_dir_path, compression_policy=policy)
+    # arrange
+    experiment_id = randrange(10000000)
+    data = np.arange(1_000_000, dtype=np.float64)
+    target.save_result(experiment_id, RawResultData(label="foo", data=data))
+    target.close(experiment_id)
+    # act
+    actual = target.get_result_records(experiment_id)[0]
+    # assert
+    assert not isinstance(actual.data, np.memmap)
+    assert (actual.data == data).all()
+
+
+def test_get_result_records_when_large_and_chunked_then_slices_are_read_from_file(
+    project_dir_path,
+):
+    policy = HDF5CompressionPolicy(compression="lzf")
+    target = HDF5Storage(project_dir_path, compression_policy=policy)
+    # arrange
+    experiment_id = randrange(10000000)
+    data = np.arange(1_000_000, dtype=np.float64)
+    target.save_result(experiment_id, RawResultData(label="foo", data=data))
+    target.close(experiment_id)
+    reads = []
+    read_selection = target._read_selection
+    target._read_selection = lambda *args: reads.append(args[2]) or read_selection(
+        *args
+    )
+    # act
+    actual = target.get_result_records(experiment_id)[0]
+    # assert
+    assert isinstance(actual.data, LazyHDF5Array)
+    assert actual.data.shape == data.shape
+    assert (actual.data[1000:2000] == data[1000:2000]).all()
+    assert reads == [slice(1000, 2000)]
+    assert actual.data.mean() == data.mean()
+    assert reads == [slice(1000, 2000), ()]
+    assert isinstance(pickle.loads(pickle.dumps(actual)).data, np.ndarray)
+
+
+def test_get_result_records_when_appended_rows_are_large_then_rows_are_sliced(
+    project_dir_path,
+):
+    target = HDF5Storage(project_dir_path)
+    # arrange
+    experiment_id = randrange(10000000)
+    for i in range(3):
+        target.save_result(
+            experiment_id,
+            RawResultData(label="foo", data=np.full(100_000, i), append=True),
+        )
+    # act
+    actual = target.get_result_records(experiment_id)[0]
+    # assert
+    assert isinstance(actual.data, LazyHDF5Array)
+    assert (actual.data[2] == 2).all()
+    assert (actual.data + 1)[1, 0] == 2
+
+
+def test_result_record_can_be_pickled(project_dir_path):
+    target = HDF5Storage(project_dir_path)
+    # arrange
+    experiment_id = randrange(10000000)
+    target.save_result(experiment_id, RawResultData(label="foo", data="bar"))
+    record = target.get_result_records(experiment_id)[0]
+    # act
+    actual = pickle.loads(pickle.dumps(record))
+    # assert
+    assert actual.data == "bar"
+    assert actual.label == "foo"
+
+
+def test_get_result_records_when_read_in_parallel_then_same_as_sequential(
+    project_dir_path,
+):
+    target = HDF5Storage(project_dir_path)
+    # arrange
+    for experiment_id in range(1, 5):
+        target.save_result(
+            experiment_id, RawResultData(label="foo", data=experiment_id)
+        )
+        target.save_result(experiment_id, RawResultData(label="bar", data="baz"))
+    target.close()
+    sequential = HDF5Storage(project_dir_path, read_workers=1)
+    parallel = HDF5Storage(project_dir_path, read_workers=2)
+    # act
+    expected = sequential.get_result_records(label="foo")
+    actual = parallel.get_result_records(label="foo")
+    # assert
+    assert [r.experiment_id for r in actual] == [1, 2, 3, 4]
+    assert [r.data for r in actual] == [r.data for r in expected]
+
+
+def test_iter_result_records_when_file_is_open_for_writing_then_read_in_process(
+    project_dir_path,
+):
+    target = HDF5Storage(project_dir_path, read_workers=2)
+    # arrange
+    for experiment_id in range(1, 4):
+        target.save_result(
+            experiment_id, RawResultData(label="foo", data=experiment_id)
+        )
+    target.close(1)
+    target.close(2)
+    # act
+    actual = list(target.iter_result_records(label="foo"))
+    # assert
+    assert sorted(r.data for r in actual) == [1, 2, 3]
+
+
+def test_iter_metadata_records_yields_records_of_all_experiments(project_dir_path):
+    target = HDF5Storage(project_dir_path)
+    # arrange
+    for experiment_id in range(1, 3):
+        target.save_metadata(experiment_id, Metadata(label="foo", stage=0, data=1))
+    # act
+    actual = list(target.iter_metadata_records(stage=0))
+    # assert
+    assert sorted(r.experiment_id for r in actual) == [1, 2]
+
+
+def test_save_results_saves_and_indexes_batch(project_dir_path):
+    target = _indexed_storage(project_dir_path)
+    # arrange
+    results = [RawResultData(label=f"foo{i}", data=i) for i in range(3)]
+    results.append(RawResultData(label="bar", data=1, append=True))
+    # act
+    target.save_results(1, results)
+    # assert
+    assert [r.data for r in target.get_result_records(label="foo2")] == [2]
+    assert target.get_last_result_of_experiment(1).label == "bar"
+    assert target._pending_index_rows == {}
+
+
+def test_save_result_when_indexed_then_rows_are_added_once_per_experiment(
+    project_dir_path,
+):
+    target = _indexed_storage(project_dir_path)
+    inserts = []
+    add_rows = target._index.add_rows
+    target._index.add_rows = lambda rows: inserts.append(len(rows)) or add_rows(rows)
+    # act
+    for i in range(5):
+        target.save_result(1, RawResultData(label=f"foo{i}", data=i))
+        target.save_result(2, RawResultData(label=f"bar{i}", data=i))
+    target.close(1)
+    # assert
+    assert inserts == [5]
+    assert target._index.get_experiment_ids(EntityType.RESULT) == [1]
+    assert [r.experiment_id for r in target.get_result_records(label="bar0")] == [2]
+    assert inserts == [5, 5]
+
+
+def test_save_result_when_lru_file_is_closed_then_its_index_rows_are_added(
+    project_dir_path,
+):
+    target = _indexed_storage(project_dir_path, max_open_files=1)
+    # act
+    target.save_result(1, RawResultData(label="foo", data=1))
+    target.save_result(2, RawResultData(label="foo", data=2))
+    # assert
+    assert target._index.get_indexed_experiment_ids() == [1]
+    assert list(target._pending_index_rows.keys()) == [2]
+
+
+def test_save_result_when_idle_file_is_closed_then_its_index_rows_are_added(
+    project_dir_path,
+):
+    target = _indexed_storage(project_dir_path, idle_close_seconds=0.1)
+    # act
+    target.save_result(1, RawResultData(label="foo", data=1))
+    time.sleep(0.5)
+    # assert
+    assert len(target._open_files) == 0
+    assert target._index.get_indexed_experiment_ids() == [1]
+    assert target._pending_index_rows == {}
+
+
+def test_get_result_records_when_file_is_not_indexed_then_it_is_read(
+    project_dir_path,
+):
+    target = _indexed_storage(project_dir_path)
+    # arrange
+    target.save_result(1, RawResultData(label="foo", data=1))
+    target.close()
+    # e.g. written by a process that failed before adding its index rows:
+    HDF5Storage(project_dir_path).save_result(2, RawResultData(label="foo", data=2))
+    # act
+    actual = target.get_result_records(label="foo")
+    # assert
+    assert [record.data for record in actual] == [1, 2]
+
+
+def _indexed_storage(project_dir_path: str, **kwargs) -> HDF5Storage:
+    # a single connection, shared with the idle close timer thread:
+    engine = create_engine(
+        "sqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    Base.metadata.create_all(engine)
+    return HDF5Storage(project_dir_path, index_engine=engine, **kwargs)
+
+
 def test_get_all_or_single_when_label_is_not_specified(project_dir_path):
     filename = os.path.join(project_dir_path, "1.hdf5")
     # arrange
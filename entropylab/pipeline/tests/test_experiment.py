@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from plotly import express as px
+
+from entropylab import SqlAlchemyDB, Script
+from entropylab.config import settings
+from entropylab.pipeline.api.execution import EntropyContext
+
+
+def save_result(context: EntropyContext):
+    context.add_result("signal", np.sin(np.arange(10_000) / 100))
+
+
+def save_result_and_figure(context: EntropyContext):
+    save_result(context)
+    context.add_figure(px.line(x=[1, 2], y=[3, 4]))
+
+
+@pytest.fixture()
+def auto_plot_enabled():
+    settings.set("experiment.auto_plot", True)
+    yield
+    settings.set("experiment.auto_plot", False)
+
+
+def test_run_saves_downsampled_auto_plot_of_last_result(auto_plot_enabled):
+    # arrange
+    db = SqlAlchemyDB()
+    # act
+    handle = Script(None, save_result, "auto-plot").run(db)
+    # assert
+    figures = db.get_figures(handle.id)
+    assert len(figures) == 1
+    assert len(figures[0].figure.data[0].y) <= 5000
+
+
+def test_run_when_experiment_saved_a_figure_then_auto_plot_is_not_saved(
+    auto_plot_enabled,
+):
+    # arrange
+    db = SqlAlchemyDB()
+    # act
+    handle = Script(None, save_result_and_figure, "auto-plot").run(db)
+    # assert
+    assert len(db.get_figures(handle.id)) == 1
+
+
+def test_run_when_auto_plot_is_not_enabled_then_auto_plot_is_not_saved():
+    # arrange
+    db = SqlAlchemyDB()
+    # act
+    handle = Script(None, save_result, "auto-plot").run(db)
+    # assert
+    assert db.get_figures(handle.id) == []